@@ -1,7 +1,30 @@
+import asyncio
+import itertools
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import asyncpg
+import httpx
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, Timeout
 
+# Upstream stand-in (App/upstream-standin) the server is pointed to with FINGRID_BASE_URL and PORSSISAHKO_BASE_URL
+STANDIN_URL = os.getenv("STANDIN_URL", "http://localhost:8090")
+# Database of the server, for removing the rows the stand-in tests insert; defaults to the PG* variables
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# Hours of 1922-2000 (after Helsinki's local mean time, before any stored data) are not in the database.
+# Every test run uses its own block of them, so the running server has not cached them either.
+MISSING_HOURS_START = datetime(1922, 1, 1, tzinfo=timezone.utc)
+MISSING_BLOCK_DAYS = 32
+MISSING_BLOCKS = (datetime(2001, 1, 1, tzinfo=timezone.utc) - MISSING_HOURS_START).days // MISSING_BLOCK_DAYS
+RUN_BLOCK_START = MISSING_HOURS_START + timedelta(days=int(time.time()) % MISSING_BLOCKS * MISSING_BLOCK_DAYS)
+# A range request covers endTime + 23 hours, so the ranges of the block start two days apart
+missing_slots = itertools.count()
+
 
 @pytest_asyncio.fixture
 async def client():
@@ -25,6 +48,61 @@ async def auth_client(client):
     return client
 
 
+@pytest_asyncio.fixture
+async def standin():
+    """
+    Fixture for a client of the upstream stand-in's control API. Skips the test if the stand-in is
+    not running, and restores its fault settings afterwards.
+    """
+    async with AsyncClient(base_url=STANDIN_URL, timeout=Timeout(10.0)) as standin:
+        try:
+            await standin.get("/_control")
+        except httpx.TransportError:
+            pytest.skip(f"Upstream stand-in is not running at {STANDIN_URL}")
+        await standin.post("/_control/reset")
+        yield standin
+        await standin.post("/_control/reset")
+
+
+@pytest_asyncio.fixture
+async def missing_hours():
+    """
+    Fixture for query parameters of ranges that are not in the database, so their hours are fetched
+    from the upstream. Each call returns the next range of the run's block. The rows of the block are
+    deleted before and after the test. Skips the test if the database is not reachable.
+    """
+    helsinki = ZoneInfo("Europe/Helsinki")
+    # The tables store naive Helsinki times; a day of margin covers the offset
+    block_start = (RUN_BLOCK_START - timedelta(days=1)).astimezone(helsinki).replace(tzinfo=None)
+    block_end = (RUN_BLOCK_START + timedelta(days=MISSING_BLOCK_DAYS + 1)).astimezone(helsinki).replace(tzinfo=None)
+
+    async def delete_block(conn):
+        await conn.execute("DELETE FROM porssisahko WHERE datetime BETWEEN $1 AND $2", block_start, block_end)
+        await conn.execute("DELETE FROM porssisahko_daily_rollup WHERE date BETWEEN $1 AND $2",
+                           block_start.date(), block_end.date())
+        await conn.execute("DELETE FROM fingrid WHERE datetime BETWEEN $1 AND $2", block_start, block_end)
+
+    def next_params() -> dict:
+        slot = next(missing_slots)
+        assert slot < MISSING_BLOCK_DAYS // 2, "The run's block of missing hours is used up"
+        start = RUN_BLOCK_START + timedelta(days=2 * slot)
+        return {
+            "startTime": start.isoformat().replace("+00:00", "Z"),
+            "endTime": (start + timedelta(hours=5)).isoformat().replace("+00:00", "Z")
+        }
+
+    try:
+        conn = await asyncpg.connect(TEST_DATABASE_URL)
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    try:
+        await delete_block(conn)
+        yield next_params
+        await delete_block(conn)
+    finally:
+        await conn.close()
+
+
 @pytest.mark.asyncio
 async def test_get_prices(auth_client):
     """Test that the public endpoint for retrieving price data returns a list of items with 'startDate' and 'price'."""
@@ -126,6 +204,49 @@ async def test_post_price_range(auth_client):
     assert isinstance(data, list)
     assert all("startDate" in item and "price" in item for item in data)
 
+@pytest.mark.asyncio
+async def test_post_price_range_columnar(auth_client):
+    """Test that the price range endpoint returns the columnar format when requested with the format query parameter."""
+    payload = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-01T03:00:00Z"
+    }
+    response = await auth_client.post("/api/price/range?format=columnar", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stepSeconds"] == 3600
+    assert isinstance(data["values"], list)
+    assert all(data["values"][index] is None for index in data["missing"])
+
+@pytest.mark.asyncio
+async def test_post_windpower_range_columnar_accept(auth_client):
+    """Test that the windpower range endpoint returns the columnar format when requested with the Accept header."""
+    payload = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-01T03:00:00Z"
+    }
+    response = await auth_client.post(
+        "/api/windpower/range", json=payload, headers={"Accept": "application/vnd.eprice.columnar+json"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"start", "stepSeconds", "values", "missing"}
+
+@pytest.mark.asyncio
+async def test_get_price_range_not_modified(auth_client):
+    """Test that a conditional GET of a price range with the returned ETag is answered with 304 Not Modified."""
+    params = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-01T03:00:00Z"
+    }
+    response = await auth_client.get("/api/price/range", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "cache-control" in response.headers
+    response = await auth_client.get("/api/price/range", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
 @pytest.mark.asyncio
 async def test_post_windpower_range_invalid_time(auth_client):
     """Test that posting a time range where endTime is before startTime results in an error."""
@@ -275,3 +396,82 @@ async def test_post_price_weekdayavg_missing_fields(auth_client):
     }
     response = await auth_client.post("/api/price/weekdayavg", json=payload)
     assert response.status_code in (400, 422)
+
+@pytest.mark.asyncio
+async def test_get_snapshot(auth_client):
+    """Test that the snapshot endpoint returns the requested datasets on one shared time axis."""
+    params = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-01T03:00:00Z",
+        "datasets": "windpower,price"
+    }
+    response = await auth_client.get("/api/snapshot", params=params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stepSeconds"] == 3600
+    assert set(data["series"]) | set(data["errors"]) == {"windpower", "price"}
+    assert all(len(series["values"]) == data["length"] for series in data["series"].values())
+
+@pytest.mark.asyncio
+async def test_get_snapshot_unknown_dataset(auth_client):
+    """Test that the snapshot endpoint rejects an unknown dataset with 400."""
+    params = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-01T03:00:00Z",
+        "datasets": "price,unknown"
+    }
+    response = await auth_client.get("/api/snapshot", params=params)
+    assert response.status_code == 400
+    assert response.json()["error"] == "BadRequest"
+
+@pytest.mark.asyncio
+async def test_price_range_stale_while_circuit_open(auth_client, standin, missing_hours):
+    """
+    Test that with the upstream failing, the circuit opens and ranges with missing hours are answered
+    quickly from the database with X-Data-Stale, and that the circuit closes again once the upstream recovers.
+    """
+    await standin.put("/_control/porssisahko", json={"errorRate": 1, "errorStatus": 503})
+
+    # Every failed fetch counts towards the failure threshold; stop once the circuit is open
+    breaker = None
+    for _ in range(10):
+        await auth_client.get("/api/price/range", params=missing_hours())
+        breaker = (await auth_client.get("/api/status/upstream")).json()["porssisahkoCircuitBreaker"]
+        if breaker["state"] == "open":
+            break
+    assert breaker["state"] == "open"
+
+    params = missing_hours()
+    started = time.perf_counter()
+    response = await auth_client.get("/api/price/range", params=params)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    assert response.headers["x-data-stale"] == "true"
+    assert elapsed < 1.0
+
+    # Half-open: after the reset timeout one trial call (the background revalidation of the stale
+    # range or the backfill) goes through and closes the circuit
+    await standin.put("/_control/porssisahko", json={"errorRate": 0})
+    deadline = time.monotonic() + breaker["retryInSeconds"] + 30
+    while breaker["state"] != "closed" and time.monotonic() < deadline:
+        await asyncio.sleep(1)
+        breaker = (await auth_client.get("/api/status/upstream")).json()["porssisahkoCircuitBreaker"]
+    assert breaker["state"] == "closed"
+    response = await auth_client.get("/api/price/range", params=params, timeout=60.0)
+    assert response.status_code == 200
+    assert "x-data-stale" not in response.headers
+
+@pytest.mark.asyncio
+async def test_fingrid_rate_limiter_pauses_on_429(auth_client, standin, missing_hours):
+    """Test that a 429 with Retry-After from Fingrid pauses the shared limiter and the request still succeeds."""
+    before = (await auth_client.get("/api/status/upstream")).json()["fingridRateLimiter"]["throttled"]
+    # Allow one request per 5 seconds, so back-to-back range fetches are throttled by the stand-in
+    await standin.put("/_control/fingrid", json={"rateLimit": 0.2, "rateBurst": 1})
+
+    for _ in range(2):
+        response = await auth_client.get("/api/windpower/range", params=missing_hours(), timeout=60.0)
+        assert response.status_code == 200
+
+    upstream = (await auth_client.get("/api/status/upstream")).json()
+    assert upstream["fingridRateLimiter"]["throttled"] > before
+    assert (await standin.get("/_control")).json()["upstreams"]["fingrid"]["stats"]["throttled"] > 0
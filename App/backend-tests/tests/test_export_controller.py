@@ -0,0 +1,76 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, Timeout
+
+
+@pytest_asyncio.fixture
+async def client():
+    """Fixture for creating an async HTTP client with the test server base URL."""
+    timeout = Timeout(10.0)
+    async with AsyncClient(base_url="http://localhost:8000", timeout=timeout) as client:
+        yield client
+
+
+@pytest_asyncio.fixture
+async def auth_client(client):
+    """
+    Fixture for creating an authenticated HTTP client by logging in
+    and storing the session cookie for subsequent requests.
+    """
+    login_resp = await client.post(
+        "/api/auth/login",
+        json={"email": "test@test.com", "password": "secret"}
+    )
+    assert login_resp.status_code == 200
+    return client
+
+
+@pytest.mark.asyncio
+async def test_export_price_arrow(auth_client):
+    """Test that the price export streams an Arrow IPC stream by default."""
+    payload = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-02T00:00:00Z"
+    }
+    response = await auth_client.post("/api/export/price?columns=datetime,price", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    # Arrow IPC messages start with the continuation marker
+    assert response.content[:4] == b"\xff\xff\xff\xff"
+
+
+@pytest.mark.asyncio
+async def test_export_windpower_parquet(auth_client):
+    """Test that the windpower export returns a Parquet file when requested."""
+    payload = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-02T00:00:00Z"
+    }
+    response = await auth_client.post("/api/export/windpower?format=parquet", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert response.content[:4] == b"PAR1"
+    assert response.content[-4:] == b"PAR1"
+
+
+@pytest.mark.asyncio
+async def test_export_unknown_column(auth_client):
+    """Test that exporting a column outside the whitelist is rejected."""
+    payload = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-02T00:00:00Z"
+    }
+    response = await auth_client.post("/api/export/price?columns=datetime,password", json=payload)
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_export_requires_auth(client):
+    """Test that the export endpoint requires authentication."""
+    payload = {
+        "startTime": "2024-05-01T00:00:00Z",
+        "endTime": "2024-05-02T00:00:00Z"
+    }
+    response = await client.post("/api/export/price", json=payload)
+    assert response.status_code in (401, 403)
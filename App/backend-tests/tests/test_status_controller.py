@@ -0,0 +1,68 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, Timeout
+
+
+@pytest_asyncio.fixture
+async def client():
+    """Fixture for creating an async HTTP client with the test server base URL."""
+    timeout = Timeout(10.0)
+    async with AsyncClient(base_url="http://localhost:8000", timeout=timeout) as client:
+        yield client
+
+
+@pytest_asyncio.fixture
+async def auth_client(client):
+    """
+    Fixture for creating an authenticated HTTP client by logging in
+    and storing the session cookie for subsequent requests.
+    """
+    login_resp = await client.post(
+        "/api/auth/login",
+        json={"email": "test@test.com", "password": "secret"}
+    )
+    assert login_resp.status_code == 200
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_database_status(auth_client):
+    """Test that the database status endpoint reports an open pool within its configured limits."""
+    response = await auth_client.get("/api/status/database")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["open"] is True
+    assert 0 <= data["idle"] <= data["size"] <= data["maxSize"]
+    assert data["acquireCount"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_database_status_requires_auth(client):
+    """Test that the database status endpoint is not public."""
+    response = await client.get("/api/status/database")
+    assert response.status_code in (401, 403)
+
+
+@pytest.mark.asyncio
+async def test_get_readiness(client):
+    """Test that the public readiness endpoint reports the database, upstreams and backfill state."""
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ready"] is True
+    assert data["database"]["ok"] is True
+    assert data["database"]["latencyMs"] >= 0
+    assert set(data["upstreams"]) == {"fingrid", "porssisahko"}
+    assert data["backfill"]["state"] in ("idle", "running", "paused", "done", "failed", "cancelled")
+
+
+@pytest.mark.asyncio
+async def test_get_ingestion_status(auth_client):
+    """Test that the ingestion status endpoint reports the Fingrid ingestion and the price backfill."""
+    response = await auth_client.get("/api/status/ingestion")
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data["fingrid"], dict)
+    for stats in data["fingrid"].values():
+        assert stats["runs"] >= stats["failures"] >= 0
+    assert "state" in data["priceBackfill"]
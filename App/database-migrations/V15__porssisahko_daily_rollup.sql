@@ -0,0 +1,49 @@
+-- Per-day rollup of the porssisahko table for the average price statistics.
+-- One row per Helsinki date; the hour_* arrays have 24 elements, element 1 being hour 0 (Helsinki time).
+CREATE TABLE IF NOT EXISTS porssisahko_daily_rollup (
+    date DATE PRIMARY KEY,
+    weekday INT NOT NULL,
+    price_sum NUMERIC(14, 3) NOT NULL,
+    price_count INT NOT NULL,
+    price_min NUMERIC(10, 3) NOT NULL,
+    price_max NUMERIC(10, 3) NOT NULL,
+    hour_sums NUMERIC(14, 3)[] NOT NULL,
+    hour_counts INT[] NOT NULL,
+    hour_mins NUMERIC(10, 3)[] NOT NULL, -- NULL elements for hours without data
+    hour_maxs NUMERIC(10, 3)[] NOT NULL,
+    createdAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Build the rollup for the existing price data
+WITH days AS (
+    SELECT DISTINCT date FROM porssisahko
+),
+hourly AS (
+    SELECT date, hour, SUM(price) AS price_sum, COUNT(*) AS price_count,
+           MIN(price) AS price_min, MAX(price) AS price_max
+    FROM porssisahko
+    GROUP BY date, hour
+),
+grid AS (
+    SELECT d.date, h.hour, hr.price_sum, hr.price_count, hr.price_min, hr.price_max
+    FROM days d
+    CROSS JOIN generate_series(0, 23) AS h(hour)
+    LEFT JOIN hourly hr ON hr.date = d.date AND hr.hour = h.hour
+)
+INSERT INTO porssisahko_daily_rollup (date, weekday, price_sum, price_count, price_min, price_max,
+                                      hour_sums, hour_counts, hour_mins, hour_maxs)
+SELECT date,
+       EXTRACT(ISODOW FROM date)::INT - 1, -- 0=Monday, 6=Sunday like porssisahko.weekday
+       SUM(price_sum),
+       SUM(price_count),
+       MIN(price_min),
+       MAX(price_max),
+       array_agg(COALESCE(price_sum, 0) ORDER BY hour),
+       array_agg(COALESCE(price_count, 0) ORDER BY hour),
+       array_agg(price_min ORDER BY hour),
+       array_agg(price_max ORDER BY hour)
+FROM grid
+GROUP BY date
+HAVING SUM(price_count) > 0
+ON CONFLICT (date) DO NOTHING;
@@ -0,0 +1,18 @@
+-- Watermark of the scheduled incremental Fingrid ingestion: one row per dataset.
+-- watermark is the start of the first hour (UTC) not yet ingested; each run fetches from it onwards.
+CREATE TABLE IF NOT EXISTS fingrid_ingestion_watermark (
+    dataset_id INT PRIMARY KEY,
+    watermark TIMESTAMPTZ NOT NULL,
+    last_run_at TIMESTAMPTZ,
+    last_ingested INT NOT NULL DEFAULT 0,
+    createdAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Continue after the latest stored entry of every dataset already in the fingrid table, but not later than now
+-- (forecast rows stored by range queries can reach into the future)
+INSERT INTO fingrid_ingestion_watermark (dataset_id, watermark)
+SELECT dataset_id, LEAST((MAX(datetime) AT TIME ZONE 'Europe/Helsinki') + INTERVAL '1 hour', date_trunc('hour', now()))
+FROM fingrid
+GROUP BY dataset_id
+ON CONFLICT (dataset_id) DO NOTHING;
@@ -0,0 +1,107 @@
+"""
+bench_serialization.py
+
+Benchmark of the range response serialization: the response_model path (FastAPI validates and
+serializes a list of Pydantic models) against the fast path (utils.fast_json encodes the hourly
+series straight to JSON bytes).
+
+Both paths are served by a throwaway FastAPI app and called in-process through httpx's ASGI
+transport, so the numbers include the framework overhead but no network or database time.
+The script also checks that both paths return the same JSON.
+
+Usage (from App/python-server):
+    python -m benchmarks.bench_serialization [--days 365] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from models.data_model import PriceDataPoint, FingridDataPoint
+from utils.fast_json import encode_price_series, encode_fingrid_series
+from utils.hourly_series import HourlySeries
+
+
+def build_series(days: int, decimals: int, scale: float) -> HourlySeries:
+    """
+    Build a synthetic series of the given number of days with a few missing hours.
+    """
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    series = HourlySeries.for_range(start, start + timedelta(days=days, hours=-1))
+    for index in range(len(series)):
+        if index % 500 != 7:
+            series.set(series.start + index * 3600, round((index * 7919 % 10007) / 10007 * scale, decimals))
+    return series
+
+
+def build_app(price_series: HourlySeries, fingrid_series: HourlySeries) -> FastAPI:
+    """
+    Build an app serving both series through both serialization paths.
+    """
+    app = FastAPI()
+
+    @app.get("/models/price", response_model=List[PriceDataPoint])
+    async def models_price():
+        return price_series.to_price_points()
+
+    @app.get("/fast/price", response_model=List[PriceDataPoint])
+    async def fast_price():
+        return Response(content=encode_price_series(price_series), media_type="application/json")
+
+    @app.get("/models/fingrid", response_model=List[FingridDataPoint])
+    async def models_fingrid():
+        return fingrid_series.to_fingrid_points()
+
+    @app.get("/fast/fingrid", response_model=List[FingridDataPoint])
+    async def fast_fingrid():
+        return Response(content=encode_fingrid_series(fingrid_series), media_type="application/json")
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, rounds: int) -> tuple[float, bytes]:
+    """
+    Return the median request time in milliseconds and the last response body.
+    """
+    timings = []
+    body = b""
+    for _ in range(rounds):
+        started = time.perf_counter()
+        response = await client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        body = response.content
+    return statistics.median(timings), body
+
+
+async def main(days: int, rounds: int):
+    price_series = build_series(days, decimals=3, scale=40.0)
+    fingrid_series = build_series(days, decimals=2, scale=9000.0)
+    app = build_app(price_series, fingrid_series)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        print(f"{days} days, {price_series.count} hours per series, median of {rounds} rounds")
+        for name in ("price", "fingrid"):
+            models_ms, models_body = await measure(client, f"/models/{name}", rounds)
+            fast_ms, fast_body = await measure(client, f"/fast/{name}", rounds)
+            same_json = json.loads(models_body) == json.loads(fast_body)
+            print(
+                f"{name:8s} response_model {models_ms:8.1f} ms | fast {fast_ms:7.1f} ms | "
+                f"speedup {models_ms / fast_ms:5.1f}x | same JSON: {same_json}, same bytes: {models_body == fast_body}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365, help="Length of the series in days.")
+    parser.add_argument("--rounds", type=int, default=5, help="Requests per path.")
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.rounds))
@@ -0,0 +1,111 @@
+"""
+bench_upstream_client.py
+
+Benchmark of the per-hour price fetch latency: a new httpx.AsyncClient per request (the previous
+behaviour of ext_apis.py) against the pooled, long-lived UpstreamClient.
+
+Both variants run FetchPriceData.fetch_price_data_range, which requests one hour at a time. By
+default the requests go to a minimal keep-alive stand-in of the Porssisahko price endpoint on
+127.0.0.1, so the numbers show the client and connection setup cost without network latency; pass
+--url to measure against a real endpoint, where DNS and TLS handshakes make the difference larger.
+
+Usage (from App/python-server):
+    python -m benchmarks.bench_upstream_client [--hours 48] [--rounds 3] [--url https://api.porssisahko.net/v1/price.json]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from ext_apis.ext_apis import FetchPriceData
+from ext_apis.http_clients import create_upstream_client
+from models.data_model import TimeRange
+
+
+class PerRequestClient:
+    """
+    Client with the interface of UpstreamClient that opens a new httpx.AsyncClient for every request.
+    """
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        async with httpx.AsyncClient() as client:
+            return await client.get(url, **kwargs)
+
+
+async def handle_standin(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """
+    Serve a stand-in of the Porssisahko price endpoint over HTTP/1.1 keep-alive.
+
+    Each response is written with one call, so the measurement is not skewed by delayed ACKs.
+    """
+    try:
+        while request_line := await reader.readline():
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            query = parse_qs(urlsplit(request_line.split()[1].decode()).query)
+            body = json.dumps({"price": round(int(query["hour"][0]) * 0.37 + 1.5, 3)}).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                + f"content-length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def measure(client, url: str, hours: int, rounds: int) -> list[float]:
+    """
+    Return the per-hour latencies in milliseconds of fetching the given number of hours, per round.
+    """
+    fetcher = FetchPriceData(http_client=client)
+    fetcher.base_url = url
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    time_range = TimeRange(startTime=start, endTime=start + timedelta(hours=hours - 1))
+    per_hour = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        points = await fetcher.fetch_price_data_range(time_range)
+        elapsed = time.perf_counter() - started
+        assert len(points) == hours
+        per_hour.append(elapsed / hours * 1000)
+    return per_hour
+
+
+async def main(hours: int, rounds: int, url: str | None):
+    server = None
+    if url is None:
+        server = await asyncio.start_server(handle_standin, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}/v1/price.json"
+
+    try:
+        print(f"{hours} hourly requests to {url}, {rounds} rounds")
+        per_request = await measure(PerRequestClient(), url, hours, rounds)
+        pooled_client = create_upstream_client("benchmark")
+        try:
+            pooled = await measure(pooled_client, url, hours, rounds)
+        finally:
+            await pooled_client.close()
+        before = statistics.median(per_request)
+        after = statistics.median(pooled)
+        print(f"client per request  {before:7.2f} ms per hour (rounds: {', '.join(f'{v:.2f}' for v in per_request)})")
+        print(f"pooled client       {after:7.2f} ms per hour (rounds: {', '.join(f'{v:.2f}' for v in pooled)})")
+        print(f"speedup             {before / after:7.1f}x")
+    finally:
+        if server is not None:
+            server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=int, default=48, help="Hours fetched per round (one request each).")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per variant.")
+    parser.add_argument("--url", default=None, help="Price endpoint to measure instead of the local stand-in.")
+    args = parser.parse_args()
+    asyncio.run(main(args.hours, args.rounds, args.url))
@@ -27,12 +27,75 @@ if os.getenv("POSTGRES_DB") is None:
 
 # PostgreSQL connection string
 DATABASE_URL = f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('PGHOST')}:{os.getenv('PGPORT')}/{os.getenv('POSTGRES_DB')}"
+# Connection pool shared by all repositories
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 10))  # seconds
+DB_POOL_MAX_INACTIVE_LIFETIME = float(os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME", 300))  # seconds
 # JWT configuration
 JWT_SECRET = os.getenv("JWT_SECRET", "wsd-project-secret")  # Default value for development
 ALGORITHM = os.getenv("ALGORITHM", "HS256")  # Default algorithm
 COOKIE_KEY = os.getenv("COOKIE_KEY", "token")  # Default cookie key
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Fingrid datasets served by the API: 245 wind power, 165 consumption, 241 production
+FINGRID_DATASET_IDS = [int(dataset_id) for dataset_id in os.getenv("FINGRID_DATASET_IDS", "245,165,241").split(",")]
+# Number of finalized Helsinki days of price data kept in memory
+PRICE_DAY_CACHE_SIZE = int(os.getenv("PRICE_DAY_CACHE_SIZE", 2048))
+# Upper bound for serving a cached latest/today price response; the price scheduler also invalidates it
+LATEST_PRICE_CACHE_TTL = float(os.getenv("LATEST_PRICE_CACHE_TTL", 3600))  # seconds
+# Latest Fingrid values: cache time to live per dataset, matching the dataset's update cadence ("id:seconds,..."),
+# and the window around the current time requested from the API
+FINGRID_LATEST_TTLS = {
+    int(dataset_id): float(ttl)
+    for dataset_id, ttl in (item.split(":") for item in os.getenv("FINGRID_LATEST_TTLS", "245:900,165:900,241:900").split(","))
+}
+FINGRID_LATEST_DEFAULT_TTL = float(os.getenv("FINGRID_LATEST_DEFAULT_TTL", 900))  # seconds
+FINGRID_LATEST_WINDOW = float(os.getenv("FINGRID_LATEST_WINDOW", 7200))  # seconds before and after now
+# Rows fetched from the database cursor and written per Arrow record batch / Parquet row group by the export endpoint
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 10000))
+# Cache-Control of range responses: fully stored ranges before the current Helsinki day on public routes and on
+# authenticated routes (only the browser may store those), and everything else
+HISTORIC_CACHE_CONTROL = os.getenv("HISTORIC_CACHE_CONTROL", "public, max-age=2592000")  # 30 days
+PRIVATE_HISTORIC_CACHE_CONTROL = os.getenv("PRIVATE_HISTORIC_CACHE_CONTROL", "private, max-age=2592000")  # 30 days
+RECENT_CACHE_CONTROL = os.getenv("RECENT_CACHE_CONTROL", "no-cache")
+# Pooled HTTP clients of the external APIs (one per upstream, kept alive for the application lifetime)
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", 10))
+UPSTREAM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", 5))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", 30))  # seconds
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", 5))  # seconds
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", 20))  # seconds
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() == "true"  # needs httpx[http2]
+# Porssisahko per-hour price requests: concurrent requests and token-bucket rate limit
+PORSSISAHKO_FETCH_CONCURRENCY = int(os.getenv("PORSSISAHKO_FETCH_CONCURRENCY", 4))
+PORSSISAHKO_RATE_LIMIT = float(os.getenv("PORSSISAHKO_RATE_LIMIT", 10))  # requests per second
+PORSSISAHKO_RATE_BURST = float(os.getenv("PORSSISAHKO_RATE_BURST", 10))  # requests
+# Base URLs of the external APIs; point them to the upstream stand-in (App/upstream-standin) for offline work
+FINGRID_BASE_URL = os.getenv("FINGRID_BASE_URL", "https://data.fingrid.fi/api").rstrip("/")
+PORSSISAHKO_BASE_URL = os.getenv("PORSSISAHKO_BASE_URL", "https://api.porssisahko.net/v1").rstrip("/")
+# Fingrid API: token-bucket rate limit shared by all Fingrid calls, and retries of throttled or failed calls
+FINGRID_RATE_LIMIT = float(os.getenv("FINGRID_RATE_LIMIT", 0.66))  # requests per second
+FINGRID_RATE_BURST = float(os.getenv("FINGRID_RATE_BURST", 1))  # requests
+FINGRID_MAX_RETRIES = int(os.getenv("FINGRID_MAX_RETRIES", 3))
+FINGRID_BACKOFF_BASE = float(os.getenv("FINGRID_BACKOFF_BASE", 1))  # seconds
+FINGRID_BACKOFF_MAX = float(os.getenv("FINGRID_BACKOFF_MAX", 30))  # seconds
+# Fingrid API: range fetches are paginated; pages after the first are fetched concurrently within the rate limit
+FINGRID_PAGE_SIZE = int(os.getenv("FINGRID_PAGE_SIZE", 20000))  # data points, the API maximum
+FINGRID_FETCH_CONCURRENCY = int(os.getenv("FINGRID_FETCH_CONCURRENCY", 2))
+# Scheduled incremental ingestion of FINGRID_DATASET_IDS: run interval, days fetched for a dataset without
+# a watermark, hours re-fetched before the watermark (late revisions) and the longest range of one request
+FINGRID_INGEST_INTERVAL = float(os.getenv("FINGRID_INGEST_INTERVAL", 900))  # seconds, 0 disables the ingestion
+FINGRID_INGEST_LOOKBACK = float(os.getenv("FINGRID_INGEST_LOOKBACK", 7))  # days
+FINGRID_INGEST_OVERLAP = int(os.getenv("FINGRID_INGEST_OVERLAP", 2))  # hours
+FINGRID_INGEST_MAX_SPAN = float(os.getenv("FINGRID_INGEST_MAX_SPAN", 31))  # days
+# Circuit breakers of the external APIs: consecutive failed calls that open the circuit, and seconds before a trial call
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))  # seconds
+# Readiness check: seconds the database ping may take before the service is reported not ready
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", 2))  # seconds
+# Start of the price backfill run in the background on startup (naive Helsinki time)
+PRICE_BACKFILL_START = os.getenv("PRICE_BACKFILL_START", "2025-05-12T23:00:00")
+
 MAIL_USERNAME=os.getenv("MAIL_USERNAME", "eprice.varmennus@gmail.com")  # Default sender
 MAIL_PASSWORD=os.getenv("MAIL_PASSWORD")  # Default password
 MAIL_FROM=os.getenv("MAIL_FROM", "eprice.varmennus@gmail.com")  # Default sender email
@@ -54,4 +117,5 @@ public_routes = [
     #"/docs",
     "/openapi.json",
     "/api/price/range",
+    "/ready",
     ]
\ No newline at end of file
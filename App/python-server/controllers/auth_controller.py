@@ -29,12 +29,13 @@ from jose import jwt, JWTError
 from services.auth_service import AuthService
 from repositories.user_repository import UserRepository
 from models.user_model import User, UserCode, EmailRequest
-from config.secrets import DATABASE_URL, JWT_SECRET, ALGORITHM, COOKIE_KEY
+from repositories.database_pool import database_pool
+from config.secrets import JWT_SECRET, ALGORITHM, COOKIE_KEY
 import asyncpg
 
 
 router = APIRouter()
-user_repository = UserRepository(DATABASE_URL)
+user_repository = UserRepository(database_pool)
 auth_service = AuthService(user_repository)
 
 @router.post("/api/auth/register")
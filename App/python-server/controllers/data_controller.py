@@ -5,6 +5,24 @@ This module defines the FastAPI routes for the Eprice backend service. It provid
 and querying electricity production, consumption, wind power, and price data. The endpoints fetch data from
 Fingrid and Porssisähkö APIs, and return results as Pydantic models or error responses.
 
+The range routes and the latest/today price routes return JSON bytes encoded directly from the service's hourly series
+(utils.fast_json); their response_model only documents the response schema. The range routes also return the
+compact columnar format (ColumnarSeries) when requested with `?format=columnar` or an `Accept` header of
+`application/vnd.eprice.columnar+json`.
+
+The range routes are also available as GET with startTime and endTime query parameters. Range responses carry an
+ETag and Last-Modified derived from the data version of the stored range (utils.http_cache), and the latest/today
+routes an ETag of their body; conditional GET requests are answered with 304 Not Modified. Fully stored ranges
+before the current Helsinki day get a long Cache-Control lifetime, public on public routes and private on the routes
+that require a token.
+
+When an upstream's circuit breaker is open, the routes answer from the database and caches without waiting for the
+upstream; responses with hours that could not be fetched carry an `X-Data-Stale: true` header and are revalidated in
+the background.
+
+The snapshot route returns any subset of the Fingrid datasets and the price over one range on a shared hourly time
+axis (GridSnapshot), loading the datasets concurrently, so a dashboard can render from a single request.
+
 All datetime fields in API requests and responses use the RFC 3339 format. Unless otherwise specified:
 - Input datetimes (startTime, endTime) should be provided as UTC-aware datetimes (e.g., "2025-06-01T20:00:00Z").
 - Returned datetimes (such as startDate, startTime, endTime) are serialized as UTC datetime strings in RFC 3339 format (e.g., "2025-06-01T20:00:00Z").
@@ -21,34 +39,175 @@ Routes:
     - /api/data/today
     - /api/price/hourlyavg
     - /api/price/weekdayavg
+    - /api/snapshot
 """
 
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
+from typing import Awaitable, Callable, List, Literal, Optional
 from services.data_service import FingridDataService, PriceDataService
-from models.data_model import FingridDataPoint, TimeRangeRequest, PriceDataPoint, ErrorResponse
+from services.snapshot_service import SnapshotService, SNAPSHOT_DATASETS
+from models.data_model import FingridDataPoint, TimeRangeRequest, PriceDataPoint, ErrorResponse, ColumnarSeries, GridSnapshot
 from fastapi import HTTPException
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from utils.fast_json import encode_price_series, encode_fingrid_series, encode_columnar_series, encode_snapshot, COLUMNAR_MEDIA_TYPE
+from utils.hourly_series import HourlySeries
+from utils.http_cache import make_etag, body_etag, is_historic, validator_headers, is_not_modified
+from config.secrets import public_routes
 
 router = APIRouter()
 fingrid_data_service = FingridDataService()
 price_data_service = PriceDataService()
+snapshot_service = SnapshotService(fingrid_data_service, price_data_service)
+
+# Response header set when missing hours could not be fetched because the upstream is unavailable
+STALE_HEADER = "X-Data-Stale"
+
+RangeFormat = Literal["json", "columnar"]
+RANGE_FORMAT_QUERY = Query("json", alias="format", description="Response format: 'json' (list of data points) or 'columnar'.")
+RANGE_RESPONSES = {
+    200: {"content": {COLUMNAR_MEDIA_TYPE: {"schema": ColumnarSeries.model_json_schema()}}},
+    500: {"model": ErrorResponse, "description": "Internal server error"},
+}
+
+
+def time_range_query(
+    startTime: datetime = Query(description="Start time in RFC 3339 format (e.g., 2024-05-01T00:00:00Z)."),
+    endTime: datetime = Query(description="End time in RFC 3339 format (e.g., 2024-05-02T00:00:00Z)."),
+) -> TimeRangeRequest:
+    """
+    Build a TimeRangeRequest from the startTime and endTime query parameters of the GET range routes.
+
+    Args:
+        startTime (datetime): Start time in RFC 3339 format.
+        endTime (datetime): End time in RFC 3339 format.
+
+    Returns:
+        TimeRangeRequest: The validated time range.
+
+    Raises:
+        RequestValidationError: If the time range is invalid.
+    """
+    try:
+        return TimeRangeRequest(startTime=startTime, endTime=endTime)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+async def read_range_version(load_version: Callable[[], Awaitable[dict]]) -> Optional[dict]:
+    """
+    Read the data version of a range, or None if it cannot be read.
+
+    Args:
+        load_version (Callable[[], Awaitable[dict]]): Reads the version from the service.
+
+    Returns:
+        Optional[dict]: The version, or None if the database is unavailable.
+    """
+    try:
+        return await load_version()
+    except Exception as e:
+        print(f"Failed to read data version: {e}")
+        return None
+
+
+async def range_response(
+    request: Request,
+    response_format: str,
+    dataset: str,
+    time_range: TimeRangeRequest,
+    load_version: Callable[[], Awaitable[dict]],
+    load_series: Callable[[], Awaitable[HourlySeries]],
+    encode: Callable[[HourlySeries], bytes],
+) -> Response:
+    """
+    Build a range response in the requested format with conditional caching.
+
+    The ETag is derived from the data version of the stored range, so a fully stored range can
+    be answered with 304 Not Modified without loading the series. A range with missing hours is
+    loaded first, because filling it from the external API changes its version.
+
+    Args:
+        request (Request): The request, with the Accept and conditional headers.
+        response_format (str): The 'format' query parameter.
+        dataset (str): Dataset name, part of the ETag.
+        time_range (TimeRangeRequest): The requested range.
+        load_version (Callable[[], Awaitable[dict]]): Reads the data version from the service.
+        load_series (Callable[[], Awaitable[HourlySeries]]): Loads the series from the service.
+        encode (Callable[[HourlySeries], bytes]): Encoder of the default list-of-points JSON.
 
+    Returns:
+        Response: 304 Not Modified, or the columnar JSON if requested by the query parameter or the
+            Accept header, otherwise the default JSON.
+    """
+    columnar = response_format == "columnar" or COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+    series = None
+    version = await read_range_version(load_version)
+    if version is not None and not version["complete"]:
+        series = await load_series()
+        version = await read_range_version(load_version)
+
+    headers = {"Vary": "Accept"}
+    if version is not None:
+        etag = make_etag(
+            dataset, time_range.startTime.astimezone(timezone.utc), time_range.endTime.astimezone(timezone.utc),
+            version["count"], version["last_modified"], "columnar" if columnar else "json"
+        )
+        cacheable = version["complete"] and is_historic(time_range.endTime)
+        # Only public routes may be stored by shared caches; the others require a valid token
+        headers.update(validator_headers(etag, version["last_modified"], cacheable, request.url.path in public_routes))
+        if is_not_modified(request, etag, version["last_modified"]):
+            return Response(status_code=304, headers=headers)
+
+    if series is None:
+        series = await load_series()
+    if series.stale:
+        headers[STALE_HEADER] = "true"
+    if columnar:
+        return Response(content=encode_columnar_series(series), media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+    return Response(content=encode(series), media_type="application/json", headers=headers)
+
+
+def latest_response(request: Request, content: bytes, stale: bool = False) -> Response:
+    """
+    Build a JSON response with an ETag of its body (latest/today prices, grid snapshots).
+
+    Args:
+        request (Request): The request, with the conditional headers.
+        content (bytes): The JSON body.
+        stale (bool): Whether the body is stale. Default is False.
+
+    Returns:
+        Response: 304 Not Modified if the client's copy is current, otherwise the JSON body.
+    """
+    headers = validator_headers(body_etag(content))
+    if stale:
+        headers[STALE_HEADER] = "true"
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @router.get("/api/windpower", response_model=FingridDataPoint, responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def get_windpower():
+async def get_windpower(response: Response):
     """
     Get wind power production forecast.
 
     Fetches forecast data from Fingrid dataset ID 245.
 
+    Args:
+        response (Response): The response, used to flag stale data.
+
     Returns:
         FingridDataPoint | JSONResponse: A wind power data point or an error message.
     """
     try:
-        return await fingrid_data_service.fingrid_data(dataset_id=245)
+        point, stale = await fingrid_data_service.fingrid_data(dataset_id=245)
+        if stale:
+            response.headers[STALE_HEADER] = "true"
+        return point
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
@@ -56,8 +215,8 @@ async def get_windpower():
 
 
 @router.post("/api/windpower/range", response_model=List[FingridDataPoint],
-    responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def post_windpower_range(time_range: TimeRangeRequest):
+    responses=RANGE_RESPONSES)
+async def post_windpower_range(time_range: TimeRangeRequest, request: Request, response_format: RangeFormat = RANGE_FORMAT_QUERY):
     """
     Get wind power production data for a given time range.
 
@@ -65,13 +224,20 @@ async def post_windpower_range(time_range: TimeRangeRequest):
 
     Args:
         time_range (TimeRangeRequest): Start and end time in RFC 3339 format.
+        request (Request): The request, used for the Accept header.
+        response_format (str): 'json' (default) or 'columnar'.
 
     Returns:
-        List[FingridDataPoint] | JSONResponse: List of wind power data points or an error message.
+        List[FingridDataPoint] | ColumnarSeries | JSONResponse: List of wind power data points or an error message.
     """
     try:
         time_range.endTime = time_range.endTime + timedelta(hours=23)
-        return await fingrid_data_service.fingrid_data_range(dataset_id=245, time_range=time_range)
+        return await range_response(
+            request, response_format, "windpower", time_range,
+            lambda: fingrid_data_service.fingrid_range_version(dataset_id=245, time_range=time_range),
+            lambda: fingrid_data_service.fingrid_series_range(dataset_id=245, time_range=time_range),
+            encode_fingrid_series
+        )
 
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
@@ -79,20 +245,37 @@ async def post_windpower_range(time_range: TimeRangeRequest):
         return JSONResponse({"error": "InternalServerError", "message": str(e)})
 
 
+@router.get("/api/windpower/range", response_model=List[FingridDataPoint], responses=RANGE_RESPONSES)
+async def get_windpower_range(request: Request, time_range: TimeRangeRequest = Depends(time_range_query), response_format: RangeFormat = RANGE_FORMAT_QUERY):
+    """
+    Same as POST /api/windpower/range, with startTime and endTime as query parameters.
+
+    GET responses can be cached by browsers (not by shared caches, the route requires a token) and revalidated with If-None-Match
+    or If-Modified-Since.
+    """
+    return await post_windpower_range(time_range, request, response_format)
+
+
 @router.get("/api/consumption",
     response_model=FingridDataPoint,
     responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def get_consumption():
+async def get_consumption(response: Response):
     """
     Get electricity consumption forecast.
 
     Fetches consumption data from Fingrid dataset ID 165.
 
+    Args:
+        response (Response): The response, used to flag stale data.
+
     Returns:
         FingridDataPoint | JSONResponse: A consumption data point or an error message.
     """
     try:
-        return await fingrid_data_service.fingrid_data(dataset_id=165)
+        point, stale = await fingrid_data_service.fingrid_data(dataset_id=165)
+        if stale:
+            response.headers[STALE_HEADER] = "true"
+        return point
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
@@ -100,8 +283,8 @@ async def get_consumption():
 
 
 @router.post("/api/consumption/range", response_model=List[FingridDataPoint],
-             responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def post_consumption_range(time_range: TimeRangeRequest):
+    responses=RANGE_RESPONSES)
+async def post_consumption_range(time_range: TimeRangeRequest, request: Request, response_format: RangeFormat = RANGE_FORMAT_QUERY):
     """
     Get electricity consumption data for a given time range.
 
@@ -109,35 +292,58 @@ async def post_consumption_range(time_range: TimeRangeRequest):
 
     Args:
         time_range (TimeRangeRequest): Start and end time in RFC 3339 format (UTC).
+        request (Request): The request, used for the Accept header.
+        response_format (str): 'json' (default) or 'columnar'.
 
     Returns:
-        List[FingridDataPoint] | JSONResponse: List of consumption data points or an error message.
+        List[FingridDataPoint] | ColumnarSeries | JSONResponse: List of consumption data points or an error message.
             Each FingridDataPoint's startTime and endTime are returned as UTC datetimes (RFC 3339).
     """
     try:
         time_range.endTime = time_range.endTime + timedelta(hours=23)
-        return await fingrid_data_service.fingrid_data_range(
-            dataset_id=165,time_range=time_range)
+        return await range_response(
+            request, response_format, "consumption", time_range,
+            lambda: fingrid_data_service.fingrid_range_version(dataset_id=165, time_range=time_range),
+            lambda: fingrid_data_service.fingrid_series_range(dataset_id=165, time_range=time_range),
+            encode_fingrid_series
+        )
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
         return JSONResponse({"error": "InternalServerError", "message": str(e)})
 
 
+@router.get("/api/consumption/range", response_model=List[FingridDataPoint], responses=RANGE_RESPONSES)
+async def get_consumption_range(request: Request, time_range: TimeRangeRequest = Depends(time_range_query), response_format: RangeFormat = RANGE_FORMAT_QUERY):
+    """
+    Same as POST /api/consumption/range, with startTime and endTime as query parameters.
+
+    GET responses can be cached by browsers (not by shared caches, the route requires a token) and revalidated with If-None-Match
+    or If-Modified-Since.
+    """
+    return await post_consumption_range(time_range, request, response_format)
+
+
 @router.get("/api/production",
     response_model=FingridDataPoint,
     responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def get_production():
+async def get_production(response: Response):
     """
     Get electricity production forecast.
 
     Fetches production data from Fingrid dataset ID 241.
 
+    Args:
+        response (Response): The response, used to flag stale data.
+
     Returns:
         FingridDataPoint | JSONResponse: A production data point or an error message.
     """
     try:
-        return await fingrid_data_service.fingrid_data(dataset_id=241)
+        point, stale = await fingrid_data_service.fingrid_data(dataset_id=241)
+        if stale:
+            response.headers[STALE_HEADER] = "true"
+        return point
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
@@ -145,8 +351,8 @@ async def get_production():
 
 
 @router.post("/api/production/range", response_model=List[FingridDataPoint],
-            responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def post_production_range(time_range: TimeRangeRequest):
+    responses=RANGE_RESPONSES)
+async def post_production_range(time_range: TimeRangeRequest, request: Request, response_format: RangeFormat = RANGE_FORMAT_QUERY):
     """
     Get electricity production data for a given time range.
 
@@ -154,37 +360,62 @@ async def post_production_range(time_range: TimeRangeRequest):
 
     Args:
         time_range (TimeRangeRequest): Start and end time in RFC 3339 format (UTC).
+        request (Request): The request, used for the Accept header.
+        response_format (str): 'json' (default) or 'columnar'.
 
     Returns:
-        List[FingridDataPoint] | JSONResponse: List of production data points or an error message.
+        List[FingridDataPoint] | ColumnarSeries | JSONResponse: List of production data points or an error message.
             Each FingridDataPoint's startTime and endTime are returned as UTC datetimes (RFC 3339).
     """
     try:
         time_range.endTime = time_range.endTime + timedelta(hours=23)
-        return await fingrid_data_service.fingrid_data_range(
-            dataset_id=241, time_range=time_range)
+        return await range_response(
+            request, response_format, "production", time_range,
+            lambda: fingrid_data_service.fingrid_range_version(dataset_id=241, time_range=time_range),
+            lambda: fingrid_data_service.fingrid_series_range(dataset_id=241, time_range=time_range),
+            encode_fingrid_series
+        )
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
         return JSONResponse({"error": "InternalServerError", "message": str(e)})
 
 
+@router.get("/api/production/range", response_model=List[FingridDataPoint], responses=RANGE_RESPONSES)
+async def get_production_range(request: Request, time_range: TimeRangeRequest = Depends(time_range_query), response_format: RangeFormat = RANGE_FORMAT_QUERY):
+    """
+    Same as POST /api/production/range, with startTime and endTime as query parameters.
+
+    GET responses can be cached by browsers (not by shared caches, the route requires a token) and revalidated with If-None-Match
+    or If-Modified-Since.
+    """
+    return await post_production_range(time_range, request, response_format)
+
+
 @router.post("/api/price/range",
-             response_model=List[PriceDataPoint])
-async def post_price_range(time_range: TimeRangeRequest):
+             response_model=List[PriceDataPoint],
+             responses=RANGE_RESPONSES)
+async def post_price_range(time_range: TimeRangeRequest, request: Request, response_format: RangeFormat = RANGE_FORMAT_QUERY):
     """
     Get price data for a specific time range from the Porssisahko API.
 
     Args:
         time_range (TimeRangeRequest): Start and end time as UTC datetime objects (RFC 3339).
+        request (Request): The request, used for the Accept header.
+        response_format (str): 'json' (default) or 'columnar'.
 
     Returns:
-        List[PriceDataPoint] | JSONResponse: List of price data points or an error message.
+        List[PriceDataPoint] | ColumnarSeries | JSONResponse: List of price data points or an error message.
             Each PriceDataPoint's startDate is returned as a UTC datetime string in RFC 3339 format (e.g., '2025-06-01T20:00:00Z').
     """
     try:
         time_range.endTime = time_range.endTime + timedelta(hours=23)
-        return await price_data_service.price_data_range(time_range)
+        return await range_response(
+            request, response_format, "price", time_range,
+            lambda: price_data_service.price_range_version(time_range),
+            lambda: price_data_service.price_series_range(time_range),
+            encode_price_series
+        )
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
@@ -192,11 +423,22 @@ async def post_price_range(time_range: TimeRangeRequest):
         return JSONResponse({"error":"InternalServerError", "message": str(e)})
 
 
+@router.get("/api/price/range", response_model=List[PriceDataPoint], responses=RANGE_RESPONSES)
+async def get_price_range(request: Request, time_range: TimeRangeRequest = Depends(time_range_query), response_format: RangeFormat = RANGE_FORMAT_QUERY):
+    """
+    Same as POST /api/price/range, with startTime and endTime as query parameters.
+
+    GET responses can be cached by browsers and shared caches and revalidated with If-None-Match
+    or If-Modified-Since.
+    """
+    return await post_price_range(time_range, request, response_format)
+
+
 @router.get(
     "/api/public/data",
     response_model=List[PriceDataPoint],
     responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def get_prices():
+async def get_prices(request: Request):
     """
     Retrieve the latest 48 hours of electricity price data.
 
@@ -205,7 +447,7 @@ async def get_prices():
             Each PriceDataPoint's startDate is returned as a UTC datetime string in RFC 3339 format (e.g., '2025-06-01T20:00:00Z').
     """
     try:
-        return await price_data_service.price_data_latest()
+        return latest_response(request, *await price_data_service.price_data_latest_json())
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
@@ -216,7 +458,7 @@ async def get_prices():
     "/api/data/today",
     response_model=List[PriceDataPoint],
     responses={500: {"model": ErrorResponse, "description": "Internal server error"}})
-async def get_prices_today():
+async def get_prices_today(request: Request):
     """
     Retrieve today's electricity price data for Finland (Europe/Helsinki).
 
@@ -225,7 +467,7 @@ async def get_prices_today():
             Each PriceDataPoint's startDate is returned as a UTC datetime string in RFC 3339 format (e.g., '2025-06-01T20:00:00Z').
     """
     try:
-        return await price_data_service.price_data_today()
+        return latest_response(request, *await price_data_service.price_data_today_json())
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
     except Exception as e:
@@ -271,3 +513,37 @@ async def post_price_weekday_avg_hki(time_range: TimeRangeRequest):
     except Exception as e:
         return JSONResponse({"error": "InternalServerError", "message": str(e)})
 
+
+@router.get("/api/snapshot", response_model=GridSnapshot,
+    responses={400: {"model": ErrorResponse, "description": "Unknown dataset"}, 500: {"model": ErrorResponse, "description": "Internal server error"}})
+async def get_snapshot(
+    request: Request,
+    time_range: TimeRangeRequest = Depends(time_range_query),
+    datasets: str = Query(",".join(SNAPSHOT_DATASETS), description=f"Comma-separated datasets: {', '.join(SNAPSHOT_DATASETS)}."),
+):
+    """
+    Get several datasets for a given time range on a shared hourly time axis.
+
+    The datasets are loaded concurrently. Like the range routes, the range ends 23 hours after
+    endTime. A dataset that fails is listed in errors and the others are still returned.
+
+    Args:
+        request (Request): The request, with the conditional headers.
+        time_range (TimeRangeRequest): Start and end time in RFC 3339 format.
+        datasets (str): Comma-separated dataset names. Default is every dataset.
+
+    Returns:
+        GridSnapshot | JSONResponse: The aligned series or an error message.
+    """
+    try:
+        time_range.endTime = time_range.endTime + timedelta(hours=23)
+        names = [name.strip() for name in datasets.split(",") if name.strip()]
+        axis, series, errors = await snapshot_service.snapshot(names, time_range)
+        content = encode_snapshot(axis.start, len(axis), series, errors)
+        return latest_response(request, content, any(values.stale for values in series.values()))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": "BadRequest", "message": str(e)})
+    except HTTPException as e:
+        return JSONResponse(status_code=e.status_code, content={"error": "HTTPError", "message": e.detail})
+    except Exception as e:
+        return JSONResponse({"error": "InternalServerError", "message": str(e)})
@@ -0,0 +1,61 @@
+"""
+export_controller.py
+
+This module defines the FastAPI routes for exporting stored electricity data for analytics clients.
+The data is streamed as an Arrow IPC stream or a Parquet file instead of JSON, with bounded memory
+use on the server regardless of the length of the time range.
+
+Input datetimes (startTime, endTime) are UTC-aware datetimes in RFC 3339 format. The exported
+'datetime' column is a UTC timestamp.
+
+Routes:
+    - /api/export/{dataset}
+"""
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Literal, Optional
+from models.data_model import TimeRangeRequest, ErrorResponse
+from services.export_service import ExportService
+
+router = APIRouter()
+export_service = ExportService()
+
+
+@router.post(
+    "/api/export/{dataset}",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/vnd.apache.arrow.stream": {}, "application/vnd.apache.parquet": {}}},
+        400: {"model": ErrorResponse, "description": "Unknown dataset or column"},
+    })
+async def post_export(
+    dataset: Literal["price", "windpower", "consumption", "production"],
+    time_range: TimeRangeRequest,
+    columns: Optional[str] = Query(None, description="Comma-separated column names. Default is every column of the dataset."),
+    export_format: Literal["arrow", "parquet"] = Query("arrow", alias="format", description="Arrow IPC stream or Parquet file."),
+):
+    """
+    Export stored data of one dataset for a time range.
+
+    Only data already in the database is exported, ordered by datetime.
+
+    Args:
+        dataset (str): 'price', 'windpower', 'consumption' or 'production'.
+        time_range (TimeRangeRequest): Start and end time (inclusive) in RFC 3339 format (UTC).
+        columns (Optional[str]): Comma-separated column names, e.g. 'datetime,price'.
+        export_format (str): 'arrow' (default) or 'parquet'.
+
+    Returns:
+        StreamingResponse | JSONResponse: The exported data as an attachment or an error message.
+    """
+    try:
+        column_list = [column.strip() for column in columns.split(",") if column.strip()] if columns else None
+        body, media_type, filename = export_service.export(dataset, time_range, column_list, export_format)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": "BadRequest", "message": str(e)})
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
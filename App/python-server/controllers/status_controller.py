@@ -0,0 +1,150 @@
+"""
+status_controller.py
+
+This module defines the FastAPI routes for monitoring the Eprice backend service. The endpoints report
+the state of shared resources, such as the database connection pool and the external API clients, for operations and debugging.
+
+The public /ready endpoint is the readiness probe: the service is ready as soon as the database answers,
+while the startup backfill of missing price data may still be running in the background.
+
+Routes:
+    - /ready
+    - /api/status/database
+    - /api/status/coverage
+    - /api/status/cache
+    - /api/status/upstream
+    - /api/status/ingestion
+"""
+
+import asyncio
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from repositories.database_pool import database_pool
+from utils.coverage_index import coverage_index
+from controllers.data_controller import price_data_service, fingrid_data_service
+from services.data_service import latest_price_cache
+from ext_apis.http_clients import fingrid_client, porssisahko_client
+from ext_apis.rate_limiter import fingrid_rate_limiter, porssisahko_rate_limiter
+from ext_apis.circuit_breaker import fingrid_circuit_breaker, porssisahko_circuit_breaker
+from scheduled_tasks.porssisahko_scheduler import price_backfill
+from scheduled_tasks.fingrid_scheduler import fingrid_ingestion
+from config.secrets import READINESS_TIMEOUT
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def get_readiness():
+    """
+    Report whether the service can serve requests, with the backfill state and dependency latency.
+
+    The database is pinged through the shared pool. The external APIs are not called; their latency
+    and circuit state come from the statistics of the recent requests, since an open circuit only
+    means responses are served from stored data.
+
+    Returns:
+        JSONResponse: 200 if the database answered within the readiness timeout, 503 otherwise, with
+            the database latency, the upstream circuit states and latencies and the backfill progress.
+    """
+    database = {"ok": True, "latencyMs": None, "error": None}
+    try:
+        latency = await asyncio.wait_for(database_pool.ping(), READINESS_TIMEOUT)
+        database["latencyMs"] = round(latency * 1000, 3)
+    except Exception as e:
+        database["ok"] = False
+        database["error"] = str(e) or type(e).__name__
+
+    upstreams = {}
+    for name, client, breaker in (("fingrid", fingrid_client, fingrid_circuit_breaker),
+                                  ("porssisahko", porssisahko_client, porssisahko_circuit_breaker)):
+        client_stats = client.stats()
+        upstreams[name] = {
+            "circuit": breaker.state,
+            "latencyAvgMs": client_stats["latencyAvgMs"],
+            "requests": client_stats["requests"],
+            "errors": client_stats["errors"],
+        }
+
+    return JSONResponse(
+        status_code=200 if database["ok"] else 503,
+        content={
+            "ready": database["ok"],
+            "database": database,
+            "upstreams": upstreams,
+            "backfill": price_backfill.stats(),
+        },
+    )
+
+
+@router.get("/api/status/database")
+async def get_database_status():
+    """
+    Get statistics of the shared database connection pool.
+
+    Returns:
+        dict: Pool size, idle connections, configured limits and acquire statistics.
+    """
+    return database_pool.stats()
+
+
+@router.get("/api/status/coverage")
+async def get_coverage_status():
+    """
+    Get statistics of the in-memory hourly coverage index.
+
+    Returns:
+        dict: Per dataset the load state, number of stored hours and bitmap size in bytes.
+    """
+    return coverage_index.stats()
+
+
+@router.get("/api/status/cache")
+async def get_cache_status():
+    """
+    Get statistics of the in-memory data caches.
+
+    Returns:
+        dict: Per cache the number of entries, limits, hit and miss counters and evictions, and
+            per service the number of coalesced calls.
+    """
+    return {
+        "priceDaySegments": price_data_service.day_segment_cache.stats(),
+        "latestPrices": latest_price_cache.stats(),
+        "priceSingleFlight": price_data_service.single_flight.stats(),
+        "fingridSingleFlight": fingrid_data_service.single_flight.stats(),
+        "fingridLatest": fingrid_data_service.latest_cache.stats(),
+    }
+
+
+@router.get("/api/status/upstream")
+async def get_upstream_status():
+    """
+    Get statistics of the pooled HTTP clients of the external APIs.
+
+    Returns:
+        dict: Per upstream the open state, connection limits and request statistics, and the state
+            of the rate limiters and circuit breakers.
+    """
+    return {
+        "fingrid": fingrid_client.stats(),
+        "porssisahko": porssisahko_client.stats(),
+        "fingridRateLimiter": fingrid_rate_limiter.stats(),
+        "porssisahkoRateLimiter": porssisahko_rate_limiter.stats(),
+        "fingridCircuitBreaker": fingrid_circuit_breaker.stats(),
+        "porssisahkoCircuitBreaker": porssisahko_circuit_breaker.stats(),
+    }
+
+
+@router.get("/api/status/ingestion")
+async def get_ingestion_status():
+    """
+    Get the state of the background data ingestion.
+
+    Returns:
+        dict: Per Fingrid dataset the runs, failures, last run and watermark of the scheduled
+            ingestion, and the progress of the startup price backfill.
+    """
+    return {
+        "fingrid": fingrid_ingestion.stats(),
+        "priceBackfill": price_backfill.stats(),
+    }
@@ -0,0 +1,196 @@
+"""
+circuit_breaker.py defines the CircuitBreaker class, which stops calling an external API that keeps failing.
+
+After `failure_threshold` consecutive failed calls the circuit opens: calls fail immediately with
+CircuitOpenError (503) instead of waiting for timeouts and retries, so request latency stays bounded
+while the upstream is down. After `reset_timeout` seconds the circuit is half-open and lets one
+trial call through; its success closes the circuit, its failure opens it again.
+
+While the circuit is not closed, the services serve what the database and caches have, flag the
+response as stale and schedule a background revalidation with `schedule_revalidation`, which runs
+when the next trial call is allowed.
+
+Failures are connection errors, timeouts, 5xx and 429 responses. Other client errors mean the
+upstream is reachable and count as successes.
+
+Intended Usage:
+- Wrap every upstream call, e.g. `await fingrid_circuit_breaker.call(lambda: self._send(url))`.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+import httpx
+from fastapi import HTTPException
+
+from config.secrets import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(HTTPException):
+    """
+    Raised instead of calling the upstream while its circuit is open.
+    """
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(
+            status_code=503,
+            detail=f"{name} API is unavailable (circuit open), next attempt in {retry_in:.0f} s."
+        )
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one external API.
+
+    Args:
+        name (str): Name of the upstream, used in errors, logs and statistics.
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial call is allowed.
+    """
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize a closed circuit.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._revalidations: dict[Hashable, asyncio.Task] = {}
+        self._opened = 0
+        self._rejected = 0
+        self._revalidated = 0
+
+    @property
+    def state(self) -> str:
+        """
+        str: 'closed', 'open' or 'half_open' (a trial call is allowed or in flight).
+        """
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def closed(self) -> bool:
+        """
+        bool: Whether the upstream is considered healthy.
+        """
+        return self._opened_at is None
+
+    def retry_in(self) -> float:
+        """
+        Return the seconds until a trial call is allowed (0 if calls are allowed now).
+        """
+        if self._opened_at is None:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call the upstream through the circuit.
+
+        Args:
+            fn (Callable[[], Awaitable[T]]): Creates the coroutine of the upstream call.
+
+        Returns:
+            T: The result of the call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with the trial call already in flight.
+            Exception: Whatever the call raises.
+        """
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            self._rejected += 1
+            raise CircuitOpenError(self.name, self.retry_in())
+        trial = state == "half_open"
+        if trial:
+            self._trial_in_flight = True
+        try:
+            result = await fn()
+        except Exception as e:
+            if self._is_failure(e):
+                self._record_failure()
+            else:
+                self._record_success()
+            raise
+        finally:
+            if trial:
+                self._trial_in_flight = False
+        self._record_success()
+        return result
+
+    def schedule_revalidation(self, key: Hashable, fn: Callable[[], Awaitable]):
+        """
+        Run a reload in the background as soon as the next trial call is allowed.
+
+        At most one revalidation per key is pending. Must be called in a running event loop.
+
+        Args:
+            key (Hashable): Identifies the reloaded data.
+            fn (Callable[[], Awaitable]): Creates the coroutine that reloads the data.
+        """
+        if key in self._revalidations:
+            return
+        task = asyncio.create_task(self._revalidate(fn))
+        self._revalidations[key] = task
+        task.add_done_callback(lambda _: self._revalidations.pop(key, None))
+
+    async def _revalidate(self, fn: Callable[[], Awaitable]):
+        await asyncio.sleep(self.retry_in())
+        try:
+            await fn()
+            self._revalidated += 1
+        except Exception as e:
+            print(f"Background revalidation from {self.name} failed: {e}")
+
+    @staticmethod
+    def _is_failure(error: Exception) -> bool:
+        if isinstance(error, (httpx.HTTPError, asyncio.TimeoutError)):
+            return True
+        if isinstance(error, HTTPException):
+            return error.status_code >= 500 or error.status_code == 429
+        return False
+
+    def _record_failure(self):
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                self._opened += 1
+                print(f"Circuit for {self.name} opened after {self._failures} consecutive failures.")
+            self._opened_at = time.monotonic()
+
+    def _record_success(self):
+        if self._opened_at is not None:
+            print(f"Circuit for {self.name} closed.")
+        self._failures = 0
+        self._opened_at = None
+
+    def stats(self) -> dict:
+        """
+        Return current circuit statistics.
+
+        Returns:
+            dict: State, consecutive failures, seconds until the next trial call, times opened,
+                rejected calls, pending and completed background revalidations.
+        """
+        return {
+            "state": self.state,
+            "failures": self._failures,
+            "retryInSeconds": round(self.retry_in(), 3),
+            "opened": self._opened,
+            "rejected": self._rejected,
+            "pendingRevalidations": len(self._revalidations),
+            "revalidated": self._revalidated,
+        }
+
+
+# Shared circuit breakers used by every fetcher of the upstream
+fingrid_circuit_breaker = CircuitBreaker("Fingrid", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+porssisahko_circuit_breaker = CircuitBreaker("Porssisahko", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
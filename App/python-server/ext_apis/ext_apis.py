@@ -7,12 +7,19 @@ and conversion of API responses into application models used by the backend.
 
 Dependencies:
     - httpx: For making asynchronous HTTP requests to external APIs.
+    - ext_apis.http_clients: For the pooled, long-lived HTTP client of each external API.
+    - utils.json_stream: For parsing paginated Fingrid responses while they are received.
+    - ext_apis.rate_limiter: For the shared token-bucket rate limits, Retry-After parsing and retry backoff.
+    - ext_apis.circuit_breaker: For failing fast while an external API is down.
     - python-dotenv: For loading environment variables (API keys) from .env files.
     - fastapi: For raising HTTPException on API errors.
     - models.data_model: For Pydantic data models used to structure API responses.
     - zoneinfo: For timezone-aware datetime handling.
     - datetime, typing, urllib.parse, os, asyncio: Standard library modules for time, typing, URL handling, environment, and async support.
 
+Functions:
+    - closest_data_point: Picks the Fingrid data point closest to a given time.
+
 Classes:
     - FetchFingridData: Fetches production and consumption data from the Fingrid API.
     - FetchPriceData: Fetches electricity price data from the Porssisähkö API.
@@ -21,169 +28,320 @@ Classes:
 from datetime import datetime, timezone, timedelta
 import httpx
 from urllib.parse import urlencode
-from typing import List
+from typing import Awaitable, Callable, List, Tuple, TypeVar
 from dotenv import load_dotenv
 import os
 from models.data_model import FingridDataPoint, PriceDataPoint, TimeRange 
 from zoneinfo import ZoneInfo
 from fastapi import HTTPException
+from ext_apis.http_clients import UpstreamClient, fingrid_client, porssisahko_client
+from ext_apis.circuit_breaker import CircuitBreaker, fingrid_circuit_breaker, porssisahko_circuit_breaker
+from ext_apis.rate_limiter import (
+    TokenBucket,
+    backoff_delay,
+    fingrid_rate_limiter,
+    porssisahko_rate_limiter,
+    retry_after_seconds,
+)
+from config.secrets import (
+    PORSSISAHKO_FETCH_CONCURRENCY,
+    FINGRID_MAX_RETRIES,
+    FINGRID_BACKOFF_BASE,
+    FINGRID_BACKOFF_MAX,
+    FINGRID_PAGE_SIZE,
+    FINGRID_FETCH_CONCURRENCY,
+    FINGRID_LATEST_WINDOW,
+    FINGRID_BASE_URL,
+    PORSSISAHKO_BASE_URL,
+)
+from utils.json_stream import StreamingArrayParser
 import asyncio
 
+T = TypeVar("T")
 
 load_dotenv(dotenv_path="./.env.local")
 FINGRID_API_KEY = os.getenv("FINGRID_API_KEY")
 
+def closest_data_point(points: List[FingridDataPoint], now: datetime) -> FingridDataPoint:
+    """
+    Pick the data point whose start or end time is closest to the given time.
+
+    Args:
+        points (List[FingridDataPoint]): The candidate data points.
+        now (datetime): The reference time (timezone-aware).
+
+    Returns:
+        FingridDataPoint: The closest data point.
+
+    Raises:
+        HTTPException: If there are no data points.
+    """
+    if not points:
+        raise HTTPException(status_code=500, detail="No data available from Fingrid API")
+    return min(points, key=lambda point: min(abs(point.startTime - now), abs(point.endTime - now)))
+
 class FetchFingridData:
     """
     Service for fetching electricity production and consumption data from the Fingrid API.
 
     Provides methods to fetch the latest data point or a range of data points for a given Fingrid dataset.
-    Handles API rate limiting, retries on failure, and parsing of the Fingrid API response into application models.
+    Ranges are fetched page by page and parsed while received. Every request goes through the
+    token-bucket rate limiter shared by all Fingrid callers. Throttled
+    requests (429 or 503 with Retry-After) pause the shared limiter, and server and connection errors
+    are retried with jittered exponential backoff. Calls fail fast while the shared circuit breaker is open.
     """
 
-    base_url = "https://data.fingrid.fi/api/datasets/"
+    base_url = f"{FINGRID_BASE_URL}/datasets/"
 
-    def __init__(self):
-        self._lock = asyncio.Lock()
-        self._last_call_time: datetime | None = None
-        self._sleep_time = 1.5
+    def __init__(self, http_client: UpstreamClient = fingrid_client, rate_limiter: TokenBucket = fingrid_rate_limiter,
+                 circuit_breaker: CircuitBreaker = fingrid_circuit_breaker):
+        """
+        Initialize the fetcher.
 
-    async def _rate_limiter(self):
-        async with self._lock:
-            if self._last_call_time:
-                elapsed = (datetime.now(timezone.utc)- self._last_call_time).total_seconds()
-                if elapsed < self._sleep_time:
-                    await asyncio.sleep(self._sleep_time - elapsed)
-            self._last_call_time = datetime.now(timezone.utc)
+        Args:
+            http_client (UpstreamClient): Pooled HTTP client of the Fingrid API. Defaults to the shared client.
+            rate_limiter (TokenBucket): Rate limiter of the Fingrid API. Defaults to the shared limiter.
+            circuit_breaker (CircuitBreaker): Circuit breaker of the Fingrid API. Defaults to the shared breaker.
+        """
+        self.http_client = http_client
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
 
-    async def fetch_fingrid_data(self, dataset_id: int) -> FingridDataPoint:
+    async def _request(self, url: str, dataset_id: int, read: Callable[[httpx.Response], Awaitable[T]]) -> T:
         """
-        Fetch the latest data point for a given Fingrid dataset ID.
+        Send a GET request to the Fingrid API through the circuit breaker.
 
         Args:
-            dataset_id (int): The Fingrid dataset ID.
+            url (str): The request URL.
+            dataset_id (int): The Fingrid dataset ID, used in error messages.
+            read (Callable[[httpx.Response], Awaitable[T]]): Reads the body of a successful response.
 
         Returns:
-            FingridDataPoint: The closest data point to the current time.
+            T: The result of `read`.
 
         Raises:
-            HTTPException: If the API call fails or no data is available.
+            HTTPException: If the request fails, or with status 503 if the circuit is open.
         """
-        await self._rate_limiter() 
-        url = f"{self.base_url}{dataset_id}/data"
-        headers = {}
-        if FINGRID_API_KEY is not None:
-            headers["x-api-key"] = FINGRID_API_KEY
-        max_retries = 3
-        retry_delay = 3
+        return await self.circuit_breaker.call(lambda: self._send(url, dataset_id, read))
+
+    async def _send(self, url: str, dataset_id: int, read: Callable[[httpx.Response], Awaitable[T]]) -> T:
+        """
+        Send a rate-limited GET request to the Fingrid API, retrying throttled and failed requests.
+
+        The response body is streamed: `read` consumes it while it arrives. Connection errors while
+        reading the body are retried like failed requests, with a fresh call of `read`.
 
-        for attempt in range(max_retries):
+        Args:
+            url (str): The request URL.
+            dataset_id (int): The Fingrid dataset ID, used in error messages.
+            read (Callable[[httpx.Response], Awaitable[T]]): Reads the body of a successful response.
+
+        Returns:
+            T: The result of `read`.
+
+        Raises:
+            HTTPException: If the request fails with a client error, or still fails after FINGRID_MAX_RETRIES retries.
+        """
+        headers = {"x-api-key": FINGRID_API_KEY} if FINGRID_API_KEY is not None else {}
+        attempts = FINGRID_MAX_RETRIES + 1
+
+        for attempt in range(attempts):
+            await self.rate_limiter.acquire()
             try:
-                async with httpx.AsyncClient() as client:
-                    # Remove any None values from headers to satisfy type checker
-                    clean_headers = {k: v for k, v in headers.items() if v is not None}
-                    response = await client.get(url, headers=clean_headers)
-                    response.raise_for_status()
-                    full_data = response.json()
-                    data = full_data.get("data", [])
-
-                    if not data:
-                        raise ValueError("No data available from Fingrid API")
-
-                    now = datetime.now(timezone.utc)
-
-                    def time_diff(item):
-                        start = datetime.fromisoformat(item["startTime"].replace("Z", "+00:00"))
-                        end = datetime.fromisoformat(item["endTime"].replace("Z", "+00:00"))
-                        return min(abs(start - now), abs(end - now))
-
-                    closest_item = min(data, key=time_diff)
-                    closest_item.pop("datasetId", None)
-                    return FingridDataPoint(**closest_item)
-
-            except httpx.HTTPStatusError as exc:
-                if attempt == max_retries - 1:
+                async with self.http_client.stream("GET", url, headers=headers) as response:
+                    if response.is_success:
+                        return await read(response)
+                    status_code = response.status_code
+                    retry_after = response.headers.get("retry-after")
+            except httpx.TransportError as exc:
+                if attempt == attempts - 1:
                     raise HTTPException(
-                        status_code=exc.response.status_code,
-                        detail=f"HTTP error while fetching data for dataset {dataset_id} from Fingrid API. Number of attempts: {attempt +1}"
+                        status_code=502,
+                        detail=f"Connection error while fetching data for dataset {dataset_id} from Fingrid API. Number of attempts: {attempt + 1}"
                     ) from exc
-                await asyncio.sleep(retry_delay)
+                await asyncio.sleep(backoff_delay(attempt, FINGRID_BACKOFF_BASE, FINGRID_BACKOFF_MAX))
+                continue
 
-            except Exception as e:
+            retryable = status_code == 429 or status_code >= 500
+            if not retryable or attempt == attempts - 1:
                 raise HTTPException(
-                    status_code=500,
-                    detail=f"Unexpected error fetching data for dataset {dataset_id} from Fingrid API."
-                ) from e
+                    status_code=status_code,
+                    detail=f"HTTP error while fetching data for dataset {dataset_id} from Fingrid API. Number of attempts: {attempt + 1}"
+                )
+
+            delay = retry_after_seconds(retry_after)
+            if status_code == 429 or delay is not None:
+                # Throttled: hold back every caller of the shared limiter, not only this one
+                delay = delay if delay is not None else backoff_delay(attempt, FINGRID_BACKOFF_BASE, FINGRID_BACKOFF_MAX)
+                print(f"Fingrid API throttled dataset {dataset_id} ({status_code}), pausing requests for {delay:.1f} s.")
+                self.rate_limiter.pause(delay)
+            else:
+                await asyncio.sleep(backoff_delay(attempt, FINGRID_BACKOFF_BASE, FINGRID_BACKOFF_MAX))
+
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to fetch data for dataset {dataset_id} from Fingrid API after {max_retries} attempts."
+            detail=f"Failed to fetch data for dataset {dataset_id} from Fingrid API after {attempts} attempts."
         )
-        
+
+    async def fetch_fingrid_data(self, dataset_id: int) -> FingridDataPoint:
+        """
+        Fetch the latest data point for a given Fingrid dataset ID.
+
+        Args:
+            dataset_id (int): The Fingrid dataset ID.
+
+        Returns:
+            FingridDataPoint: The closest data point to the current time.
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        return closest_data_point(await self.fetch_fingrid_data_window(dataset_id), datetime.now(timezone.utc))
+
+    async def fetch_fingrid_data_window(self, dataset_id: int) -> List[FingridDataPoint]:
+        """
+        Fetch the data points of a Fingrid dataset in a narrow window around the current time.
+
+        Only FINGRID_LATEST_WINDOW seconds before and after now are requested, on one page of up to
+        FINGRID_PAGE_SIZE data points. If the dataset has no data in the window, e.g. because
+        publishing is delayed, the dataset's default (most recent) page is used instead.
+
+        Args:
+            dataset_id (int): The Fingrid dataset ID.
+
+        Returns:
+            List[FingridDataPoint]: The data points, sorted by start time.
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        async def read(response: httpx.Response) -> dict:
+            await response.aread()
+            return response.json()
+
+        now = datetime.now(timezone.utc)
+        query_params = {
+            "startTime": (now - timedelta(seconds=FINGRID_LATEST_WINDOW)).isoformat().replace("+00:00", "Z"),
+            "endTime": (now + timedelta(seconds=FINGRID_LATEST_WINDOW)).isoformat().replace("+00:00", "Z"),
+            "sortBy": "startTime",
+            "sortOrder": "asc",
+            # The API returns 10 data points per page by default, too few for the window at a fine resolution
+            "pageSize": str(FINGRID_PAGE_SIZE),
+        }
+        url = f"{self.base_url}{dataset_id}/data"
+        full_data = await self._request(f"{url}?{urlencode(query_params)}", dataset_id, read)
+        if not full_data.get("data"):
+            full_data = await self._request(url, dataset_id, read)
+
+        try:
+            data = full_data.get("data", [])
+
+            if not data:
+                raise ValueError("No data available from Fingrid API")
+
+            for item in data:
+                item.pop("datasetId", None)
+            return sorted((FingridDataPoint(**item) for item in data), key=lambda point: point.startTime)
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unexpected error fetching data for dataset {dataset_id} from Fingrid API."
+            ) from e
 
     async def fetch_fingrid_data_range(self, dataset_id: int, time_range: TimeRange) -> List[FingridDataPoint]:
         """
         Fetch a list of data points for a given Fingrid dataset ID and time range,
         but return only data points that are aligned with full hours (e.g., 13:00, 14:00).
 
+        The range is fetched in pages of FINGRID_PAGE_SIZE data points. The first page tells the
+        number of pages; the rest are fetched concurrently (at most FINGRID_FETCH_CONCURRENCY at a
+        time, within the shared rate limit). Every page is parsed while it is received, and only
+        the hour-aligned points are kept, so the full-resolution data is never held in memory.
+
         Args:
             dataset_id (int): The Fingrid dataset ID.
             time_range (TimeRange): Time range with startTime and endTime (both in UTC).
 
         Returns:
             List[FingridDataPoint]: Filtered list of data points for the specified range.
-        """
-        headers = {"x-api-key": FINGRID_API_KEY} if FINGRID_API_KEY is not None else {}
-        headers = {k: v for k, v in headers.items() if v is not None}
-        url = f"{self.base_url}{dataset_id}/data"
 
+        Raises:
+            HTTPException: If the API call fails; the remaining page requests are cancelled.
+        """
         query_params = {
             "startTime": time_range.startTime.isoformat().replace("+00:00", "Z"),
             "endTime": time_range.endTime.isoformat().replace("+00:00", "Z"),
             "sortBy": "startTime",
             "sortOrder": "asc",
-            "pageSize": "20000"
+            "pageSize": str(FINGRID_PAGE_SIZE),
         }
 
-        url = f"{url}?{urlencode(query_params)}"
-        max_retries = 3
-        retry_delay = 1
+        points, pagination = await self._fetch_range_page(dataset_id, query_params, 1)
+        last_page = pagination.get("lastPage") or 1
+        if last_page <= 1:
+            return points
 
-        for attempt in range(max_retries):
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(url, headers=headers)
-                    response.raise_for_status()
-                    full_data = response.json()
-                    data = full_data.get("data", [])
-
-                    filtered_points = []
-                    for item in data:
-                        item.pop("datasetId", None)
-                        start_dt = datetime.fromisoformat(item["startTime"].replace("Z", "+00:00"))
+        semaphore = asyncio.Semaphore(FINGRID_FETCH_CONCURRENCY)
 
-                        if start_dt.minute == 0 and start_dt.second == 0:
-                            filtered_points.append(FingridDataPoint(**item))
+        async def fetch(page: int) -> List[FingridDataPoint]:
+            async with semaphore:
+                page_points, _ = await self._fetch_range_page(dataset_id, query_params, page)
+                return page_points
 
-                    return filtered_points
+        tasks = [asyncio.ensure_future(fetch(page)) for page in range(2, last_page + 1)]
+        try:
+            for page_points in await asyncio.gather(*tasks):
+                points.extend(page_points)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return points
+
+    async def _fetch_range_page(self, dataset_id: int, query_params: dict, page: int) -> Tuple[List[FingridDataPoint], dict]:
+        """
+        Fetch one page of a range and keep the hour-aligned data points.
 
-            except httpx.HTTPStatusError as exc:
-                if attempt == max_retries - 1:
-                    raise HTTPException(
-                        status_code=exc.response.status_code,
-                        detail=f"HTTP error while fetching data for dataset {dataset_id} from Fingrid API. Number of attempts: {attempt + 1}"
-                    ) from exc
-                await asyncio.sleep(retry_delay)
+        Args:
+            dataset_id (int): The Fingrid dataset ID.
+            query_params (dict): Query parameters of the range, without the page number.
+            page (int): The page number, starting from 1.
+
+        Returns:
+            Tuple[List[FingridDataPoint], dict]: The hour-aligned data points of the page and the
+                pagination metadata of the response (empty if missing).
+
+        Raises:
+            HTTPException: If the API call fails or the response cannot be parsed.
+        """
+        url = f"{self.base_url}{dataset_id}/data?{urlencode({**query_params, 'page': page})}"
 
+        async def read(response: httpx.Response) -> Tuple[List[FingridDataPoint], dict]:
+            parser = StreamingArrayParser("data")
+            points = []
+
+            def keep(items: list):
+                for item in items:
+                    start_dt = datetime.fromisoformat(item["startTime"].replace("Z", "+00:00"))
+                    if start_dt.minute == 0 and start_dt.second == 0:
+                        item.pop("datasetId", None)
+                        points.append(FingridDataPoint(**item))
+
+            try:
+                async for chunk in response.aiter_text():
+                    keep(parser.feed(chunk))
+                keep(parser.close())
+            except httpx.TransportError:
+                raise
             except Exception as e:
                 raise HTTPException(
                     status_code=500,
                     detail=f"Unexpected error fetching data for dataset {dataset_id} from Fingrid API."
                 ) from e
+            return points, parser.fields.get("pagination") or {}
 
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to fetch data for dataset {dataset_id} from Fingrid API after {max_retries} attempts."
-        )
+        return await self._request(url, dataset_id, read)
 
 class FetchPriceData:
     """
@@ -193,15 +351,36 @@ class FetchPriceData:
     Handles API requests, error handling, and conversion of API responses into application models.
     """
 
-    base_url = "https://api.porssisahko.net/v1/price.json"
+    base_url = f"{PORSSISAHKO_BASE_URL}/price.json"
+    latest_url = f"{PORSSISAHKO_BASE_URL}/latest-prices.json"
+
+    def __init__(self, http_client: UpstreamClient = porssisahko_client, rate_limiter: TokenBucket = porssisahko_rate_limiter,
+                 circuit_breaker: CircuitBreaker = porssisahko_circuit_breaker):
+        """
+        Initialize the fetcher.
+
+        Args:
+            http_client (UpstreamClient): Pooled HTTP client of the Porssisähkö API. Defaults to the shared client.
+            rate_limiter (TokenBucket): Rate limiter of the Porssisähkö API. Defaults to the shared limiter.
+            circuit_breaker (CircuitBreaker): Circuit breaker of the Porssisähkö API. Defaults to the shared breaker.
+        """
+        self.http_client = http_client
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
 
-    async def fetch_price_data_range(self, time_range: TimeRange) -> List[PriceDataPoint]:
+    async def fetch_price_data_range(self, time_range: TimeRange, fetched: List[PriceDataPoint] | None = None) -> List[PriceDataPoint]:
         """
         Fetch hourly electricity price data for a given time range from the Porssisähkö API.
 
+        The fetch is planned to use as few requests as possible: if the range overlaps the window of
+        latest-prices.json (yesterday to tomorrow in Helsinki time), those hours come from one bulk
+        request. The remaining hours are requested one by one, concurrently under a semaphore and the
+        shared rate limiter.
+
         Args:
-            start_time (datetime): Start time in UTC.
-            end_time (datetime): End time in UTC.
+            time_range (TimeRange): Start and end time (inclusive) in UTC.
+            fetched (List[PriceDataPoint] | None): Collects the data points as they arrive (modified in
+                place), so the caller keeps the hours fetched before a failure.
 
         Returns:
             List[PriceDataPoint]: A list of PriceDataPoint objects with 'startDate' (UTC RFC3339 string) and 'price' (float) for each hour.
@@ -209,45 +388,105 @@ class FetchPriceData:
         Raises:
             HTTPException: If the API call fails or no data is available.
         """
-        result = []
+        hours = []
         current_time = time_range.startTime
-        end_time = time_range.endTime
-        
-        while current_time <= end_time:
-            # Queries to the Pörssisähko API are in Europe/Helsinki timezone
-            hki_time = current_time.astimezone(ZoneInfo("Europe/Helsinki"))
-            date_str = hki_time.strftime("%Y-%m-%d")
-            hour_str = hki_time.strftime("%H")
-            url = f"{self.base_url}?{urlencode({'date': date_str, 'hour': hour_str})}"
+        while current_time <= time_range.endTime:
+            hours.append(current_time)
+            current_time += timedelta(hours=1)
 
+        result = [] if fetched is None else fetched
+        if hours and self._overlaps_latest_window(hours[0], hours[-1]):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                    if not data:
-                        raise ValueError(f"No price data returned for {date_str} {hour_str}")
-                    # Convert to PriceDataPoint
-                    result.append(
-                        PriceDataPoint(
-                            startDate=datetime.strptime(current_time.strftime("%Y-%m-%dT%H:%M:%SZ"), "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc),
-                            price=data["price"]
-                        )
-                    )
-            except httpx.HTTPStatusError as exc:
-                raise HTTPException(
-                    status_code=exc.response.status_code,
-                    detail=f"HTTP error while fetching price data from Porssisahko: {exc.response.status_code}: {exc.response.text}"
-                ) from exc
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Unexpected error occurred while fetching data from Porssisahko: {str(e)}"
-                ) from e
+                latest = await self.fetch_price_data_latest()
+                requested = {hour.timestamp() for hour in hours}
+                result.extend(point for point in latest if point.startDate.timestamp() in requested)
+                covered = {point.startDate.timestamp() for point in result}
+                hours = [hour for hour in hours if hour.timestamp() not in covered]
+            except HTTPException as e:
+                print(f"Latest prices unavailable, fetching hour by hour: {e.detail}")
+
+        await self._fetch_price_hours(hours, result)
+        return sorted(result, key=lambda x: x.startDate)
 
-            current_time += timedelta(hours=1)
+    async def _fetch_price_hours(self, hours: List[datetime], fetched: List[PriceDataPoint]):
+        """
+        Fetch the prices of single hours concurrently.
 
-        return sorted(result, key=lambda x: x.startDate)
+        Args:
+            hours (List[datetime]): Start times of the hours.
+            fetched (List[PriceDataPoint]): Collects the data points as they arrive (modified in place).
+
+        Raises:
+            HTTPException: If any of the requests fails; the remaining requests are cancelled, and the
+                hours that completed before stay in `fetched`.
+        """
+        semaphore = asyncio.Semaphore(PORSSISAHKO_FETCH_CONCURRENCY)
+
+        async def fetch(hour: datetime):
+            async with semaphore:
+                fetched.append(await self.circuit_breaker.call(lambda: self._fetch_price_hour(hour)))
+
+        if hours and not self.circuit_breaker.closed:
+            # The first hour is the trial call of the half-open circuit; fetched alone, it is not
+            # cancelled when the concurrent calls of the other hours are rejected
+            await fetch(hours[0])
+            hours = hours[1:]
+
+        tasks = [asyncio.ensure_future(fetch(hour)) for hour in hours]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _fetch_price_hour(self, current_time: datetime) -> PriceDataPoint:
+        """
+        Fetch the price of one hour.
+
+        Args:
+            current_time (datetime): Start time of the hour.
+
+        Returns:
+            PriceDataPoint: The price data point.
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        # Queries to the Pörssisähko API are in Europe/Helsinki timezone
+        hki_time = current_time.astimezone(ZoneInfo("Europe/Helsinki"))
+        date_str = hki_time.strftime("%Y-%m-%d")
+        hour_str = hki_time.strftime("%H")
+        url = f"{self.base_url}?{urlencode({'date': date_str, 'hour': hour_str})}"
+
+        await self.rate_limiter.acquire()
+        try:
+            response = await self.http_client.get(url)
+            response.raise_for_status()
+            data = response.json()
+            if not data:
+                raise ValueError(f"No price data returned for {date_str} {hour_str}")
+            # Convert to PriceDataPoint
+            return PriceDataPoint(
+                startDate=datetime.strptime(current_time.strftime("%Y-%m-%dT%H:%M:%SZ"), "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc),
+                price=data["price"]
+            )
+        except httpx.HTTPStatusError as exc:
+            raise HTTPException(
+                status_code=exc.response.status_code,
+                detail=f"HTTP error while fetching price data from Porssisahko: {exc.response.status_code}: {exc.response.text}"
+            ) from exc
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unexpected error occurred while fetching data from Porssisahko: {str(e)}"
+            ) from e
+
+    @staticmethod
+    def _overlaps_latest_window(first: datetime, last: datetime) -> bool:
+        # latest-prices.json holds 48 hours: today and either yesterday or tomorrow (Helsinki time)
+        today_start = datetime.now(ZoneInfo("Europe/Helsinki")).replace(hour=0, minute=0, second=0, microsecond=0)
+        return last >= today_start - timedelta(days=1) and first < today_start + timedelta(days=2)
 
 
     async def fetch_price_data_latest(self) -> List[PriceDataPoint]:
@@ -259,20 +498,21 @@ class FetchPriceData:
                 The 'endDate' key is removed from each dictionary.
 
         Raises:
-            HTTPException: If the API call fails or no data is available.
+            HTTPException: If the API call fails or no data is available, or with status 503 if the circuit is open.
         """
-        url = "https://api.porssisahko.net/v1/latest-prices.json"
+        return await self.circuit_breaker.call(self._fetch_price_data_latest)
 
+    async def _fetch_price_data_latest(self) -> List[PriceDataPoint]:
+        await self.rate_limiter.acquire()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()["prices"]
+            response = await self.http_client.get(self.latest_url)
+            response.raise_for_status()
+            data = response.json()["prices"]
 
-                for item in data:
-                    item.pop("endDate", None)
+            for item in data:
+                item.pop("endDate", None)
 
-                return [PriceDataPoint(**item) for item in sorted(data, key=lambda x: x["startDate"])]
+            return [PriceDataPoint(**item) for item in sorted(data, key=lambda x: x["startDate"])]
 
         except httpx.HTTPStatusError as exc:
             raise HTTPException(
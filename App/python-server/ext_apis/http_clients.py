@@ -0,0 +1,205 @@
+"""
+http_clients.py defines the UpstreamClient class, a long-lived pooled HTTP client per external API.
+
+Each upstream (Fingrid, Porssisahko) gets one httpx.AsyncClient that is created once in the application
+lifespan and shared by the fetchers and the scheduled tasks, so consecutive calls reuse kept-alive
+connections instead of redoing DNS, TCP and TLS for every request.
+
+Features:
+- Configurable connection limits, keep-alive expiry and timeouts.
+- Optional HTTP/2 when the `h2` package is installed (httpx[http2]); falls back to HTTP/1.1 otherwise.
+- Request statistics (requests, errors, latency) for monitoring.
+- Lazy opening on first use, so the fetchers also work outside the FastAPI lifespan.
+
+Dependencies:
+- httpx for the underlying client and connection pool.
+- config.secrets for the connection pool and timeout settings.
+
+Intended Usage:
+- Open with `await client.open()` on startup and close with `await client.close()` on shutdown.
+- Use `fingrid_client` and `porssisahko_client`, e.g. `response = await porssisahko_client.get(url)`, or
+  `async with fingrid_client.stream("GET", url) as response:` to process a large body while it arrives.
+"""
+
+import importlib.util
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from config.secrets import (
+    UPSTREAM_MAX_CONNECTIONS,
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+    UPSTREAM_KEEPALIVE_EXPIRY,
+    UPSTREAM_CONNECT_TIMEOUT,
+    UPSTREAM_READ_TIMEOUT,
+    UPSTREAM_HTTP2,
+)
+
+
+class UpstreamClient:
+    """
+    Shared httpx.AsyncClient of one external API with request statistics.
+
+    Args:
+        name (str): Name of the upstream, used in logs and statistics.
+        max_connections (int): Maximum number of concurrent connections.
+        max_keepalive_connections (int): Maximum number of idle connections kept open.
+        keepalive_expiry (float): Seconds after which idle connections are closed.
+        connect_timeout (float): Seconds to wait for a connection.
+        read_timeout (float): Seconds to wait for response data.
+        http2 (bool): Whether to negotiate HTTP/2 (requires the `h2` package).
+    """
+    def __init__(self, name: str, max_connections: int = 10, max_keepalive_connections: int = 5,
+                 keepalive_expiry: float = 30.0, connect_timeout: float = 5.0, read_timeout: float = 20.0,
+                 http2: bool = False):
+        """
+        Initialize the UpstreamClient. The client itself is created on `open()` or on first use.
+        """
+        self.name = name
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.http2 = http2
+        self._client: httpx.AsyncClient | None = None
+        self._requests = 0
+        self._errors = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    async def open(self):
+        """
+        Create the HTTP client if it is not open yet.
+        """
+        self._ensure_client()
+
+    async def close(self):
+        """
+        Close the HTTP client and all of its connections.
+        """
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+            print(f"HTTP client for {self.name} closed.")
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a GET request through the shared client.
+
+        Args:
+            url (str): The request URL.
+            **kwargs: Further arguments of httpx.AsyncClient.get, e.g. headers or params.
+
+        Returns:
+            httpx.Response: The response. Status errors are not raised here.
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+        """
+        client = self._ensure_client()
+        started = time.perf_counter()
+        try:
+            return await client.get(url, **kwargs)
+        except httpx.HTTPError:
+            self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._requests += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request through the shared client without reading the response body.
+
+        The body is read inside the context, e.g. with `response.aiter_text()`, and the connection
+        is returned to the pool when the context exits.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The request URL.
+            **kwargs: Further arguments of httpx.AsyncClient.stream, e.g. headers or params.
+
+        Yields:
+            httpx.Response: The response with an unread body. Status errors are not raised here.
+
+        Raises:
+            httpx.HTTPError: If the request or reading the body fails.
+        """
+        client = self._ensure_client()
+        started = time.perf_counter()
+        try:
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+        except httpx.HTTPError:
+            self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._requests += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+
+    def stats(self) -> dict:
+        """
+        Return current client statistics.
+
+        Returns:
+            dict: Open state, protocol settings, limits and request statistics.
+        """
+        return {
+            "open": self._client is not None,
+            "http2": self.http2,
+            "maxConnections": self.limits.max_connections,
+            "maxKeepaliveConnections": self.limits.max_keepalive_connections,
+            "requests": self._requests,
+            "errors": self._errors,
+            "latencyAvgMs": round(self._latency_total / self._requests * 1000, 3) if self._requests else None,
+            "latencyMaxMs": round(self._latency_max * 1000, 3),
+        }
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            http2 = self.http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                print(f"HTTP/2 requested for {self.name} but the h2 package is not installed, using HTTP/1.1.")
+                http2 = False
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=http2)
+            print(f"HTTP client for {self.name} opened (max_connections={self.limits.max_connections}, http2={http2}).")
+        return self._client
+
+
+def create_upstream_client(name: str) -> UpstreamClient:
+    """
+    Create an UpstreamClient with the configured settings.
+
+    Used for the module-level shared clients of the upstreams, which the fetchers and the scheduled
+    jobs (running on the application's event loop) share, and by the benchmarks for a client of
+    their own.
+
+    Args:
+        name (str): Name of the upstream.
+
+    Returns:
+        UpstreamClient: The client (not yet opened).
+    """
+    return UpstreamClient(
+        name,
+        max_connections=UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+        connect_timeout=UPSTREAM_CONNECT_TIMEOUT,
+        read_timeout=UPSTREAM_READ_TIMEOUT,
+        http2=UPSTREAM_HTTP2,
+    )
+
+
+# Shared clients used by the fetchers and the scheduled tasks
+fingrid_client = create_upstream_client("Fingrid")
+porssisahko_client = create_upstream_client("Porssisahko")
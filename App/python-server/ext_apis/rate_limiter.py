@@ -0,0 +1,170 @@
+"""
+rate_limiter.py defines the TokenBucket class, an async token-bucket rate limiter for calls to the external APIs,
+and helpers for retrying throttled or failed requests.
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per second. Every request takes one
+token; when the bucket is empty, callers wait in FIFO order until a token is available, so bursts up to
+the capacity go out immediately and the sustained request rate never exceeds the configured rate.
+When the upstream throttles (HTTP 429 with Retry-After), the bucket is paused, so every caller sharing
+it waits instead of only the one that was throttled.
+
+Features:
+- FIFO waiting, so concurrent callers are served in arrival order.
+- Pausing on upstream throttling.
+- Statistics (acquired tokens, queue depth, wait times, throttling) for monitoring.
+- Retry-After parsing and jittered exponential backoff delays.
+
+Intended Usage:
+- Share one bucket per upstream, e.g. `await fingrid_rate_limiter.acquire()` before each request.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from config.secrets import PORSSISAHKO_RATE_LIMIT, PORSSISAHKO_RATE_BURST, FINGRID_RATE_LIMIT, FINGRID_RATE_BURST
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Args:
+        rate (float): Tokens added per second (the sustained request rate).
+        capacity (float): Maximum number of tokens (the burst size).
+    """
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+        self._acquired = 0
+        self._delayed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._paused_until = 0.0
+        self._throttled = 0
+
+    async def acquire(self):
+        """
+        Take one token, waiting until one is available.
+        """
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            # The lock makes waiters queue in arrival order
+            async with self._lock:
+                self._refill()
+                # Re-checked after every sleep, so a pause that started meanwhile is waited for too
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self._waiting -= 1
+        waited = time.monotonic() - started
+        self._acquired += 1
+        if waited > 0.001:
+            self._delayed += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for a number of seconds, e.g. after the upstream answered 429.
+
+        The bucket is emptied, so after the pause requests resume at the sustained rate instead of
+        with a burst.
+
+        Args:
+            seconds (float): Length of the pause.
+        """
+        until = time.monotonic() + seconds
+        self._throttled += 1
+        if until > self._paused_until:
+            self._paused_until = until
+            self._refill()
+            # The bucket is emptied and the refill starts only when the pause ends: with _updated in
+            # the future, _refill() makes the tokens negative until then, so acquire() waits it out
+            self._tokens = min(self._tokens, 0)
+            self._updated = until
+
+    def stats(self) -> dict:
+        """
+        Return current limiter statistics.
+
+        Returns:
+            dict: Configured rate and capacity, available tokens, waiting callers (queue depth), wait
+                statistics, number of throttling pauses and the remaining pause.
+        """
+        self._refill()
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self._tokens, 3),
+            "waiting": self._waiting,
+            "acquired": self._acquired,
+            "delayed": self._delayed,
+            "waitAvgMs": round(self._wait_total / self._acquired * 1000, 3) if self._acquired else None,
+            "waitMaxMs": round(self._wait_max * 1000, 3),
+            "throttled": self._throttled,
+            "pausedForMs": round(max(self._paused_until - time.monotonic(), 0) * 1000, 3),
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+def retry_after_seconds(retry_after: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        retry_after (Optional[str]): The header value, either delay seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Return a jittered exponential backoff delay ("full jitter").
+
+    Args:
+        attempt (int): Number of the failed attempt, starting from 0.
+        base (float): Delay of the first retry in seconds before jitter.
+        cap (float): Maximum delay in seconds before jitter.
+
+    Returns:
+        float: A random delay between 0 and min(cap, base * 2 ** attempt) seconds.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# Shared limiters used by every fetcher of the upstream
+porssisahko_rate_limiter = TokenBucket(PORSSISAHKO_RATE_LIMIT, PORSSISAHKO_RATE_BURST)
+fingrid_rate_limiter = TokenBucket(FINGRID_RATE_LIMIT, FINGRID_RATE_BURST)
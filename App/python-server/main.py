@@ -2,17 +2,19 @@
 main.py initializes and configures the FastAPI application for the Eprice backend.
 
 Features:
-- Sets up application lifespan events for startup and shutdown, including checking and inserting missing price data on startup.
+- Sets up application lifespan events for startup and shutdown, including opening the shared database pool and the pooled HTTP clients of the external APIs, loading the hourly coverage index and starting the background backfill of missing price data.
 - Registers custom exception handlers for request validation errors.
 - Configures CORS middleware for frontend and test environments.
-- Includes routers for authentication and external API endpoints.
+- Includes routers for authentication, external API, status and export endpoints.
 - Adds JWT authentication middleware for protected routes.
-- Integrates scheduled tasks and ensures graceful shutdown of background schedulers.
+- Starts the scheduled tasks, including the incremental Fingrid ingestion, on the application's event loop and ensures graceful shutdown of the scheduler.
 
 Dependencies:
 - fastapi for API framework and routing.
 - fastapi.middleware.cors for CORS configuration.
 - controllers for API route definitions.
+- repositories.database_pool for the shared database connection pool.
+- ext_apis.http_clients for the pooled HTTP clients of the external APIs.
 - scheduled_tasks for background data synchronization.
 - config for application and secret settings.
 - models.custom_exception for custom error handling.
@@ -27,11 +29,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from controllers.auth_controller import router as auth_router
 from controllers.auth_controller import create_jwt_middleware
 from controllers.data_controller import router as external_api_router
+from controllers.data_controller import price_data_service, fingrid_data_service
+from controllers.status_controller import router as status_router
+from controllers.export_controller import router as export_router
+from repositories.database_pool import database_pool
+from ext_apis.http_clients import fingrid_client, porssisahko_client
 
-from scheduled_tasks.porssisahko_scheduler import shutdown_scheduler, fetch_and_insert_missing_porssisahko_data
+from scheduled_tasks.porssisahko_scheduler import ps_scheduler, start_scheduler, shutdown_scheduler, start_backfill, stop_backfill
+from scheduled_tasks.fingrid_scheduler import schedule_fingrid_ingestion
 
 import config
-from config.secrets import public_routes
+from config.secrets import public_routes, FINGRID_DATASET_IDS, PRICE_BACKFILL_START
 
 from models.custom_exception import custom_validation_exception_handler
 from fastapi.exceptions import RequestValidationError
@@ -43,7 +51,7 @@ async def lifespan(app: FastAPI):
     """
     Lifespan event handler for the FastAPI application.
     This function is called when the application starts up and shuts down.
-    It is used to perform startup tasks, such as checking for missing data.
+    It is used to perform startup tasks, such as starting the background backfill of missing data.
     On shutdown, it ensures scheduled tasks are properly terminated.
 
     Args:
@@ -51,17 +59,32 @@ async def lifespan(app: FastAPI):
     """
 
     # Startup code
-    print("Server is starting... Checking for missing data.")
-    start_datetime = "2025-05-12T23:00:00"
-    await fetch_and_insert_missing_porssisahko_data(start_datetime)
-    print("Server started and missing data checked.")
+    await database_pool.open()
+    await fingrid_client.open()
+    await porssisahko_client.open()
+    await price_data_service.load_coverage_index()
+    await fingrid_data_service.load_coverage_index(FINGRID_DATASET_IDS)
+    fingrid_data_service.latest_cache.start()
+    # The missing data is backfilled in the background, so the server serves immediately; /ready reports the progress
+    start_backfill(PRICE_BACKFILL_START)
+    # Fingrid datasets are ingested incrementally, so range queries rarely wait for the Fingrid API
+    schedule_fingrid_ingestion(ps_scheduler)
+    start_scheduler()
+    print("Server started, missing data is being checked in the background.")
     yield
     # Shutdown code
     shutdown_scheduler()
+    await stop_backfill()
+    await fingrid_data_service.latest_cache.stop()
+    await fingrid_client.close()
+    await porssisahko_client.close()
+    await database_pool.close()
 
 app = FastAPI(lifespan=lifespan)
 app.add_exception_handler(RequestValidationError, custom_validation_exception_handler)
 app.include_router(external_api_router)
+app.include_router(status_router)
+app.include_router(export_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -8,6 +8,7 @@ and utility base classes for datetime validation.
 
 from pydantic import BaseModel, Field, field_validator, field_serializer, model_validator
 from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from zoneinfo import ZoneInfo
 
 
@@ -132,6 +133,87 @@ class PriceDataPoint(BaseModel):
         dt_utc = dt.astimezone(timezone.utc)
         return dt_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
 
+class ColumnarSeries(BaseModel):
+    """
+    Model representing an hourly series in the compact columnar format of the range endpoints.
+
+    Value i belongs to the hour starting at start + i * stepSeconds. Hours without data are null
+    in values and their indexes are listed in missing.
+
+    Attributes:
+        start (datetime): Start of the first hour, returned as a UTC datetime string in RFC 3339 format.
+        stepSeconds (int): Length of one step in seconds.
+        values (List[Optional[float]]): One value per step, null if the hour has no data.
+        missing (List[int]): Indexes of the steps without data, in ascending order.
+    """
+    start: datetime = Field(
+        description="Start of the first hour as a UTC datetime string in RFC 3339 format.",
+        examples=["2025-06-01T21:00:00Z"]
+    )
+    stepSeconds: int = Field(
+        description="Length of one step in seconds.",
+        examples=[3600]
+    )
+    values: List[Optional[float]] = Field(
+        description="One value per step, null if the hour has no data.",
+        examples=[[0.61, 0.58, None, 0.73]]
+    )
+    missing: List[int] = Field(
+        description="Indexes of the steps without data, in ascending order.",
+        examples=[[2]]
+    )
+
+class SnapshotSeries(BaseModel):
+    """
+    Model representing the values of one dataset in a grid snapshot.
+
+    Attributes:
+        values (List[Optional[float]]): One value per step of the snapshot's time axis, null if the hour has no data.
+        missing (List[int]): Indexes of the steps without data, in ascending order.
+    """
+    values: List[Optional[float]] = Field(
+        description="One value per step of the time axis, null if the hour has no data.",
+        examples=[[7883.61, 7702.4, None]]
+    )
+    missing: List[int] = Field(
+        description="Indexes of the steps without data, in ascending order.",
+        examples=[[2]]
+    )
+
+class GridSnapshot(BaseModel):
+    """
+    Model representing several datasets over one time range on a shared hourly time axis.
+
+    Value i of every series belongs to the hour starting at start + i * stepSeconds. Datasets that
+    could not be loaded are left out of series and listed in errors.
+
+    Attributes:
+        start (datetime): Start of the first hour, returned as a UTC datetime string in RFC 3339 format.
+        stepSeconds (int): Length of one step in seconds.
+        length (int): Number of steps on the time axis.
+        series (Dict[str, SnapshotSeries]): Values per dataset name.
+        errors (Dict[str, str]): Error message per dataset that could not be loaded.
+    """
+    start: datetime = Field(
+        description="Start of the first hour as a UTC datetime string in RFC 3339 format.",
+        examples=["2025-06-01T21:00:00Z"]
+    )
+    stepSeconds: int = Field(
+        description="Length of one step in seconds.",
+        examples=[3600]
+    )
+    length: int = Field(
+        description="Number of steps on the time axis.",
+        examples=[24]
+    )
+    series: Dict[str, SnapshotSeries] = Field(
+        description="Values per dataset name (windpower, consumption, production, price)."
+    )
+    errors: Dict[str, str] = Field(
+        description="Error message per dataset that could not be loaded.",
+        examples=[{}]
+    )
+
 class HourlyAvgPricePoint(BaseModel):
     """
     Model representing an hourly average price point.
@@ -0,0 +1,166 @@
+"""
+database_pool.py defines the DatabasePool class, a shared asyncpg connection pool for the Eprice backend.
+
+The pool is created once in the application lifespan and injected into every repository, so
+queries borrow an already authenticated connection instead of opening a new one per call.
+
+Features:
+- Configurable minimum and maximum pool size, acquire timeout and idle connection lifetime.
+- Acquire statistics (acquire count, timeouts, wait times) for monitoring.
+- A round-trip ping for readiness checks.
+- Lazy opening on first use, so repositories also work outside the FastAPI lifespan.
+
+Dependencies:
+- asyncpg for the underlying connection pool.
+- config.secrets for the database URL and pool settings.
+
+Intended Usage:
+- Open with `await database_pool.open()` on startup and close with `await database_pool.close()` on shutdown.
+- Pass `database_pool` to repository constructors and use `async with self.database_pool.acquire() as conn:`.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from config.secrets import (
+    DATABASE_URL,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_ACQUIRE_TIMEOUT,
+    DB_POOL_MAX_INACTIVE_LIFETIME,
+)
+
+
+class DatabasePool:
+    """
+    Shared asyncpg connection pool with acquire statistics.
+
+    Args:
+        database_url (str): The database connection URL.
+        min_size (int): Number of connections kept open in the pool.
+        max_size (int): Maximum number of concurrent connections.
+        acquire_timeout (float): Seconds to wait for a free connection before failing.
+        max_inactive_lifetime (float): Seconds after which idle connections are closed.
+    """
+    def __init__(self, database_url: str, min_size: int = 2, max_size: int = 10,
+                 acquire_timeout: float = 10.0, max_inactive_lifetime: float = 300.0):
+        """
+        Initialize the DatabasePool. The pool itself is created on `open()` or on first use.
+        """
+        self.database_url = database_url
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_inactive_lifetime = max_inactive_lifetime
+        self._pool: asyncpg.Pool | None = None
+        self._open_lock = asyncio.Lock()
+        self._acquire_count = 0
+        self._acquire_timeouts = 0
+        self._acquire_wait_total = 0.0
+        self._acquire_wait_max = 0.0
+
+    async def open(self):
+        """
+        Create the connection pool if it is not open yet.
+
+        Raises:
+            asyncpg.PostgresError: If the database cannot be reached.
+        """
+        async with self._open_lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(
+                    self.database_url,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    max_inactive_connection_lifetime=self.max_inactive_lifetime,
+                )
+                print(f"Database pool opened (min_size={self.min_size}, max_size={self.max_size}).")
+
+    async def close(self):
+        """
+        Close the connection pool and all of its connections.
+        """
+        async with self._open_lock:
+            if self._pool is not None:
+                await self._pool.close()
+                self._pool = None
+                print("Database pool closed.")
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Borrow a connection from the pool for the duration of the context.
+
+        Yields:
+            asyncpg.Connection: A pooled database connection.
+
+        Raises:
+            asyncio.TimeoutError: If no connection becomes free within the acquire timeout.
+        """
+        if self._pool is None:
+            await self.open()
+        started = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._acquire_timeouts += 1
+            print(f"Database pool acquire timed out after {self.acquire_timeout} s.")
+            raise
+        waited = time.perf_counter() - started
+        self._acquire_count += 1
+        self._acquire_wait_total += waited
+        self._acquire_wait_max = max(self._acquire_wait_max, waited)
+        try:
+            yield conn
+        finally:
+            await self._pool.release(conn)
+
+    async def ping(self) -> float:
+        """
+        Run a trivial query through the pool.
+
+        Returns:
+            float: Round-trip time in seconds, including the wait for a free connection.
+
+        Raises:
+            asyncpg.PostgresError: If the database cannot be reached.
+            asyncio.TimeoutError: If no connection becomes free within the acquire timeout.
+        """
+        started = time.perf_counter()
+        async with self.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+        return time.perf_counter() - started
+
+    def stats(self) -> dict:
+        """
+        Return current pool statistics.
+
+        Returns:
+            dict: Pool size, idle connections, configured limits and acquire statistics.
+        """
+        is_open = self._pool is not None
+        return {
+            "open": is_open,
+            "size": self._pool.get_size() if is_open else 0,
+            "idle": self._pool.get_idle_size() if is_open else 0,
+            "minSize": self.min_size,
+            "maxSize": self.max_size,
+            "acquireTimeout": self.acquire_timeout,
+            "acquireCount": self._acquire_count,
+            "acquireTimeouts": self._acquire_timeouts,
+            "acquireWaitAvgMs": round(1000 * self._acquire_wait_total / self._acquire_count, 3) if self._acquire_count else 0.0,
+            "acquireWaitMaxMs": round(1000 * self._acquire_wait_max, 3),
+        }
+
+
+# Shared pool instance used by all repositories
+database_pool = DatabasePool(
+    DATABASE_URL,
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    acquire_timeout=DB_POOL_ACQUIRE_TIMEOUT,
+    max_inactive_lifetime=DB_POOL_MAX_INACTIVE_LIFETIME,
+)
@@ -1,5 +1,7 @@
 import asyncpg
 from utils.fingrid_service_tools import convert_to_fingrid_entry
+from repositories.database_pool import DatabasePool
+from utils.coverage_index import coverage_index, fingrid_coverage_key
 from datetime import datetime
 
 class FingridRepository:
@@ -8,20 +10,20 @@ class FingridRepository:
 
     Provides asynchronous methods for inserting and retrieving Fingrid entries,
     as well as finding missing entries. Interacts directly with the PostgreSQL
-    database using asyncpg.
+    database using connections borrowed from the shared asyncpg pool.
 
     Args:
-        database_url (str): The database connection URL.
+        database_pool (DatabasePool): The shared database connection pool.
     """
-    def __init__(self, database_url: str):
+    def __init__(self, database_pool: DatabasePool):
         """
-        Initialize the FingridRepository with a database connection URL.
+        Initialize the FingridRepository with the shared database connection pool.
 
         Args:
-            database_url (str): The database connection URL.
+            database_pool (DatabasePool): The shared database connection pool.
         """
-        self.database_url = database_url
-    
+        self.database_pool = database_pool
+
     async def insert_entry(self, value: float, iso_date: str, predicted: bool = False, convert_to_helsinki_time: bool = True, dataset_id: int = 0):
         """
         Insert a single entry into the fingrid table.
@@ -36,38 +38,120 @@ class FingridRepository:
         Raises:
             asyncpg.PostgresError: If a database error occurs.
         """
-        conn = None
         try:
             # Convert the entry to the correct format
             entry = convert_to_fingrid_entry(value, iso_date, predicted, convert_to_helsinki_time, dataset_id)
 
-            # Connect to the database
-            conn = await asyncpg.connect(self.database_url)
-
-            # Insert the entry into the database
-            await conn.execute(
-                """
-                INSERT INTO fingrid (datetime_orig,datetime,date,year,month,day,hour,weekday,dataset_id,value)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                ON CONFLICT (datetime, dataset_id) DO NOTHING
-                """,
-                entry["datetime_orig"],  # datetime_orig in UTC time zone aware format
-                entry["datetime"],       # datetime in Helsinki time (naive)
-                entry["date"],
-                entry["year"],
-                entry["month"],
-                entry["day"],
-                entry["hour"],
-                entry["weekday"],
-                entry["dataset_id"],
-                entry["value"]
-            )
+            async with self.database_pool.acquire() as conn:
+                # Insert the entry into the database
+                await conn.execute(
+                    """
+                    INSERT INTO fingrid (datetime_orig,datetime,date,year,month,day,hour,weekday,dataset_id,value)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                    ON CONFLICT (datetime, dataset_id) DO NOTHING
+                    """,
+                    entry["datetime_orig"],  # datetime_orig in UTC time zone aware format
+                    entry["datetime"],       # datetime in Helsinki time (naive)
+                    entry["date"],
+                    entry["year"],
+                    entry["month"],
+                    entry["day"],
+                    entry["hour"],
+                    entry["weekday"],
+                    entry["dataset_id"],
+                    entry["value"]
+                )
+            coverage_index.mark_local(fingrid_coverage_key(dataset_id), [entry["datetime"]])
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def upsert_entries(self, entries: list, dataset_id: int, predicted: bool = False, convert_to_helsinki_time: bool = True) -> int:
+        """
+        Bulk upsert multiple entries of one dataset into the fingrid table.
+
+        The entries are copied into a temporary staging table with a single COPY and merged into
+        fingrid with one INSERT ... ON CONFLICT statement. Existing rows are updated only if
+        the value has changed.
+
+        Args:
+            entries (list[dict]): A list of dictionaries with 'value' and 'startTime' (ISO 8601, UTC) keys.
+            dataset_id (int): The dataset ID of the entries.
+            predicted (bool): Indicates if the values are predicted. Default is False.
+            convert_to_helsinki_time (bool): Whether to convert datetime to Helsinki time. Default is True.
+
+        Returns:
+            int: The number of inserted or updated rows.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        if not entries:
+            return 0
+        try:
+            records = []
+            for item in entries:
+                entry = convert_to_fingrid_entry(item["value"], item["startTime"], predicted, convert_to_helsinki_time, dataset_id)
+                records.append((
+                    entry["datetime_orig"],
+                    entry["datetime"],
+                    entry["date"],
+                    entry["year"],
+                    entry["month"],
+                    entry["day"],
+                    entry["hour"],
+                    entry["weekday"],
+                    entry["dataset_id"],
+                    entry["value"],
+                    entry["predicted"]
+                ))
+
+            async with self.database_pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        """
+                        CREATE TEMP TABLE fingrid_staging (
+                            datetime_orig TEXT NOT NULL,
+                            datetime TIMESTAMP NOT NULL,
+                            date DATE NOT NULL,
+                            year INT NOT NULL,
+                            month INT NOT NULL,
+                            day INT NOT NULL,
+                            hour INT NOT NULL,
+                            weekday INT NOT NULL,
+                            dataset_id INT NOT NULL,
+                            value NUMERIC(10, 3) NOT NULL,
+                            predicted BOOLEAN NOT NULL
+                        ) ON COMMIT DROP
+                        """
+                    )
+                    await conn.copy_records_to_table(
+                        "fingrid_staging",
+                        records=records,
+                        columns=["datetime_orig", "datetime", "date", "year", "month", "day", "hour", "weekday", "dataset_id", "value", "predicted"]
+                    )
+                    # DISTINCT ON: the repeated hour of the DST change maps to the same naive Helsinki datetime
+                    status = await conn.execute(
+                        """
+                        INSERT INTO fingrid (datetime_orig, datetime, date, year, month, day, hour, weekday, dataset_id, value, predicted)
+                        SELECT DISTINCT ON (datetime, dataset_id)
+                            datetime_orig, datetime, date, year, month, day, hour, weekday, dataset_id, value, predicted
+                        FROM fingrid_staging
+                        ORDER BY datetime, dataset_id, datetime_orig
+                        ON CONFLICT (datetime, dataset_id) DO UPDATE
+                        SET value = EXCLUDED.value,
+                            predicted = EXCLUDED.predicted,
+                            updatedAt = CURRENT_TIMESTAMP
+                        WHERE fingrid.value IS DISTINCT FROM EXCLUDED.value
+                        OR fingrid.predicted IS DISTINCT FROM EXCLUDED.predicted
+                        """
+                    )
+            coverage_index.mark_local(fingrid_coverage_key(dataset_id), [record[1] for record in records])
+            # status is in the form "INSERT 0 <rows>"
+            return int(status.split()[-1])
         except asyncpg.PostgresError as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
 
     async def get_entries(self, start_date: datetime, end_date: datetime, dataset_id, select_columns: str = "*"):
         """
@@ -85,40 +169,114 @@ class FingridRepository:
         Raises:
             asyncpg.PostgresError: If a database error occurs.
         """
-        conn = None
         try:
-            # Connect to the database
-            conn = await asyncpg.connect(self.database_url)
-
-            # Execute the query
-            rows = await conn.fetch(
-                f"""
-                SELECT {select_columns}
-                FROM fingrid
-                WHERE datetime BETWEEN $1 AND $2
-                AND dataset_id = $3
-                """,
-                start_date,
-                end_date,
-                dataset_id
-            )
+            async with self.database_pool.acquire() as conn:
+                # Execute the query
+                rows = await conn.fetch(
+                    f"""
+                    SELECT {select_columns}
+                    FROM fingrid
+                    WHERE datetime BETWEEN $1 AND $2
+                    AND dataset_id = $3
+                    """,
+                    start_date,
+                    end_date,
+                    dataset_id
+                )
 
             # Convert rows to a list of dictionaries
             return [dict(row) for row in rows]
         except asyncpg.PostgresError as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
 
-    async def get_missing_entries(self, start_date: datetime, end_date: datetime):
+    async def get_range_version(self, start_date: datetime, end_date: datetime, dataset_id: int) -> dict:
+        """
+        Retrieve the data version of one dataset's entries between two datetimes.
+
+        The version changes whenever an entry in the range is inserted or updated, so it can be
+        used as an HTTP cache validator of the range.
+
+        Args:
+            start_date (datetime): The start datetime as a naive Helsinki datetime (inclusive).
+            end_date (datetime): The end datetime as a naive Helsinki datetime (inclusive).
+            dataset_id (int): The dataset ID to filter by.
+
+        Returns:
+            dict: 'count' (int) of the entries and 'last_modified' (datetime | None), the latest
+                updatedAt of the entries as a timezone-aware datetime.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                row = await conn.fetchrow(
+                    """
+                    SELECT COUNT(*) AS count, MAX(updatedAt)::TIMESTAMPTZ AS last_modified
+                    FROM fingrid
+                    WHERE datetime BETWEEN $1 AND $2
+                    AND dataset_id = $3
+                    """,
+                    start_date,
+                    end_date,
+                    dataset_id
+                )
+            return dict(row)
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def iter_entry_batches(self, start_date: datetime, end_date: datetime, dataset_id: int, select_columns: str, batch_size: int):
+        """
+        Stream entries of one dataset from the fingrid table between two datetimes in batches.
+
+        The rows are read from a server-side cursor ordered by datetime, so only one batch is held
+        in memory at a time. The connection stays borrowed from the pool until the iteration ends.
+
+        Args:
+            start_date (datetime): The start datetime as a naive Helsinki datetime (inclusive).
+            end_date (datetime): The end datetime as a naive Helsinki datetime (inclusive).
+            dataset_id (int): The dataset ID to filter by.
+            select_columns (str): The column expressions to select.
+            batch_size (int): The maximum number of rows per batch.
+
+        Yields:
+            list[asyncpg.Record]: The next batch of rows.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                # Cursors only exist inside a transaction
+                async with conn.transaction(readonly=True):
+                    cursor = await conn.cursor(
+                        f"""
+                        SELECT {select_columns}
+                        FROM fingrid
+                        WHERE datetime BETWEEN $1 AND $2
+                        AND dataset_id = $3
+                        ORDER BY datetime
+                        """,
+                        start_date,
+                        end_date,
+                        dataset_id
+                    )
+                    while rows := await cursor.fetch(batch_size):
+                        yield rows
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def get_missing_entries(self, start_date: datetime, end_date: datetime, dataset_id: int):
         """
-        Find missing hourly datetimes in the fingrid table between two datetimes.
+        Find missing hourly datetimes of one dataset in the fingrid table between two datetimes.
 
         Args:
             start_date (datetime): The start datetime (inclusive).
             end_date (datetime): The end datetime (inclusive).
+            dataset_id (int): The dataset ID to check.
 
         Returns:
             list[tuple]: A list of tuples where each tuple contains the date (YYYY-MM-DD) and hour (0-23)
@@ -127,29 +285,27 @@ class FingridRepository:
         Raises:
             asyncpg.PostgresError: If a database error occurs.
         """
-        conn = None
         try:
-            # Connect to the database
-            conn = await asyncpg.connect(self.database_url)
-
-            # Execute the query to find missing entries
-            rows = await conn.fetch(
-                """
-                WITH date_range AS (
-                    SELECT generate_series(
-                        $1::TIMESTAMP,
-                        $2::TIMESTAMP,
-                        '1 hour'::INTERVAL
-                    ) AS datetime
+            async with self.database_pool.acquire() as conn:
+                # Execute the query to find missing entries
+                rows = await conn.fetch(
+                    """
+                    WITH date_range AS (
+                        SELECT generate_series(
+                            $1::TIMESTAMP,
+                            $2::TIMESTAMP,
+                            '1 hour'::INTERVAL
+                        ) AS datetime
+                    )
+                    SELECT dr.datetime
+                    FROM date_range dr
+                    LEFT JOIN fingrid p ON dr.datetime = p.datetime AND p.dataset_id = $3
+                    WHERE p.datetime IS NULL
+                    """,
+                    start_date,
+                    end_date,
+                    dataset_id
                 )
-                SELECT dr.datetime
-                FROM date_range dr
-                LEFT JOIN fingrid p ON dr.datetime = p.datetime
-                WHERE p.datetime IS NULL
-                """,
-                start_date,
-                end_date
-            )
 
             # Return the missing entries as a list of tuples
             return [
@@ -159,6 +315,124 @@ class FingridRepository:
         except asyncpg.PostgresError as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
\ No newline at end of file
+
+    async def get_missing_ranges(self, start_time: datetime, end_time: datetime, dataset_id: int) -> list[tuple[datetime, datetime]]:
+        """
+        Find contiguous ranges of missing hours of one dataset in the fingrid table.
+
+        Expected hours are generated in UTC and matched against the naive Helsinki datetimes in the
+        table, so DST changes do not produce phantom gaps. Consecutive missing hours are grouped into
+        islands (gaps-and-islands) and returned as half-open [start, end) ranges.
+
+        Args:
+            start_time (datetime): The start datetime (inclusive, UTC-aware). Rounded up to a full hour.
+            end_time (datetime): The end datetime (inclusive, UTC-aware).
+            dataset_id (int): The dataset ID to check.
+
+        Returns:
+            list[tuple[datetime, datetime]]: Sorted list of (start, end) tuples of UTC-aware datetimes,
+                where start is the first missing hour and end is the hour after the last missing one.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    WITH expected AS (
+                        SELECT generate_series(
+                            date_trunc('hour', $1::TIMESTAMPTZ + INTERVAL '1 hour' - INTERVAL '1 microsecond'),
+                            $2::TIMESTAMPTZ,
+                            '1 hour'::INTERVAL
+                        ) AS ts
+                    ),
+                    missing AS (
+                        SELECT e.ts,
+                               e.ts - ROW_NUMBER() OVER (ORDER BY e.ts) * INTERVAL '1 hour' AS island
+                        FROM expected e
+                        WHERE NOT EXISTS (
+                            SELECT 1
+                            FROM fingrid f
+                            WHERE f.dataset_id = $3
+                            AND f.datetime = (e.ts AT TIME ZONE 'Europe/Helsinki')
+                        )
+                    )
+                    SELECT MIN(ts) AS range_start, MAX(ts) + INTERVAL '1 hour' AS range_end
+                    FROM missing
+                    GROUP BY island
+                    ORDER BY range_start
+                    """,
+                    start_time,
+                    end_time,
+                    dataset_id
+                )
+
+            return [(row["range_start"], row["range_end"]) for row in rows]
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def get_ingestion_watermark(self, dataset_id: int) -> datetime | None:
+        """
+        Retrieve the ingestion watermark of one dataset.
+
+        Without a stored watermark, the hour after the latest stored entry of the dataset is returned.
+
+        Args:
+            dataset_id (int): The dataset ID.
+
+        Returns:
+            datetime | None: The start of the first hour not yet ingested (UTC-aware), or None if the
+                dataset has neither a watermark nor stored entries.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                return await conn.fetchval(
+                    """
+                    SELECT COALESCE(
+                        (SELECT watermark FROM fingrid_ingestion_watermark WHERE dataset_id = $1),
+                        (SELECT (MAX(datetime) AT TIME ZONE 'Europe/Helsinki') + INTERVAL '1 hour'
+                         FROM fingrid WHERE dataset_id = $1)
+                    )
+                    """,
+                    dataset_id
+                )
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def set_ingestion_watermark(self, dataset_id: int, watermark: datetime, ingested: int):
+        """
+        Store the ingestion watermark of one dataset after an ingestion run.
+
+        Args:
+            dataset_id (int): The dataset ID.
+            watermark (datetime): The start of the first hour not yet ingested (UTC-aware).
+            ingested (int): The number of entries inserted or updated by the run.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO fingrid_ingestion_watermark (dataset_id, watermark, last_run_at, last_ingested)
+                    VALUES ($1, $2, CURRENT_TIMESTAMP, $3)
+                    ON CONFLICT (dataset_id) DO UPDATE
+                    SET watermark = EXCLUDED.watermark,
+                        last_run_at = EXCLUDED.last_run_at,
+                        last_ingested = EXCLUDED.last_ingested,
+                        updatedAt = CURRENT_TIMESTAMP
+                    """,
+                    dataset_id,
+                    watermark,
+                    ingested
+                )
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
@@ -3,25 +3,34 @@ porssisahko_repository.py defines the PorssisahkoRepository class for price data
 
 The repository provides asynchronous methods for:
 - Inserting single or multiple price entries into the porssisahko table.
-- Retrieving entries within a date range.
+- Bulk upserting price entries through a COPY into a staging table.
+- Maintaining the per-day rollup table used for the average price statistics.
+- Retrieving entries and daily rollups within a date range.
+- Streaming entries within a date range in batches from a server-side cursor.
+- Reading the data version (row count and last update) of a date range.
+- Aggregating prices by hour of day or weekday within a date range.
 - Finding missing hourly entries within a date range.
 
-All operations interact directly with a PostgreSQL database using asyncpg for asynchronous access.
-This repository is intended to be used by service and controller layers to abstract database logic
-from business and API logic.
+All operations interact directly with a PostgreSQL database using connections borrowed from the
+shared asyncpg pool. This repository is intended to be used by service and controller layers to
+abstract database logic from business and API logic.
 
 Dependencies:
 - asyncpg for asynchronous PostgreSQL operations.
+- repositories.database_pool for the shared connection pool.
+- utils.coverage_index for keeping the in-memory hourly coverage index up to date.
 - utils.porssisahko_tools for entry conversion utilities.
 
 Intended Usage:
-- Instantiate with a database connection URL.
+- Instantiate with the shared database pool.
 - Use in services or controllers for all price data-related database actions.
 """
 
 import asyncpg
 from utils.porssisahko_tools import convert_to_porssisahko_entry
-from datetime import datetime
+from repositories.database_pool import DatabasePool
+from utils.coverage_index import coverage_index, PORSSISAHKO_COVERAGE_KEY
+from datetime import date, datetime
 
 class PorssisahkoRepository:
     """
@@ -29,19 +38,19 @@ class PorssisahkoRepository:
 
     Provides asynchronous methods for inserting and retrieving price entries,
     as well as finding missing entries. Interacts directly with the PostgreSQL
-    database using asyncpg.
+    database using connections borrowed from the shared asyncpg pool.
 
     Args:
-        database_url (str): The database connection URL.
+        database_pool (DatabasePool): The shared database connection pool.
     """
-    def __init__(self, database_url: str):
+    def __init__(self, database_pool: DatabasePool):
         """
-        Initialize the PorssisahkoRepository with a database connection URL.
+        Initialize the PorssisahkoRepository with the shared database connection pool.
 
         Args:
-            database_url (str): The database connection URL.
+            database_pool (DatabasePool): The shared database connection pool.
         """
-        self.database_url = database_url
+        self.database_pool = database_pool
 
     async def insert_entry(self, price: float, iso_date: str, predicted: bool = False, convert_to_helsinki_time: bool = True):
         """
@@ -55,36 +64,32 @@ class PorssisahkoRepository:
         Raises:
             asyncpg.PostgresError: If a database error occurs.
         """
-        conn = None
         try:
             # Convert the entry to the correct format
             entry = convert_to_porssisahko_entry(price, iso_date, predicted, convert_to_helsinki_time)
 
-            # Connect to the database
-            conn = await asyncpg.connect(self.database_url)
-
-            # Insert the entry into the database
-            await conn.execute(
-                """
-                INSERT INTO porssisahko (datetime, date, year, month, day, hour, weekday, price)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                ON CONFLICT (Datetime) DO NOTHING
-                """,
-                entry["datetime"],
-                entry["date"],
-                entry["year"],
-                entry["month"],
-                entry["day"],
-                entry["hour"],
-                entry["weekday"],
-                entry["price"]
-            )
+            async with self.database_pool.acquire() as conn:
+                # Insert the entry into the database
+                await conn.execute(
+                    """
+                    INSERT INTO porssisahko (datetime, date, year, month, day, hour, weekday, price)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                    ON CONFLICT (Datetime) DO NOTHING
+                    """,
+                    entry["datetime"],
+                    entry["date"],
+                    entry["year"],
+                    entry["month"],
+                    entry["day"],
+                    entry["hour"],
+                    entry["weekday"],
+                    entry["price"]
+                )
+                await self._refresh_daily_rollups(conn, [entry["date"]])
+            coverage_index.mark_local(PORSSISAHKO_COVERAGE_KEY, [entry["datetime"]])
         except asyncpg.PostgresError as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
 
     async def insert_entries(self, entries: list, convert_to_helsinki_time: bool = True):
         """
@@ -96,7 +101,6 @@ class PorssisahkoRepository:
         Raises:
             asyncpg.PostgresError: If a database error occurs.
         """
-        conn = None
         try:
             # Convert entries to the correct format
             formatted_entries = [
@@ -125,17 +129,223 @@ class PorssisahkoRepository:
                 for entry in formatted_entries
             ]
 
-            # Connect to the database
-            conn = await asyncpg.connect(self.database_url)
+            async with self.database_pool.acquire() as conn:
+                # Execute the insert query with the list of values
+                await conn.executemany(insert_query, values)
+                await self._refresh_daily_rollups(conn, [entry["date"] for entry in formatted_entries])
+            coverage_index.mark_local(PORSSISAHKO_COVERAGE_KEY, [entry["datetime"] for entry in formatted_entries])
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def upsert_entries(self, entries: list, convert_to_helsinki_time: bool = True) -> int:
+        """
+        Bulk upsert multiple entries into the porssisahko table.
+
+        The entries are copied into a temporary staging table with a single COPY and merged into
+        porssisahko with one INSERT ... ON CONFLICT statement. Existing rows are updated only if
+        the price or the predicted flag has changed.
+
+        Args:
+            entries (list[dict]): A list of dictionaries with 'price' and 'startDate' (ISO 8601) keys,
+                and optionally 'predicted'.
+            convert_to_helsinki_time (bool): Whether to convert datetimes to Helsinki time. Default is True.
+
+        Returns:
+            int: The number of inserted or updated rows.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        if not entries:
+            return 0
+        try:
+            records = []
+            for item in entries:
+                entry = convert_to_porssisahko_entry(item["price"], item["startDate"], predicted=item.get("predicted", False), convert_to_helsinki_time=convert_to_helsinki_time)
+                records.append((
+                    entry["datetime"],
+                    entry["date"],
+                    entry["year"],
+                    entry["month"],
+                    entry["day"],
+                    entry["hour"],
+                    entry["weekday"],
+                    entry["price"],
+                    entry["predicted"]
+                ))
+
+            async with self.database_pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        """
+                        CREATE TEMP TABLE porssisahko_staging (
+                            datetime TIMESTAMP NOT NULL,
+                            date DATE NOT NULL,
+                            year INT NOT NULL,
+                            month INT NOT NULL,
+                            day INT NOT NULL,
+                            hour INT NOT NULL,
+                            weekday INT NOT NULL,
+                            price NUMERIC(10, 3) NOT NULL,
+                            predicted BOOLEAN NOT NULL
+                        ) ON COMMIT DROP
+                        """
+                    )
+                    await conn.copy_records_to_table(
+                        "porssisahko_staging",
+                        records=records,
+                        columns=["datetime", "date", "year", "month", "day", "hour", "weekday", "price", "predicted"]
+                    )
+                    # DISTINCT ON: the repeated hour of the DST change maps to the same naive Helsinki datetime
+                    status = await conn.execute(
+                        """
+                        INSERT INTO porssisahko (datetime, date, year, month, day, hour, weekday, price, predicted)
+                        SELECT DISTINCT ON (datetime) datetime, date, year, month, day, hour, weekday, price, predicted
+                        FROM porssisahko_staging
+                        ORDER BY datetime
+                        ON CONFLICT (datetime) DO UPDATE
+                        SET price = EXCLUDED.price,
+                            predicted = EXCLUDED.predicted,
+                            updatedAt = CURRENT_TIMESTAMP
+                        WHERE porssisahko.price IS DISTINCT FROM EXCLUDED.price
+                        OR porssisahko.predicted IS DISTINCT FROM EXCLUDED.predicted
+                        """
+                    )
+                    await self._refresh_daily_rollups(conn, [record[1] for record in records])
+            coverage_index.mark_local(PORSSISAHKO_COVERAGE_KEY, [record[0] for record in records])
+            # status is in the form "INSERT 0 <rows>"
+            return int(status.split()[-1])
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def _refresh_daily_rollups(self, conn, dates: list[date]):
+        """
+        Recompute the porssisahko_daily_rollup rows of the given Helsinki dates from the raw entries.
+
+        Args:
+            conn (asyncpg.Connection): The connection (and transaction) used for the write.
+            dates (list[date]): The dates touched by the write. Duplicates are allowed.
+        """
+        if not dates:
+            return
+        await conn.execute(
+            """
+            WITH days AS (
+                SELECT DISTINCT unnest($1::DATE[]) AS date
+            ),
+            hourly AS (
+                SELECT p.date, p.hour, SUM(p.price) AS price_sum, COUNT(*) AS price_count,
+                       MIN(p.price) AS price_min, MAX(p.price) AS price_max
+                FROM porssisahko p
+                JOIN days d ON d.date = p.date
+                GROUP BY p.date, p.hour
+            ),
+            grid AS (
+                SELECT d.date, h.hour, hr.price_sum, hr.price_count, hr.price_min, hr.price_max
+                FROM days d
+                CROSS JOIN generate_series(0, 23) AS h(hour)
+                LEFT JOIN hourly hr ON hr.date = d.date AND hr.hour = h.hour
+            )
+            INSERT INTO porssisahko_daily_rollup (date, weekday, price_sum, price_count, price_min, price_max,
+                                                  hour_sums, hour_counts, hour_mins, hour_maxs)
+            SELECT date,
+                   EXTRACT(ISODOW FROM date)::INT - 1,
+                   SUM(price_sum),
+                   SUM(price_count),
+                   MIN(price_min),
+                   MAX(price_max),
+                   array_agg(COALESCE(price_sum, 0) ORDER BY hour),
+                   array_agg(COALESCE(price_count, 0) ORDER BY hour),
+                   array_agg(price_min ORDER BY hour),
+                   array_agg(price_max ORDER BY hour)
+            FROM grid
+            GROUP BY date
+            HAVING SUM(price_count) > 0
+            ON CONFLICT (date) DO UPDATE
+            SET price_sum = EXCLUDED.price_sum,
+                price_count = EXCLUDED.price_count,
+                price_min = EXCLUDED.price_min,
+                price_max = EXCLUDED.price_max,
+                hour_sums = EXCLUDED.hour_sums,
+                hour_counts = EXCLUDED.hour_counts,
+                hour_mins = EXCLUDED.hour_mins,
+                hour_maxs = EXCLUDED.hour_maxs,
+                updatedAt = CURRENT_TIMESTAMP
+            """,
+            list(set(dates))
+        )
+
+    async def get_daily_rollups(self, start_date: date, end_date: date):
+        """
+        Retrieve the per-day price rollups between two Helsinki dates (inclusive).
+
+        Args:
+            start_date (date): The first date.
+            end_date (date): The last date.
+
+        Returns:
+            list[dict]: One dict per stored date with 'date', 'weekday', 'price_sum', 'price_count',
+                'price_min', 'price_max' and the 24-element 'hour_sums', 'hour_counts', 'hour_mins'
+                and 'hour_maxs' lists (index = hour of day).
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT date, weekday, price_sum, price_count, price_min, price_max,
+                           hour_sums, hour_counts, hour_mins, hour_maxs
+                    FROM porssisahko_daily_rollup
+                    WHERE date BETWEEN $1 AND $2
+                    ORDER BY date
+                    """,
+                    start_date,
+                    end_date
+                )
+            return [dict(row) for row in rows]
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def get_price_aggregates(self, start_date: datetime, end_date: datetime, group_by: str):
+        """
+        Aggregate prices between two dates by hour of day or weekday.
 
-            # Execute the insert query with the list of values
-            await conn.executemany(insert_query, values)
+        Args:
+            start_date (datetime): The start date as a datetime object.
+            end_date (datetime): The end date as a datetime object.
+            group_by (str): "hour" to group by the hour column, "weekday" to group by the weekday column.
+
+        Returns:
+            list[dict]: One dict per group with 'key', 'avg_price', 'price_sum' and 'price_count'.
+
+        Raises:
+            ValueError: If group_by is not "hour" or "weekday".
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        if group_by not in ("hour", "weekday"):
+            raise ValueError(f"Invalid group_by: {group_by}")
+        try:
+            async with self.database_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    f"""
+                    SELECT {group_by} AS key, AVG(price) AS avg_price, SUM(price) AS price_sum, COUNT(*) AS price_count
+                    FROM porssisahko
+                    WHERE datetime BETWEEN $1 AND $2
+                    GROUP BY {group_by}
+                    ORDER BY {group_by}
+                    """,
+                    start_date,
+                    end_date
+                )
+            return [dict(row) for row in rows]
         except asyncpg.PostgresError as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
 
     async def get_entries(self, start_date: datetime, end_date: datetime, select_columns: str = "*"):
         """
@@ -152,30 +362,97 @@ class PorssisahkoRepository:
         Raises:
             asyncpg.PostgresError: If a database error occurs.
         """
-        conn = None
         try:
-            # Connect to the database
-            conn = await asyncpg.connect(self.database_url)
-
-            # Execute the query
-            rows = await conn.fetch(
-                f"""
-                SELECT {select_columns}
-                FROM porssisahko
-                WHERE datetime BETWEEN $1 AND $2
-                """,
-                start_date,
-                end_date
-            )
+            async with self.database_pool.acquire() as conn:
+                # Execute the query
+                rows = await conn.fetch(
+                    f"""
+                    SELECT {select_columns}
+                    FROM porssisahko
+                    WHERE datetime BETWEEN $1 AND $2
+                    """,
+                    start_date,
+                    end_date
+                )
 
             # Convert rows to a list of dictionaries
             return [dict(row) for row in rows]
         except asyncpg.PostgresError as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
+
+    async def get_range_version(self, start_date: datetime, end_date: datetime) -> dict:
+        """
+        Retrieve the data version of the entries between two dates.
+
+        The version changes whenever an entry in the range is inserted or updated, so it can be
+        used as an HTTP cache validator of the range.
+
+        Args:
+            start_date (datetime): The start date as a naive Helsinki datetime (inclusive).
+            end_date (datetime): The end date as a naive Helsinki datetime (inclusive).
+
+        Returns:
+            dict: 'count' (int) of the entries and 'last_modified' (datetime | None), the latest
+                updatedAt of the entries as a timezone-aware datetime.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                row = await conn.fetchrow(
+                    """
+                    SELECT COUNT(*) AS count, MAX(updatedAt)::TIMESTAMPTZ AS last_modified
+                    FROM porssisahko
+                    WHERE datetime BETWEEN $1 AND $2
+                    """,
+                    start_date,
+                    end_date
+                )
+            return dict(row)
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
+
+    async def iter_entry_batches(self, start_date: datetime, end_date: datetime, select_columns: str, batch_size: int):
+        """
+        Stream entries from the porssisahko table between two dates in batches.
+
+        The rows are read from a server-side cursor ordered by datetime, so only one batch is held
+        in memory at a time. The connection stays borrowed from the pool until the iteration ends.
+
+        Args:
+            start_date (datetime): The start date as a naive Helsinki datetime (inclusive).
+            end_date (datetime): The end date as a naive Helsinki datetime (inclusive).
+            select_columns (str): The column expressions to select.
+            batch_size (int): The maximum number of rows per batch.
+
+        Yields:
+            list[asyncpg.Record]: The next batch of rows.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        try:
+            async with self.database_pool.acquire() as conn:
+                # Cursors only exist inside a transaction
+                async with conn.transaction(readonly=True):
+                    cursor = await conn.cursor(
+                        f"""
+                        SELECT {select_columns}
+                        FROM porssisahko
+                        WHERE datetime BETWEEN $1 AND $2
+                        ORDER BY datetime
+                        """,
+                        start_date,
+                        end_date
+                    )
+                    while rows := await cursor.fetch(batch_size):
+                        yield rows
+        except asyncpg.PostgresError as e:
+            print(f"Database error: {e}")
+            raise
 
     async def get_missing_entries(self, start_date: datetime, end_date: datetime):
         """
@@ -191,29 +468,26 @@ class PorssisahkoRepository:
         Raises:
             asyncpg.PostgresError: If a database error occurs.
         """
-        conn = None
         try:
-            # Connect to the database
-            conn = await asyncpg.connect(self.database_url)
-
-            # Execute the query to find missing entries
-            rows = await conn.fetch(
-                """
-                WITH date_range AS (
-                    SELECT generate_series(
-                        $1::TIMESTAMP,
-                        $2::TIMESTAMP,
-                        '1 hour'::INTERVAL
-                    ) AS datetime
+            async with self.database_pool.acquire() as conn:
+                # Execute the query to find missing entries
+                rows = await conn.fetch(
+                    """
+                    WITH date_range AS (
+                        SELECT generate_series(
+                            $1::TIMESTAMP,
+                            $2::TIMESTAMP,
+                            '1 hour'::INTERVAL
+                        ) AS datetime
+                    )
+                    SELECT dr.datetime
+                    FROM date_range dr
+                    LEFT JOIN porssisahko p ON dr.datetime = p.datetime
+                    WHERE p.datetime IS NULL
+                    """,
+                    start_date,
+                    end_date
                 )
-                SELECT dr.datetime
-                FROM date_range dr
-                LEFT JOIN porssisahko p ON dr.datetime = p.datetime
-                WHERE p.datetime IS NULL
-                """,
-                start_date,
-                end_date
-            )
 
             # Return the missing entries as a list of tuples
             return [
@@ -223,6 +497,3 @@ class PorssisahkoRepository:
         except asyncpg.PostgresError as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
\ No newline at end of file
@@ -7,18 +7,20 @@ The repository provides asynchronous methods for:
 - Verifying user email addresses using verification codes.
 - Updating verification codes for users.
 
-All operations interact directly with a PostgreSQL database using asyncpg for asynchronous access.
+All operations interact directly with a PostgreSQL database using connections borrowed from the
+shared asyncpg pool.
 This repository is intended to be used by service and controller layers to abstract database logic
 from business and API logic.
 
 Dependencies:
 - asyncpg for asynchronous PostgreSQL operations.
+- repositories.database_pool for the shared connection pool.
 
 Intended Usage:
-- Instantiate with a database connection URL.
+- Instantiate with the shared database pool.
 - Use in authentication and user management services for all user-related database actions.
 """
-import asyncpg
+from repositories.database_pool import DatabasePool
 
 class UserRepository:
     """
@@ -26,19 +28,19 @@ class UserRepository:
 
     Provides asynchronous methods for retrieving, creating, and updating user records,
     as well as verifying user email addresses. Interacts directly with the PostgreSQL
-    database using asyncpg.
+    database using connections borrowed from the shared asyncpg pool.
 
     Args:
-        database_url (str): The database connection URL.
+        database_pool (DatabasePool): The shared database connection pool.
     """
-    def __init__(self, database_url: str):
+    def __init__(self, database_pool: DatabasePool):
         """
-        Initialize the UserRepository with a database connection URL.
+        Initialize the UserRepository with the shared database connection pool.
 
         Args:
-            database_url (str): The database connection URL.
+            database_pool (DatabasePool): The shared database connection pool.
         """
-        self.database_url = database_url
+        self.database_pool = database_pool
 
     async def get_user_by_email(self, email: str):
         """
@@ -50,12 +52,9 @@ class UserRepository:
         Returns:
             Record or None: The user record if found, otherwise None.
         """
-        conn = await asyncpg.connect(self.database_url)
-        try:
+        async with self.database_pool.acquire() as conn:
             user = await conn.fetchrow("SELECT * FROM users WHERE email = $1", email)
             return user
-        finally:
-            await conn.close()
     
     async def create_user(self, email: str, password_hash: str, verification_code: str):
         """
@@ -69,14 +68,11 @@ class UserRepository:
         Raises:
             Exception: If the user could not be created.
         """
-        conn = await asyncpg.connect(self.database_url)
-        try:
+        async with self.database_pool.acquire() as conn:
             await conn.execute(
                 "INSERT INTO users (email, password_hash, verification_code) VALUES ($1, $2, $3)",
                 email, password_hash, verification_code
             )
-        finally:
-            await conn.close()
 
     async def verify_code(self, email: str, verification_code: str):
         """
@@ -89,15 +85,12 @@ class UserRepository:
         Returns:
             str: The result of the update operation.
         """
-        conn = await asyncpg.connect(self.database_url)
-        try:
+        async with self.database_pool.acquire() as conn:
             result = await conn.execute(
                 "UPDATE users SET is_verified = TRUE WHERE email = $1 AND verification_code = $2",
                 email, verification_code
             )
             return result
-        finally:
-            await conn.close()
 
     async def update_code(self, email: str, new_code: str):
         """
@@ -110,14 +103,11 @@ class UserRepository:
         Raises:
             Exception: If the update operation fails.
         """
-        conn = await asyncpg.connect(self.database_url)
-        try:
+        async with self.database_pool.acquire() as conn:
             await conn.execute(
                 "UPDATE users SET verification_code = $1 WHERE email = $2",
                 new_code, email
             )
-        finally:
-            await conn.close()
 
     async def delete_user(self, email: str):
         """
@@ -129,8 +119,5 @@ class UserRepository:
         Raises:
             Exception: If the user could not be removed.
         """
-        conn = await asyncpg.connect(self.database_url)
-        try:
+        async with self.database_pool.acquire() as conn:
             await conn.execute("DELETE FROM users WHERE email = $1", email)
-        finally:
-            await conn.close()
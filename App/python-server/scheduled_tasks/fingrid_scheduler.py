@@ -0,0 +1,160 @@
+"""
+fingrid_scheduler.py defines the scheduled incremental ingestion of Fingrid datasets into the Eprice backend database.
+
+Every configured dataset has its own job that fetches only the data after a watermark stored in the
+fingrid_ingestion_watermark table, upserts it in bulk and moves the watermark forward. User range
+queries then find the recent hours in the database and rarely have to wait for the Fingrid API.
+
+Features:
+- One interval job per dataset in FINGRID_DATASET_IDS, run on the application's event loop.
+- Watermark per dataset; a dataset without one continues after its latest stored entry, or starts
+  FINGRID_INGEST_LOOKBACK days back. The watermark is never later than the current hour, since stored
+  forecasts can reach into the future.
+- The last FINGRID_INGEST_OVERLAP hours before the watermark are fetched again to pick up late revisions.
+- Long catch-ups are split into ranges of FINGRID_INGEST_MAX_SPAN days, and the watermark is stored
+  after each of them.
+- The fetches go through the shared Fingrid client, rate limiter and circuit breaker, so ingestion and
+  user requests stay within one request budget, and a run is skipped while the circuit is open.
+- Per-dataset statistics for monitoring.
+
+Dependencies:
+- ext_apis.ext_apis for the Fingrid fetcher.
+- repositories.fingrid_repository for the bulk upsert and the watermarks.
+- repositories.database_pool for the shared connection pool.
+- apscheduler for the interval triggers.
+- config.secrets for the datasets and ingestion settings.
+
+Intended Usage:
+- Register the jobs with `schedule_fingrid_ingestion(scheduler)` before starting the scheduler in the
+  application lifespan; `fingrid_ingestion.stats()` reports the state of every dataset.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from apscheduler.schedulers.base import BaseScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from ext_apis.ext_apis import FetchFingridData
+from ext_apis.circuit_breaker import CircuitOpenError
+from models.data_model import TimeRange
+from repositories.fingrid_repository import FingridRepository
+from repositories.database_pool import database_pool
+from config.secrets import (
+    FINGRID_DATASET_IDS,
+    FINGRID_INGEST_INTERVAL,
+    FINGRID_INGEST_LOOKBACK,
+    FINGRID_INGEST_OVERLAP,
+    FINGRID_INGEST_MAX_SPAN,
+)
+
+
+class FingridIngestion:
+    """
+    Incremental ingestion of Fingrid datasets from a stored watermark.
+
+    Args:
+        ext_api_fetcher (FetchFingridData): Fetcher of the Fingrid API.
+        fingrid_repository (FingridRepository): Repository of the fingrid table and the watermarks.
+    """
+    def __init__(self, ext_api_fetcher: FetchFingridData, fingrid_repository: FingridRepository):
+        """
+        Initialize the ingestion.
+        """
+        self.ext_api_fetcher = ext_api_fetcher
+        self.fingrid_repository = fingrid_repository
+        self._stats: dict[int, dict] = {}
+
+    async def ingest(self, dataset_id: int) -> int:
+        """
+        Fetch and store the data of one dataset after its watermark.
+
+        Errors are logged and recorded in the statistics instead of raised, so the next scheduled
+        run simply continues from the last stored watermark.
+
+        Args:
+            dataset_id (int): The Fingrid dataset ID.
+
+        Returns:
+            int: The number of inserted or updated entries.
+        """
+        stats = self._stats.setdefault(dataset_id, {
+            "runs": 0, "failures": 0, "lastRunAt": None, "lastDurationMs": None,
+            "lastIngested": 0, "watermark": None, "lastError": None,
+        })
+        started = time.perf_counter()
+        stats["runs"] += 1
+        stats["lastRunAt"] = datetime.now(timezone.utc).isoformat()
+        ingested = 0
+        try:
+            now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            watermark = await self.fingrid_repository.get_ingestion_watermark(dataset_id)
+            if watermark is None:
+                watermark = now - timedelta(days=FINGRID_INGEST_LOOKBACK)
+            # Forecast rows stored by range queries can put the latest entry in the future
+            watermark = min(watermark, now)
+            range_start = watermark - timedelta(hours=FINGRID_INGEST_OVERLAP)
+            while range_start < now:
+                range_end = min(range_start + timedelta(days=FINGRID_INGEST_MAX_SPAN), now)
+                points = await self.ext_api_fetcher.fetch_fingrid_data_range(
+                    dataset_id, TimeRange(startTime=range_start, endTime=range_end)
+                )
+                entries = [
+                    {"value": point.value, "startTime": point.startTime.replace(microsecond=0).isoformat().replace("+00:00", "Z")}
+                    for point in points
+                ]
+                ingested += await self.fingrid_repository.upsert_entries(entries, dataset_id=dataset_id)
+                if points:
+                    # Hours after the last published one are fetched again on the next run
+                    watermark = min(max(watermark, max(point.startTime for point in points) + timedelta(hours=1)), now)
+                await self.fingrid_repository.set_ingestion_watermark(dataset_id, watermark, ingested)
+                stats["watermark"] = watermark.isoformat()
+                range_start = range_end
+            stats["lastError"] = None
+            print(f"Ingested {ingested} entries of Fingrid dataset {dataset_id}, watermark {watermark}.")
+        except CircuitOpenError as e:
+            stats["lastError"] = e.detail
+            print(f"Ingestion of Fingrid dataset {dataset_id} skipped: {e.detail}")
+        except Exception as e:
+            stats["failures"] += 1
+            stats["lastError"] = str(e) or type(e).__name__
+            print(f"Ingestion of Fingrid dataset {dataset_id} failed: {e}")
+        stats["lastIngested"] = ingested
+        stats["lastDurationMs"] = round((time.perf_counter() - started) * 1000, 3)
+        return ingested
+
+    def stats(self) -> dict:
+        """
+        Return the ingestion statistics.
+
+        Returns:
+            dict: Per dataset ID the number of runs and failures, the time, duration and ingested
+                entries of the last run, the current watermark and the last error.
+        """
+        return {str(dataset_id): dict(stats) for dataset_id, stats in self._stats.items()}
+
+
+# Shared ingestion of the Fingrid datasets, using the shared pool, client, rate limiter and circuit breaker
+fingrid_ingestion = FingridIngestion(FetchFingridData(), FingridRepository(database_pool))
+
+
+def schedule_fingrid_ingestion(scheduler: BaseScheduler, dataset_ids: list[int] = FINGRID_DATASET_IDS,
+                               interval: float = FINGRID_INGEST_INTERVAL):
+    """
+    Add one ingestion job per dataset to the scheduler. The first runs start right away.
+
+    Args:
+        scheduler (BaseScheduler): The application scheduler.
+        dataset_ids (list[int]): The datasets to ingest. Defaults to FINGRID_DATASET_IDS.
+        interval (float): Seconds between the runs of a dataset, 0 to disable the ingestion.
+    """
+    if interval <= 0:
+        print("Scheduled Fingrid ingestion is disabled.")
+        return
+    for dataset_id in dataset_ids:
+        scheduler.add_job(
+            fingrid_ingestion.ingest,
+            IntervalTrigger(seconds=interval, jitter=min(interval / 10, 60)),
+            args=[dataset_id],
+            id=f"fingrid_ingestion_{dataset_id}",
+            next_run_time=datetime.now(timezone.utc),
+            replace_existing=True,
+        )
@@ -3,143 +3,353 @@ porssisahko_scheduler.py defines scheduled tasks for fetching and inserting elec
 
 Features:
 - Periodically fetches the latest price data from the Pörssisähkö API and inserts it into the database.
-- Detects and fills missing hourly price entries by querying the API for specific dates and hours.
-- Uses APScheduler to schedule tasks at specified intervals or times.
-- Provides synchronous wrappers for running asynchronous tasks in a scheduler context.
+- Detects and fills missing hourly price entries, one Helsinki day of a missing range at a time, through the
+  planned, rate-limited and circuit-broken price fetcher and one bulk upsert per day.
+- Runs the startup backfill of missing entries as a background task with progress reporting, so the server serves immediately;
+  while the upstream's circuit is open the backfill is paused and resumed when the next trial call is allowed.
+- Uses APScheduler's AsyncIOScheduler to run the tasks on the application's event loop at specified intervals or times.
 - Handles API and database errors with logging for monitoring and debugging.
 
 Dependencies:
-- requests for HTTP requests to the external API.
-- apscheduler for scheduling background tasks.
+- ext_apis.http_clients for the pooled HTTP client of the external API.
+- ext_apis.ext_apis and utils.porssisahko_service_tools for the price fetcher and range merging.
+- apscheduler for scheduling background tasks on the event loop.
 - repositories.porssisahko_repository for database operations.
-- config.secrets for database configuration.
-- asyncio for running async functions in a synchronous context.
+- repositories.database_pool for the shared connection pool.
+- services.data_service for invalidating the cached latest price responses.
+- config.secrets for the API base URL.
 
 Intended Usage:
 - Used as part of the backend service to ensure the database is kept up-to-date with the latest and complete price data.
+- Start and stop the scheduler in the application lifespan with `start_scheduler` and `shutdown_scheduler`,
+  and the startup backfill with `start_backfill` and `stop_backfill`; `price_backfill.stats()` reports its progress.
 - Can be extended with additional scheduled tasks or triggers as needed.
 """
 
 import asyncio
-import requests
-from apscheduler.schedulers.background import BackgroundScheduler
+import time
+import httpx
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 #from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
 from repositories.porssisahko_repository import PorssisahkoRepository
-from config.secrets import DATABASE_URL
+from repositories.database_pool import database_pool
+from services.data_service import latest_price_cache
+from ext_apis.http_clients import UpstreamClient, porssisahko_client
+from ext_apis.ext_apis import FetchPriceData
+from ext_apis.circuit_breaker import CircuitOpenError
+from models.data_model import TimeRange
+from utils.porssisahko_service_tools import PorssisahkoServiceTools
+from config.secrets import PORSSISAHKO_BASE_URL
 
-# Initialize the repository with the database URL
-porssisahko_repository = PorssisahkoRepository(DATABASE_URL)
+# Initialize the repository with the shared database pool
+porssisahko_repository = PorssisahkoRepository(database_pool)
+# Price fetcher of the backfill, sharing the client, rate limiter and circuit breaker with the user requests
+price_fetcher = FetchPriceData()
+porssisahko_service_tools = PorssisahkoServiceTools(price_fetcher, porssisahko_repository)
+# Helsinki time of day after which the next day's prices are expected to be published
+PRICE_PUBLISH_HOUR = 14
+PRICE_PUBLISH_MINUTE = 15
+
+
+def last_published_hour(now: datetime) -> datetime:
+    """
+    Return the last hour whose price can already be published.
+
+    The next day's prices are published in the afternoon, so before PRICE_PUBLISH_HOUR:PRICE_PUBLISH_MINUTE
+    only today's prices are available.
+
+    Args:
+        now (datetime): The current time (naive Helsinki time).
+
+    Returns:
+        datetime: The last hour of today, or of tomorrow once its prices are published (naive Helsinki time).
+    """
+    published_days = 1 if (now.hour, now.minute) >= (PRICE_PUBLISH_HOUR, PRICE_PUBLISH_MINUTE) else 0
+    return (now + timedelta(days=published_days)).replace(hour=23, minute=0, second=0, microsecond=0)
+
+
+class BackfillProgress:
+    """
+    Progress of a backfill of missing price entries.
+
+    The state is 'idle' before the backfill starts, then 'running' ('paused' while the upstream's
+    circuit is open), and finally 'done', 'failed' (some hours could not be fetched) or 'cancelled'.
+    """
+    def __init__(self):
+        """
+        Initialize an idle backfill.
+        """
+        self.state = "idle"
+        self.start_datetime: str | None = None
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.error: str | None = None
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+
+    def start(self, start_datetime_str: str):
+        """
+        Mark the backfill as running from the given start datetime.
+        """
+        self.__init__()
+        self.state = "running"
+        self.start_datetime = start_datetime_str
+        self._started_at = time.monotonic()
+
+    def resume(self):
+        """
+        Mark a paused backfill as running again, keeping the inserted hours. Failed hours are still
+        missing, so the resumed run tries them again.
+        """
+        self.state = "running"
+        self.failed = 0
+        self.error = None
+        self._finished_at = None
+
+    def finish(self, state: str, error: str | None = None):
+        """
+        Mark the backfill as stopped with state 'paused', 'done', 'failed' or 'cancelled'.
+        """
+        self.state = state
+        self.error = error
+        self._finished_at = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        """
+        bool: Whether the backfill is in progress.
+        """
+        return self.state == "running"
+
+    def stats(self) -> dict:
+        """
+        Return the backfill progress.
+
+        Returns:
+            dict: State, start datetime, missing hours found, hours inserted, hours that could not be
+                fetched, percentage done, elapsed seconds and the last error.
+        """
+        elapsed = None
+        if self._started_at is not None:
+            elapsed = round((self._finished_at or time.monotonic()) - self._started_at, 3)
+        return {
+            "state": self.state,
+            "startDatetime": self.start_datetime,
+            "missingHours": self.total,
+            "insertedHours": self.completed,
+            "failedHours": self.failed,
+            "percent": round(100 * self.completed / self.total, 1) if self.total else (100.0 if self.state == "done" else 0.0),
+            "elapsedSeconds": elapsed,
+            "error": self.error,
+        }
+
+
+# Progress of the startup backfill, reported by the /ready endpoint
+price_backfill = BackfillProgress()
+_backfill_task: asyncio.Task | None = None
 
 # The task to fetch data and insert it into the database
-async def fetch_and_insert_porssisahko_data():
+async def fetch_and_insert_porssisahko_data(repository: PorssisahkoRepository = porssisahko_repository,
+                                            http_client: UpstreamClient = porssisahko_client):
     """
     Fetch the latest price data from the Pörssisähkö API and insert it into the database.
 
+    Args:
+        repository (PorssisahkoRepository): Repository used for the insert. Defaults to the shared pool repository.
+        http_client (UpstreamClient): HTTP client of the API. Defaults to the shared client.
+
     Raises:
-        requests.RequestException: If there is an error fetching data from the API.
+        httpx.HTTPError: If there is an error fetching data from the API.
         Exception: For any unexpected errors during data insertion.
     """
     try:
         # Fetch data from the API
-        response = requests.get("https://api.porssisahko.net/v1/latest-prices.json")
+        response = await http_client.get(f"{PORSSISAHKO_BASE_URL}/latest-prices.json")
         response.raise_for_status() # Raise an exception for HTTP errors
         data = response.json()
 
-        # Insert the data into the database using the repository
-        await porssisahko_repository.insert_entries(data["prices"])
+        # Insert the data into the database using the repository (one bulk upsert)
+        await repository.upsert_entries(data["prices"])
+        latest_price_cache.invalidate()
 
         print(f"Database successfully updated at {datetime.now()}")
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error fetching data from the API: {e}")
     except Exception as e:
         print(f"Unexpected error: {e}")
 
 
-async def fetch_and_insert_missing_porssisahko_data(start_datetime_str: str):
+async def fetch_and_insert_missing_porssisahko_data(start_datetime_str: str, repository: PorssisahkoRepository = porssisahko_repository,
+                                                    service_tools: PorssisahkoServiceTools = porssisahko_service_tools,
+                                                    progress: BackfillProgress | None = None):
     """
     Detect and insert missing hourly price entries into the database.
 
-    Args:
-        start_datetime_str (str): The ISO format string representing the start datetime.
+    Hours up to the last one whose price can already be published are checked. The missing hours
+    are merged into ranges and fetched one Helsinki day at a time with the price fetcher, which plans
+    the requests (latest-prices.json for recent hours) and goes through the shared rate limiter and
+    circuit breaker; each day is stored with one bulk upsert. If a day fails, the hours fetched before
+    the error are still stored, the others are counted as failed and the backfill continues with the
+    next day. While the circuit is open, the backfill stops with state 'paused'.
 
-    Raises:
-        requests.RequestException: If there is an error fetching data from the API.
-        Exception: For any unexpected errors during data insertion.
+    Args:
+        start_datetime_str (str): The ISO format string representing the start datetime (naive Helsinki time).
+        repository (PorssisahkoRepository): Repository used for the queries. Defaults to the shared pool repository.
+        service_tools (PorssisahkoServiceTools): Price fetcher and range helpers. Defaults to the shared instance.
+        progress (BackfillProgress | None): Progress updated while the entries are inserted. A running
+            progress (e.g. a resumed backfill) keeps its counts.
     """
+    progress = progress or BackfillProgress()
+    if not progress.running:
+        progress.start(start_datetime_str)
+    helsinki = ZoneInfo("Europe/Helsinki")
     try:
         # Convert the start_datetime string to a datetime object (db likes ISO format)
         start_datetime = datetime.fromisoformat(start_datetime_str)
         
-        # Calculate the end datetime (24 hours later)
-        end_datetime = datetime.now() + timedelta(days=1)
-        end_datetime = end_datetime.replace(minute=0, second=0, microsecond=0)
+        # Hours whose prices are not published yet would only fail, so the scan ends at the last published hour
+        end_datetime = last_published_hour(datetime.now(helsinki).replace(tzinfo=None))
         
         # Retrieve missing entries from the repository
-        missing_entries = await porssisahko_repository.get_missing_entries(
+        missing_entries = await repository.get_missing_entries(
             start_datetime, end_datetime
         )
 
         if not missing_entries:
             print(f"No missing entries found between {start_datetime} and {end_datetime}.")
+            progress.finish("failed" if progress.failed else "done", progress.error)
             return
 
         print(f"Found {len(missing_entries)} missing entries. Fetching data...")
 
-        # Fetch data for the missing entries
-        for date, hour in missing_entries:
-            # Construct the API URL for the specific date and hour
-            api_url = f"https://api.porssisahko.net/v1/price.json?date={date}&hour={hour}"
-            response = requests.get(api_url)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            data = response.json()  # Parse the JSON response
-
-            # NOTE: Since there is inconsistency in the API response format, we need to handle both cases:
-            # latest prices (utc) and hourly prices (helsinki time)
-            # Insert the data into the database -- datetime format:  "2022-11-14THH:00:00.000Z"
-            await porssisahko_repository.insert_entry(data["price"], f"{date}T{(hour):02d}:00.000Z", convert_to_helsinki_time=False)
-
-        print(f"Missing data successfully inserted into the database.")
-    except requests.RequestException as e:
-        print(f"Error fetching data from the API: {e}")
+        # The entries are naive Helsinki hours; merge them into inclusive UTC ranges
+        missing_hours = [
+            datetime.fromisoformat(date).replace(hour=hour, tzinfo=helsinki).astimezone(timezone.utc)
+            for date, hour in missing_entries
+        ]
+        ranges = service_tools.merge_ranges([(hour, hour) for hour in missing_hours])
+        # Counted from the merged ranges: the skipped hour of the spring DST change maps onto an existing hour
+        progress.total = progress.completed + progress.failed + sum(
+            int((range_end - range_start) / timedelta(hours=1)) + 1 for range_start, range_end in ranges
+        )
+
+        for range_start, range_end in ranges:
+            hours = [range_start + timedelta(hours=offset) for offset in range(int((range_end - range_start) / timedelta(hours=1)) + 1)]
+            # One chunk per Helsinki day, so progress is stored as it goes and a failed fetch fails only its own day
+            for _, day_hours in groupby(hours, key=lambda hour: hour.astimezone(helsinki).date()):
+                day_hours = list(day_hours)
+                time_range = TimeRange.model_construct(startTime=day_hours[0], endTime=day_hours[-1])
+                fetched = []
+                error = None
+                try:
+                    await service_tools.ext_api_fetcher.fetch_price_data_range(time_range, fetched)
+                except HTTPException as e:
+                    error = e
+                # The hours fetched before a failure are stored too
+                if fetched:
+                    await repository.upsert_entries([
+                        {"price": point.price, "startDate": point.startDate.replace(microsecond=0).isoformat().replace("+00:00", "Z")}
+                        for point in fetched
+                    ])
+                    progress.completed += len(fetched)
+                    latest_price_cache.invalidate()
+                if error is not None:
+                    if isinstance(error, CircuitOpenError) or not service_tools.ext_api_fetcher.circuit_breaker.closed:
+                        raise error
+                    progress.error = f"Error fetching data from the API: {error.detail}"
+                    print(f"Error fetching prices of {day_hours[0]} to {day_hours[-1]}: {error.detail}")
+                progress.failed += len(day_hours) - len(fetched)
+
+        progress.finish("failed" if progress.failed else "done", progress.error)
+        print(f"Missing data inserted into the database ({progress.completed} hours, {progress.failed} failed).")
+    except asyncio.CancelledError:
+        progress.finish("cancelled")
+        raise
+    except HTTPException as e:
+        # Raised above only when the circuit is open; the upstream is unavailable, not the data
+        progress.finish("paused", f"Upstream unavailable: {e.detail}")
+        print(f"Backfill of missing price data paused: {e.detail}")
     except Exception as e:
+        progress.finish("failed", f"Unexpected error: {e}")
         print(f"Unexpected error: {e}")
 
 
-# we need a wrapper to run the async task in a synchronous context
-def fetch_and_insert_porssisahko_data_sync():
+async def _run_backfill(start_datetime_str: str, progress: BackfillProgress):
     """
-    Synchronous wrapper to run fetch_and_insert_porssisahko_data in an event loop.
+    Run the backfill, resuming it whenever it paused on an open circuit.
     """
-    asyncio.run(fetch_and_insert_porssisahko_data())
+    breaker = porssisahko_service_tools.ext_api_fetcher.circuit_breaker
+    while True:
+        await fetch_and_insert_missing_porssisahko_data(start_datetime_str, progress=progress)
+        if progress.state != "paused":
+            return
+        await asyncio.sleep(max(breaker.retry_in(), 1.0))
+        progress.resume()
 
-def fetch_and_insert_missing_porssisahko_data_sync(start_datetime_str: str):
+
+def start_backfill(start_datetime_str: str):
     """
-    Synchronous wrapper to run fetch_and_insert_missing_porssisahko_data in an event loop.
+    Start the backfill of missing price entries as a background task on the running event loop.
+
+    Does nothing if a backfill is already running.
 
     Args:
         start_datetime_str (str): The ISO format string representing the start datetime.
     """
-    asyncio.run(fetch_and_insert_missing_porssisahko_data(start_datetime_str))
+    global _backfill_task
+    if _backfill_task is not None and not _backfill_task.done():
+        return
+    # The progress is marked running right away, so readiness reports it before the task gets to run
+    price_backfill.start(start_datetime_str)
+    _backfill_task = asyncio.create_task(_run_backfill(start_datetime_str, price_backfill))
+    print(f"Backfill of missing price data from {start_datetime_str} started in the background.")
+
+
+async def stop_backfill():
+    """
+    Cancel a running backfill and wait for it to stop. Called on application shutdown.
+    """
+    global _backfill_task
+    if _backfill_task is not None and not _backfill_task.done():
+        _backfill_task.cancel()
+        try:
+            await _backfill_task
+        except asyncio.CancelledError:
+            pass
+        print("Backfill of missing price data cancelled.")
+    _backfill_task = None
 
 
-# Set up the scheduler
-ps_scheduler = BackgroundScheduler()
-# Trigger to run the task every day at 14:15
-ps_trigger = CronTrigger(hour=14, minute=15)
+# Set up the scheduler. It runs on the application's event loop, so the jobs share the application
+# database pool and the pooled HTTP client; it is started and stopped in the lifespan of main.py.
+ps_scheduler = AsyncIOScheduler(job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 3600})
+# Trigger to run the task every day at 14:15, when the next day's prices are published
+ps_trigger = CronTrigger(hour=PRICE_PUBLISH_HOUR, minute=PRICE_PUBLISH_MINUTE)
 
 # NOTE DEBUG: For debugging/testing purposes, you can use an interval trigger to run every 15 seconds or so
 #ps_trigger = IntervalTrigger(seconds=10)
 
-ps_scheduler.add_job(fetch_and_insert_porssisahko_data_sync, ps_trigger)
-ps_scheduler.start()
+ps_scheduler.add_job(fetch_and_insert_porssisahko_data, ps_trigger, id="porssisahko_latest_prices")
+
+def start_scheduler():
+    """
+    Start the scheduler on the running event loop. Must be called from the application lifespan.
+    """
+    if not ps_scheduler.running:
+        ps_scheduler.start()
+        print("Scheduler started.")
 
 # Ensure the scheduler shuts down properly on application exit
 def shutdown_scheduler():
     """
     Shut down the APScheduler instance gracefully on application exit.
     """
-    print("Shutting down scheduler...")
-    ps_scheduler.shutdown()
-
+    if ps_scheduler.running:
+        print("Shutting down scheduler...")
+        ps_scheduler.shutdown(wait=False)
@@ -13,10 +13,65 @@ from repositories.porssisahko_repository import *
 from repositories.fingrid_repository import FingridRepository
 from utils.porssisahko_service_tools import *
 from utils.fingrid_service_tools import *
-from config.secrets import DATABASE_URL
-from datetime import datetime
+from repositories.database_pool import database_pool
+from utils.coverage_index import coverage_index, PORSSISAHKO_COVERAGE_KEY, fingrid_coverage_key
+from utils.cache_tools import LRUCache, TTLCache, SingleFlight, RefreshingCache
+from utils.hourly_series import HourlySeries
+from ext_apis.circuit_breaker import CircuitBreaker
+from config.secrets import (
+    PRICE_DAY_CACHE_SIZE,
+    LATEST_PRICE_CACHE_TTL,
+    FINGRID_DATASET_IDS,
+    FINGRID_LATEST_TTLS,
+    FINGRID_LATEST_DEFAULT_TTL,
+)
+from utils.fast_json import encode_price_series
+from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
+# Bounds (naive Helsinki time) used when loading the whole coverage of a table
+COVERAGE_START = datetime(1970, 1, 1)
+COVERAGE_END = datetime(2100, 1, 1)
+
+# Serialized JSON responses of the latest 48 hours and today's prices, keyed by the expected time range.
+# Module level so that the price scheduler can invalidate it after ingesting new prices.
+latest_price_cache = TTLCache(LATEST_PRICE_CACHE_TTL)
+
+def to_naive_helsinki(time_range: TimeRange) -> tuple[datetime, datetime]:
+    """
+    Convert a time range to the naive Helsinki datetimes stored in the database.
+
+    Args:
+        time_range (TimeRange): Start and end time as timezone-aware datetimes.
+
+    Returns:
+        tuple[datetime, datetime]: Start and end as naive Europe/Helsinki datetimes.
+    """
+    tz = ZoneInfo("Europe/Helsinki")
+    return (
+        time_range.startTime.astimezone(tz).replace(tzinfo=None),
+        time_range.endTime.astimezone(tz).replace(tzinfo=None),
+    )
+
+def mark_stale(series: HourlySeries, breaker: CircuitBreaker, key, revalidate) -> HourlySeries:
+    """
+    Flag a series with missing hours as stale while the upstream's circuit is not closed, and
+    schedule its background revalidation.
+
+    Args:
+        series (HourlySeries): The series assembled from the database and caches.
+        breaker (CircuitBreaker): The circuit breaker of the series' upstream.
+        key (Hashable): Identifies the series, so one revalidation per series is pending.
+        revalidate (Callable[[], Awaitable]): Reloads the series.
+
+    Returns:
+        HourlySeries: The same series.
+    """
+    if not breaker.closed and series.count < len(series):
+        series.stale = True
+        breaker.schedule_revalidation(key, revalidate)
+    return series
+
 class FingridDataService:
     """
     Service class for fetching Fingrid data from the external API.
@@ -27,23 +82,52 @@ class FingridDataService:
         Initialize the FingridDataService with the external API fetcher.
         """
         self.ext_api_fetcher = FetchFingridData()
-        self.fingrid_repository = FingridRepository(DATABASE_URL)
+        self.fingrid_repository = FingridRepository(database_pool)
         self.fingrid_service_tools = FingridServiceTools(self.ext_api_fetcher, self.fingrid_repository)
+        self.single_flight = SingleFlight()
+        # Data points around the current time per dataset, reloaded in the background at the dataset's update cadence
+        self.latest_cache = RefreshingCache(
+            self.ext_api_fetcher.fetch_fingrid_data_window,
+            {dataset_id: FINGRID_LATEST_TTLS.get(dataset_id, FINGRID_LATEST_DEFAULT_TTL) for dataset_id in FINGRID_DATASET_IDS},
+            FINGRID_LATEST_DEFAULT_TTL,
+        )
 
-    async def fingrid_data(self, dataset_id: int) -> FingridDataPoint:
+    async def load_coverage_index(self, dataset_ids: List[int]):
         """
-        Fetch the latest Fingrid data for a given dataset ID.
+        Load the hourly coverage index of the given Fingrid datasets from the database.
+
+        Args:
+            dataset_ids (List[int]): The Fingrid dataset IDs to load.
+        """
+        for dataset_id in dataset_ids:
+            try:
+                rows = await self.fingrid_repository.get_entries(
+                    start_date=COVERAGE_START, end_date=COVERAGE_END, dataset_id=dataset_id, select_columns="datetime"
+                )
+                coverage_index.load(fingrid_coverage_key(dataset_id), (row["datetime"] for row in rows))
+                print(f"Coverage index loaded for Fingrid dataset {dataset_id} ({len(rows)} entries).")
+            except Exception as e:
+                print(f"Failed to load coverage index for Fingrid dataset {dataset_id}: {e}")
+
+    async def fingrid_data(self, dataset_id: int) -> tuple[FingridDataPoint, bool]:
+        """
+        Get the latest Fingrid data for a given dataset ID.
+
+        The data points around the current time are served from the latest-value cache; the
+        closest one is picked at read time, so the answer follows the clock between reloads.
+        If the cached points have expired and cannot be reloaded, the expired points are used.
 
         Args:
             dataset_id (int): The Fingrid dataset ID.
 
         Returns:
-            FingridDataPoint: The latest data point.
+            tuple[FingridDataPoint, bool]: The latest data point, and whether it comes from expired data.
         
         Raises:
-            HTTPException: If the API call fails or no data is available.
+            HTTPException: If the API call fails and nothing is cached, or no data is available.
         """
-        return await self.ext_api_fetcher.fetch_fingrid_data(dataset_id)
+        points, stale = await self.latest_cache.get(dataset_id)
+        return closest_data_point(points, datetime.now(timezone.utc)), stale
     
     async def fingrid_data_range(self, dataset_id: int, time_range: TimeRange) -> List[FingridDataPoint]:
         """
@@ -60,13 +144,63 @@ class FingridDataService:
         Raises:
             HTTPException: If the API call fails or no data is available.
         """
-            
+        series = await self.fingrid_series_range(dataset_id, time_range)
+        return series.to_fingrid_points()
+
+    async def fingrid_series_range(self, dataset_id: int, time_range: TimeRange) -> HourlySeries:
+        """
+        Fetch Fingrid data for a given dataset ID and time range as an hourly series.
+
+        Args:
+            dataset_id (int): The Fingrid dataset ID.
+            time_range (TimeRange): Start and end time in UTC.
+
+        Returns:
+            HourlySeries: Series of the dataset values for the given range.
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        # Concurrent identical requests share one database read and one upstream fill
+        key = (dataset_id, time_range.startTime.astimezone(timezone.utc), time_range.endTime.astimezone(timezone.utc))
+        return await self.single_flight.do(key, lambda: self._fingrid_series_range(dataset_id, time_range))
+
+    async def fingrid_range_version(self, dataset_id: int, time_range: TimeRange) -> dict:
+        """
+        Read the stored data version of a Fingrid dataset range, used as its HTTP cache validator.
+
+        Args:
+            dataset_id (int): The Fingrid dataset ID.
+            time_range (TimeRange): Start and end time in UTC.
+
+        Returns:
+            dict: 'count' and 'last_modified' of the stored entries, and 'complete' (bool), whether
+                every hour of the range is stored.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        start, end = to_naive_helsinki(time_range)
+        version = await self.fingrid_repository.get_range_version(start, end, dataset_id)
+        complete = coverage_index.covers(fingrid_coverage_key(dataset_id), time_range.startTime, time_range.endTime)
+        if complete is None:
+            complete = version["count"] >= len(HourlySeries.for_range(time_range.startTime, time_range.endTime))
+        version["complete"] = complete
+        return version
+
+    async def _fingrid_series_range(self, dataset_id: int, time_range: TimeRange) -> HourlySeries:
+        breaker = self.ext_api_fetcher.circuit_breaker
+        series = None
         try:
-            result = await self.fingrid_service_tools.fetch_and_process_data(time_range, dataset_id)
-            return result if result else await self.ext_api_fetcher.fetch_fingrid_data_range(dataset_id, time_range)
+            series = await self.fingrid_service_tools.fetch_and_process_data(time_range, dataset_id)
+            if series.count or not breaker.closed:
+                # While the upstream is unavailable, serve what is stored instead of retrying the whole range
+                return mark_stale(series, breaker, ("fingrid", dataset_id, time_range.startTime, time_range.endTime),
+                                  lambda: self.fingrid_series_range(dataset_id, time_range))
         except Exception:
             print(f"Failed to fetch Fingrid data for dataset_id {dataset_id} in range {time_range.startTime} to {time_range.endTime}")
-            return await self.ext_api_fetcher.fetch_fingrid_data_range(dataset_id, time_range)
+        data = await self.ext_api_fetcher.fetch_fingrid_data_range(dataset_id, time_range)
+        return self.fingrid_service_tools.series_from_points(data, time_range.startTime, time_range.endTime)
 
 
 class PriceDataService:
@@ -79,8 +213,24 @@ class PriceDataService:
         Initialize the PriceDataService with required repositories and helper services.
         """
         self.ext_api_fetcher = FetchPriceData()
-        self.porssisahko_repository = PorssisahkoRepository(DATABASE_URL)
+        self.porssisahko_repository = PorssisahkoRepository(database_pool)
         self.porssisahko_service_tools = PorssisahkoServiceTools(self.ext_api_fetcher, self.porssisahko_repository)
+        # Finalized Helsinki days: date -> HourlySeries of the day
+        self.day_segment_cache = LRUCache(PRICE_DAY_CACHE_SIZE)
+        self.single_flight = SingleFlight()
+
+    async def load_coverage_index(self):
+        """
+        Load the hourly coverage index of the price data from the database.
+        """
+        try:
+            rows = await self.porssisahko_repository.get_entries(
+                start_date=COVERAGE_START, end_date=COVERAGE_END, select_columns="datetime"
+            )
+            coverage_index.load(PORSSISAHKO_COVERAGE_KEY, (row["datetime"] for row in rows))
+            print(f"Coverage index loaded for price data ({len(rows)} entries).")
+        except Exception as e:
+            print(f"Failed to load coverage index for price data: {e}")
 
     async def price_data_latest(self) -> List[PriceDataPoint]:
         """
@@ -89,21 +239,83 @@ class PriceDataService:
         Returns:
             List[PriceDataPoint]: List of price data points for the latest 48 hours.
 
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        series = await self.price_series_latest()
+        return series.to_price_points()
+
+    async def price_series_latest(self) -> HourlySeries:
+        """
+        Fetch the latest 48 hours of price data as an hourly series.
+
+        Returns:
+            HourlySeries: Price series of the latest 48 hours.
+
         Raises:
             HTTPException: If the API call fails or no data is available.
         """
         start_time, end_time = self.porssisahko_service_tools.expected_time_range()
+        return await self.single_flight.do(("latest", start_time, end_time), lambda: self._price_series_latest(start_time, end_time))
+
+    async def _price_series_latest(self, start_time: datetime, end_time: datetime) -> HourlySeries:
         time_range = TimeRange(startTime=start_time, endTime=end_time)
+        breaker = self.ext_api_fetcher.circuit_breaker
         try:
-            result = await self.porssisahko_service_tools.fetch_and_process_data(time_range)
-            return result if result else await self.ext_api_fetcher.fetch_price_data_latest()
+            series = await self.porssisahko_service_tools.fetch_and_process_data(time_range)
+            if series.count or not breaker.closed:
+                return mark_stale(series, breaker, ("latest", start_time, end_time), self.price_series_latest)
         except Exception:
-            return await self.ext_api_fetcher.fetch_price_data_latest()
+            pass
+        data = await self.ext_api_fetcher.fetch_price_data_latest()
+        return self.porssisahko_service_tools.series_from_points(data, time_range.startTime, time_range.endTime)
+
+    async def price_data_latest_json(self) -> tuple[bytes, bool]:
+        """
+        Return the latest 48 hours of price data as serialized JSON, cached until the window moves
+        or the price scheduler ingests new prices.
+
+        Returns:
+            tuple[bytes, bool]: JSON array of price data points, and whether it is stale (hours
+                missing while the upstream is unavailable).
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        return await self._cached_latest_json("latest", self.price_series_latest)
+
+    async def price_data_today_json(self) -> tuple[bytes, bool]:
+        """
+        Return today's price data as serialized JSON, cached like price_data_latest_json.
+
+        Returns:
+            tuple[bytes, bool]: JSON array of price data points, and whether it is stale.
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        return await self._cached_latest_json("today", self.price_series_today)
+
+    async def _cached_latest_json(self, name: str, loader) -> tuple[bytes, bool]:
+        # The expected time range moves at midnight and at 14:00, which also changes the current day
+        key = (name, *self.porssisahko_service_tools.expected_time_range())
+        content = latest_price_cache.get(key)
+        if content is not None:
+            return content, False
+        generation = latest_price_cache.generation
+        series = await loader()
+        content = encode_price_series(series)
+        # Stale responses are not cached, so the next request sees the revalidated data
+        if not series.stale:
+            latest_price_cache.put(key, content, generation)
+        return content, series.stale
 
     async def price_data_range(self, time_range : TimeRangeRequest) -> List[PriceDataPoint]:
         """
         Fetch price data for a given time range, preferring the database but falling back to the external API if needed.
 
+        Past Helsinki days are served from the day segment cache when possible.
+
         Args:
             start_date (datetime): Start of the time range.
             end_date (datetime): End of the time range.
@@ -114,12 +326,98 @@ class PriceDataService:
         Raises:
             HTTPException: If the API call fails or no data is available.
         """
+        series = await self.price_series_range(time_range)
+        return series.to_price_points()
+
+    async def price_series_range(self, time_range: TimeRangeRequest) -> HourlySeries:
+        """
+        Fetch price data for a given time range as an hourly series.
+
+        Args:
+            time_range (TimeRangeRequest): Start and end time as datetime objects.
+
+        Returns:
+            HourlySeries: Price series for the given range.
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        # Concurrent identical requests share one database read and one upstream fill
+        key = ("range", time_range.startTime.astimezone(timezone.utc), time_range.endTime.astimezone(timezone.utc))
+        return await self.single_flight.do(key, lambda: self._price_series_range(time_range))
+
+    async def price_range_version(self, time_range: TimeRangeRequest) -> dict:
+        """
+        Read the stored data version of a price range, used as its HTTP cache validator.
+
+        Args:
+            time_range (TimeRangeRequest): Start and end time as datetime objects.
+
+        Returns:
+            dict: 'count' and 'last_modified' of the stored entries, and 'complete' (bool), whether
+                every hour of the range is stored.
+
+        Raises:
+            asyncpg.PostgresError: If a database error occurs.
+        """
+        start, end = to_naive_helsinki(time_range)
+        version = await self.porssisahko_repository.get_range_version(start, end)
+        complete = coverage_index.covers(PORSSISAHKO_COVERAGE_KEY, time_range.startTime, time_range.endTime)
+        if complete is None:
+            complete = version["count"] >= len(HourlySeries.for_range(time_range.startTime, time_range.endTime))
+        version["complete"] = complete
+        return version
 
+    async def _price_series_range(self, time_range: TimeRangeRequest) -> HourlySeries:
+        breaker = self.ext_api_fetcher.circuit_breaker
         try:
-            result = await self.porssisahko_service_tools.fetch_and_process_data(time_range)
-            return result if result else await self.ext_api_fetcher.fetch_price_data_range(time_range)
+            series = await self.price_series_range_cached(time_range)
+            if series.count or not breaker.closed:
+                return mark_stale(series, breaker, ("range", time_range.startTime, time_range.endTime),
+                                  lambda: self.price_series_range(time_range))
         except Exception:
-            return await self.ext_api_fetcher.fetch_price_data_range(time_range)
+            pass
+        data = await self.ext_api_fetcher.fetch_price_data_range(time_range)
+        return self.porssisahko_service_tools.series_from_points(data, time_range.startTime, time_range.endTime)
+
+    async def price_series_range_cached(self, time_range: TimeRangeRequest) -> HourlySeries:
+        """
+        Assemble the price series of a time range from cached day segments and the database.
+
+        Whole past Helsinki days are taken from the day segment cache. Days that are not cached, the
+        current and future days, and the partial days at the edges of the range are fetched with
+        fetch_and_process_data. Complete past days fetched on the way are added to the cache.
+
+        Args:
+            time_range (TimeRangeRequest): Start and end time as datetime objects.
+
+        Returns:
+            HourlySeries: Price series for the range.
+        """
+        tools = self.porssisahko_service_tools
+        today = datetime.now(ZoneInfo("Europe/Helsinki")).date()
+        days, fetch_ranges = tools.split_full_days(time_range)
+        result = HourlySeries.for_range(time_range.startTime, time_range.endTime)
+        cacheable_days = []
+        for day in days:
+            segment = self.day_segment_cache.get(day) if day < today else None
+            if segment is not None:
+                result.update(segment)
+                continue
+            if day < today:
+                cacheable_days.append(day)
+            fetch_ranges.append(tools.day_bounds_utc(day))
+
+        for range_start, range_end in tools.merge_ranges(fetch_ranges):
+            # A single hour has start equal to end, which the validated model does not allow
+            series = await tools.fetch_and_process_data(TimeRange.model_construct(startTime=range_start, endTime=range_end))
+            result.update(series)
+        for day in cacheable_days:
+            segment = result.slice(*tools.day_bounds_utc(day))
+            if tools.is_complete_day(segment):
+                self.day_segment_cache.put(day, segment)
+
+        return result
 
     async def price_data_today(self) -> List[PriceDataPoint]:
         """
@@ -131,14 +429,66 @@ class PriceDataService:
         Raises:
             HTTPException: If the API call fails or no data is available.
         """
-        data = await self.price_data_latest()
-        if data:
-            now_fi = datetime.now(ZoneInfo("Europe/Helsinki"))
-            today_fi = now_fi.date()
-            filtered_data = [item for item in data if item.startDate.astimezone(ZoneInfo("Europe/Helsinki")).date() == today_fi]
-            return sorted(filtered_data, key=lambda x: x.startDate, reverse=False)
+        series = await self.price_series_today()
+        return series.to_price_points()
+
+    async def price_series_today(self) -> HourlySeries:
+        """
+        Fetch price data for the current day in Helsinki time as an hourly series.
+
+        Returns:
+            HourlySeries: Price series of today.
+
+        Raises:
+            HTTPException: If the API call fails or no data is available.
+        """
+        tools = self.porssisahko_service_tools
+        today_bounds = tools.day_bounds_utc(datetime.now(ZoneInfo("Europe/Helsinki")).date())
+        series = await self.price_series_latest()
+        if series.count or series.stale:
+            today = series.slice(*today_bounds)
+            today.stale = series.stale
+            return today
         else:
-            return await self.ext_api_fetcher.fetch_price_data_today()
+            data = await self.ext_api_fetcher.fetch_price_data_today()
+            return tools.series_from_points(data, *today_bounds)
+
+    async def price_stats_partials(self, time_range: TimeRangeRequest, group_by: str) -> dict:
+        """
+        Collect partial sums for the average price statistics of a time range.
+
+        The historic part of the range, before the current Helsinki day, is aggregated in the database:
+        whole days are read from the per-day rollup table and the partial days at its edges with a
+        GROUP BY query. Only the tail from the current day onwards is read through price_series_range,
+        which also fills missing hours from the external API.
+
+        Args:
+            time_range (TimeRangeRequest): Start and end time as datetime objects.
+            group_by (str): "hour" for the Helsinki hour of day, "weekday" for the Helsinki weekday.
+
+        Returns:
+            dict: Partial sums {key: (sum, count)}.
+        """
+        tools = self.porssisahko_service_tools
+        historic, tail = tools.split_historic(time_range)
+        partials = {}
+        if historic:
+            days, edges = tools.split_full_days(TimeRange.model_construct(startTime=historic[0], endTime=historic[1]))
+            if days:
+                rollups = await self.porssisahko_repository.get_daily_rollups(days[0], days[-1])
+                tools.accumulate_daily_rollups(partials, rollups, group_by)
+            for edge_start, edge_end in edges:
+                aggregates = await self.porssisahko_repository.get_price_aggregates(
+                    edge_start.astimezone(ZoneInfo("Europe/Helsinki")).replace(tzinfo=None),
+                    edge_end.astimezone(ZoneInfo("Europe/Helsinki")).replace(tzinfo=None),
+                    group_by
+                )
+                tools.accumulate_aggregates(partials, aggregates)
+        if tail:
+            # A single hour has start equal to end, which the validated model does not allow
+            series = await self.price_series_range(TimeRange.model_construct(startTime=tail[0], endTime=tail[1]))
+            tools.accumulate_series(partials, series, group_by)
+        return partials
 
     async def price_data_hourly_avg(self, time_range):
         """
@@ -153,8 +503,8 @@ class PriceDataService:
         Raises:
             HTTPException: If the API call fails or no data is available.
         """
-        data = await self.price_data_range(time_range)
-        return self.porssisahko_service_tools.calculate_hourly_avg_price(data)
+        partials = await self.price_stats_partials(time_range, "hour")
+        return self.porssisahko_service_tools.calculate_hourly_avg_price(partials)
     
 
     
@@ -168,7 +518,6 @@ class PriceDataService:
         Returns:
             List[PriceAvgByWeekdayPoint]: List of average prices by weekday.
         """
-        data = await self.price_data_range(time_range)
+        partials = await self.price_stats_partials(time_range, "weekday")
         
-        return self.porssisahko_service_tools.calculate_avg_by_weekday(data)
-    
\ No newline at end of file
+        return self.porssisahko_service_tools.calculate_avg_by_weekday(partials)
@@ -0,0 +1,87 @@
+"""
+export_service.py
+
+This module provides the service for exporting stored price and Fingrid data in analytics formats.
+
+The export reads the database through a server-side cursor and converts each batch of rows to an
+Arrow record batch, so a multi-year export streams with bounded memory. Only data already in the
+database is exported; missing hours are not fetched from the external APIs.
+"""
+
+from typing import AsyncIterator, List, Optional
+from zoneinfo import ZoneInfo
+from models.data_model import TimeRangeRequest
+from repositories.database_pool import database_pool
+from repositories.porssisahko_repository import PorssisahkoRepository
+from repositories.fingrid_repository import FingridRepository
+from utils.arrow_export import (
+    EXPORT_COLUMNS, ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE,
+    select_expressions, build_schema, stream_arrow_ipc, stream_parquet,
+)
+from config.secrets import EXPORT_BATCH_SIZE
+
+# Exportable datasets: name -> (table, Fingrid dataset ID)
+EXPORT_DATASETS = {
+    "price": ("porssisahko", None),
+    "windpower": ("fingrid", 245),
+    "consumption": ("fingrid", 165),
+    "production": ("fingrid", 241),
+}
+
+# Export formats: name -> (stream writer, media type, file extension)
+EXPORT_FORMATS = {
+    "arrow": (stream_arrow_ipc, ARROW_STREAM_MEDIA_TYPE, "arrows"),
+    "parquet": (stream_parquet, PARQUET_MEDIA_TYPE, "parquet"),
+}
+
+
+class ExportService:
+    """
+    Service class for streaming stored data as Arrow IPC or Parquet.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ExportService with the price and Fingrid repositories.
+        """
+        self.porssisahko_repository = PorssisahkoRepository(database_pool)
+        self.fingrid_repository = FingridRepository(database_pool)
+
+    def export(self, dataset: str, time_range: TimeRangeRequest, columns: Optional[List[str]], export_format: str) -> tuple[AsyncIterator[bytes], str, str]:
+        """
+        Prepare a streaming export of one dataset.
+
+        The request is validated before any data is read, so invalid requests fail before the
+        response starts.
+
+        Args:
+            dataset (str): The dataset name, a key of EXPORT_DATASETS.
+            time_range (TimeRangeRequest): Start and end time (inclusive) as UTC datetimes.
+            columns (Optional[List[str]]): The columns to export. Default (None) exports every column of the dataset.
+            export_format (str): The format name, a key of EXPORT_FORMATS.
+
+        Returns:
+            tuple[AsyncIterator[bytes], str, str]: The body stream, its media type and a file name.
+
+        Raises:
+            ValueError: If the dataset, a column or the format is unknown.
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Unknown dataset {dataset}. Allowed datasets: {', '.join(EXPORT_DATASETS)}")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format {export_format}. Allowed formats: {', '.join(EXPORT_FORMATS)}")
+        table, dataset_id = EXPORT_DATASETS[dataset]
+        columns = columns or list(EXPORT_COLUMNS[table])
+        schema = build_schema(table, columns)
+        select_columns = select_expressions(table, columns)
+
+        # The tables store naive Helsinki time
+        start = time_range.startTime.astimezone(ZoneInfo("Europe/Helsinki")).replace(tzinfo=None)
+        end = time_range.endTime.astimezone(ZoneInfo("Europe/Helsinki")).replace(tzinfo=None)
+        if dataset_id is None:
+            row_batches = self.porssisahko_repository.iter_entry_batches(start, end, select_columns, EXPORT_BATCH_SIZE)
+        else:
+            row_batches = self.fingrid_repository.iter_entry_batches(start, end, dataset_id, select_columns, EXPORT_BATCH_SIZE)
+
+        writer, media_type, extension = EXPORT_FORMATS[export_format]
+        return writer(row_batches, schema), media_type, f"{dataset}.{extension}"
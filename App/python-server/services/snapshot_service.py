@@ -0,0 +1,89 @@
+"""
+snapshot_service.py
+
+This module provides the service for the combined grid snapshot: several Fingrid datasets and the
+electricity price over one time range, aligned on a shared hourly time axis.
+
+The datasets are loaded concurrently through the Fingrid and price services, so a snapshot takes
+about as long as its slowest dataset and reuses their caches and coalescing of identical requests.
+A dataset that fails is reported in the snapshot's errors instead of failing the whole snapshot, and
+a dataset served from stored data while its upstream is unavailable keeps its stale flag.
+"""
+
+import asyncio
+from typing import Dict, List
+from fastapi import HTTPException
+from models.data_model import TimeRangeRequest
+from services.data_service import FingridDataService, PriceDataService
+from utils.hourly_series import HourlySeries
+
+# Snapshot datasets: name -> Fingrid dataset ID, or None for the price
+SNAPSHOT_DATASETS = {
+    "windpower": 245,
+    "consumption": 165,
+    "production": 241,
+    "price": None,
+}
+
+
+class SnapshotService:
+    """
+    Service class for loading several datasets on a shared time axis.
+    """
+
+    def __init__(self, fingrid_data_service: FingridDataService, price_data_service: PriceDataService):
+        """
+        Initialize the SnapshotService with the services that load the datasets.
+
+        Args:
+            fingrid_data_service (FingridDataService): Loads the Fingrid datasets.
+            price_data_service (PriceDataService): Loads the price.
+        """
+        self.fingrid_data_service = fingrid_data_service
+        self.price_data_service = price_data_service
+
+    async def snapshot(self, datasets: List[str], time_range: TimeRangeRequest) -> tuple[HourlySeries, Dict[str, HourlySeries], Dict[str, str]]:
+        """
+        Load the requested datasets concurrently and align them on the hours of the time range.
+
+        Args:
+            datasets (List[str]): The dataset names, keys of SNAPSHOT_DATASETS. Duplicates are ignored.
+            time_range (TimeRangeRequest): Start and end time (inclusive) as UTC datetimes.
+
+        Returns:
+            tuple[HourlySeries, Dict[str, HourlySeries], Dict[str, str]]: The empty series of the shared
+                time axis, the series per loaded dataset in the requested order, and the error
+                message per dataset that failed.
+
+        Raises:
+            ValueError: If no dataset or an unknown dataset is requested.
+            HTTPException: If every requested dataset fails.
+        """
+        names = list(dict.fromkeys(datasets))
+        if not names:
+            raise ValueError(f"No datasets requested. Allowed datasets: {', '.join(SNAPSHOT_DATASETS)}")
+        unknown = [name for name in names if name not in SNAPSHOT_DATASETS]
+        if unknown:
+            raise ValueError(f"Unknown dataset(s) {', '.join(unknown)}. Allowed datasets: {', '.join(SNAPSHOT_DATASETS)}")
+
+        results = await asyncio.gather(*(self._load(name, time_range) for name in names), return_exceptions=True)
+
+        axis = HourlySeries.for_range(time_range.startTime, time_range.endTime)
+        series = {}
+        errors = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                print(f"Snapshot dataset {name} failed: {result}")
+                errors[name] = result.detail if isinstance(result, HTTPException) else str(result)
+            else:
+                series[name] = result.slice(time_range.startTime, time_range.endTime)
+                series[name].stale = result.stale
+        if not series:
+            raise HTTPException(status_code=500, detail="; ".join(f"{name}: {error}" for name, error in errors.items()))
+        return axis, series, errors
+
+    async def _load(self, name: str, time_range: TimeRangeRequest) -> HourlySeries:
+        dataset_id = SNAPSHOT_DATASETS[name]
+        if dataset_id is None:
+            return await self.price_data_service.price_series_range(time_range)
+        return await self.fingrid_data_service.fingrid_series_range(dataset_id=dataset_id, time_range=time_range)
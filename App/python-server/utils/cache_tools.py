@@ -0,0 +1,374 @@
+"""
+cache_tools.py
+
+This module provides in-memory caches for the Eprice backend services.
+
+Classes:
+    - LRUCache: Bounded least-recently-used cache with hit and miss counters.
+    - TTLCache: Cache whose entries expire after a fixed time to live, with hit and miss counters.
+    - SingleFlight: Coalesces concurrent identical async calls into one in-flight task.
+    - RefreshingCache: Per-key cache with its own time to live per key, refreshed in the background.
+
+Intended Usage:
+    - Create one cache per cached resource in the service that owns it and report its
+      statistics through the status endpoints.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache.
+
+    When the cache is full, adding a new key evicts the least recently used entry.
+
+    Args:
+        max_size (int): The maximum number of entries.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int): The maximum number of entries.
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value of a key and mark it as recently used.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): The value returned if the key is not cached. Default is None.
+
+        Returns:
+            Any: The cached value or the default.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Add or replace a cached value.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable = None):
+        """
+        Remove one key, or every entry if no key is given.
+
+        Args:
+            key (Hashable): The cache key. Default is None (clear the whole cache).
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Return statistics of the cache.
+
+        Returns:
+            dict: Number of entries, maximum size, hits, misses, hit ratio and evictions.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+class TTLCache:
+    """
+    Cache whose entries expire a fixed number of seconds after they were added.
+
+    Entries can also be invalidated explicitly, e.g. by the scheduled jobs on the event loop when
+    the underlying data is known to change. Every invalidation bumps `generation`; a value computed
+    before an invalidation, e.g. by a request that was waiting for the database meanwhile, is not
+    stored if the caller passes the generation it started with.
+
+    Args:
+        ttl (float): Time to live of an entry in seconds.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl (float): Time to live of an entry in seconds.
+        """
+        self.ttl = ttl
+        self._entries: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value of a key if it has not expired.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): The value returned if the key is not cached or has expired. Default is None.
+
+        Returns:
+            Any: The cached value or the default.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any, generation: int = None):
+        """
+        Add or replace a cached value. Expired entries are dropped at the same time.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+            generation (int): The generation read before computing the value. If the cache has been
+                invalidated since, the value is not stored. Default is None (always store).
+        """
+        if generation is not None and generation != self.generation:
+            return
+        now = time.monotonic()
+        self._entries = {k: entry for k, entry in self._entries.items() if entry[0] > now}
+        self._entries[key] = (now + self.ttl, value)
+
+    def invalidate(self):
+        """
+        Remove every entry.
+        """
+        self._entries = {}
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        """
+        Return statistics of the cache.
+
+        Returns:
+            dict: Number of entries, time to live, hits, misses, hit ratio and invalidations.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight task.
+
+    The first caller starts the task; callers arriving while it runs await the same task and get
+    the same result object (or exception), so the result must not be modified in place. The task
+    is shielded, so a cancelled caller does not cancel the work the other callers wait for.
+    """
+
+    def __init__(self):
+        """
+        Initialize with no calls in flight.
+        """
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn, or join the call already in flight for the same key.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            fn (Callable[[], Awaitable[Any]]): Creates the coroutine to run if no call is in flight.
+
+        Returns:
+            Any: The result of the shared call.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self.calls += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """
+        Return statistics of the coalesced calls.
+
+        Returns:
+            dict: Calls in flight, calls started and calls that joined an in-flight call.
+        """
+        return {
+            "inFlight": len(self._tasks),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
+
+
+class RefreshingCache:
+    """
+    Per-key cache whose entries are reloaded in the background before they expire.
+
+    Every key has its own time to live. After `start()`, one background task per configured key
+    reloads the value every `refresh_ratio * ttl` seconds, so reads are normally answered from
+    memory. A read of a missing or expired entry loads it on demand; concurrent loads of the same
+    key share one call. A failed background reload keeps the previous value and is retried after
+    `retry_delay` seconds; if an expired value cannot be reloaded on demand, it is returned marked
+    as stale.
+
+    Args:
+        loader (Callable[[Hashable], Awaitable[Any]]): Loads the value of a key.
+        ttls (dict): Time to live in seconds per key. The keys are refreshed in the background.
+        default_ttl (float): Time to live of keys not in `ttls`.
+        refresh_ratio (float): Fraction of the time to live after which an entry is reloaded. Default is 0.8.
+        retry_delay (float): Seconds before a failed background reload is retried. Default is 30.
+    """
+
+    def __init__(self, loader: Callable[[Hashable], Awaitable[Any]], ttls: dict, default_ttl: float,
+                 refresh_ratio: float = 0.8, retry_delay: float = 30.0):
+        """
+        Initialize an empty cache. Background refreshing starts with `start()`.
+        """
+        self.loader = loader
+        self.ttls = dict(ttls)
+        self.default_ttl = default_ttl
+        self.refresh_ratio = refresh_ratio
+        self.retry_delay = retry_delay
+        self._entries: dict = {}
+        self._single_flight = SingleFlight()
+        self._tasks: list[asyncio.Task] = []
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.stale = 0
+
+    def ttl(self, key: Hashable) -> float:
+        """
+        Return the time to live of a key in seconds.
+        """
+        return self.ttls.get(key, self.default_ttl)
+
+    async def get(self, key: Hashable) -> tuple[Any, bool]:
+        """
+        Return the cached value of a key, loading it if it is missing or has expired.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            tuple[Any, bool]: The cached or loaded value, and whether it is an expired value
+                returned because the reload failed.
+
+        Raises:
+            Exception: Whatever the loader raises when a missing value cannot be loaded.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1], False
+        self.misses += 1
+        try:
+            return await self._single_flight.do(key, lambda: self._load(key)), False
+        except Exception as e:
+            if entry is None:
+                raise
+            print(f"Serving stale value of {key}: {e}")
+            self.stale += 1
+            return entry[1], True
+
+    def start(self):
+        """
+        Start reloading the configured keys in the background. Must be called in a running event loop.
+        """
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._refresh_loop(key)) for key in self.ttls]
+
+    async def stop(self):
+        """
+        Stop the background reloading.
+        """
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _load(self, key: Hashable) -> Any:
+        value = await self.loader(key)
+        self._entries[key] = (time.monotonic() + self.ttl(key), value)
+        self.refreshes += 1
+        return value
+
+    async def _refresh_loop(self, key: Hashable):
+        while True:
+            try:
+                await self._single_flight.do(key, lambda: self._load(key))
+                delay = self.ttl(key) * self.refresh_ratio
+            except Exception as e:
+                self.errors += 1
+                print(f"Background refresh of {key} failed: {e}")
+                delay = min(self.retry_delay, self.ttl(key) * self.refresh_ratio)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        """
+        Return statistics of the cache.
+
+        Returns:
+            dict: Number of entries, time to live per key, whether background refreshing runs,
+                hits, misses, hit ratio, loads, failed background reloads and stale values returned.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "ttlSeconds": {str(key): ttl for key, ttl in self.ttls.items()},
+            "refreshing": bool(self._tasks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 3) if lookups else None,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "stale": self.stale,
+        }
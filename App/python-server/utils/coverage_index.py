@@ -0,0 +1,253 @@
+"""
+coverage_index.py
+
+This module provides an in-memory index of which hours are stored in the database for each dataset.
+Every dataset has a bitmap with one bit per hour since the Unix epoch (UTC), kept in an array of
+64-bit words. Missing-range detection scans the bitmap word by word, so checking a multi-year range
+needs no database round trip and no per-hour objects.
+
+The index is loaded from the database on startup and updated by the repositories after every insert.
+
+Classes:
+    - HourlyCoverageIndex: Per-dataset hourly coverage bitmaps.
+
+Intended Usage:
+    - Use the shared `coverage_index` instance with the keys `PORSSISAHKO_COVERAGE_KEY` and
+      `fingrid_coverage_key(dataset_id)`.
+"""
+
+import math
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+HELSINKI_TZ = ZoneInfo("Europe/Helsinki")
+WORD_BITS = 64
+FULL_WORD = (1 << WORD_BITS) - 1
+HOUR_SECONDS = 3600
+
+PORSSISAHKO_COVERAGE_KEY = "porssisahko"
+
+
+def fingrid_coverage_key(dataset_id: int) -> str:
+    """
+    Return the coverage index key of a Fingrid dataset.
+
+    Args:
+        dataset_id (int): The Fingrid dataset ID.
+
+    Returns:
+        str: The coverage index key.
+    """
+    return f"fingrid:{dataset_id}"
+
+
+class HourlyCoverageIndex:
+    """
+    Per-dataset bitmaps with one bit per hour since the Unix epoch (UTC).
+
+    A dataset key is "loaded" once its bitmap has been built from the database. Until then
+    callers should fall back to querying the database for missing data.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty coverage index.
+        """
+        self._bitmaps: dict[str, array] = {}
+        self._loaded: set[str] = set()
+
+    @staticmethod
+    def hour_index(dt: datetime) -> int:
+        """
+        Convert a timezone-aware datetime to the number of full hours since the Unix epoch.
+
+        Args:
+            dt (datetime): A timezone-aware datetime.
+
+        Returns:
+            int: The hour index.
+        """
+        return math.floor(dt.timestamp() / HOUR_SECONDS)
+
+    @staticmethod
+    def local_hour_indexes(naive_helsinki: datetime) -> set[int]:
+        """
+        Return the hour indexes of a naive Helsinki datetime as stored in the database.
+
+        During the autumn DST change the same naive time occurs twice, and one stored row
+        covers both UTC hours.
+
+        Args:
+            naive_helsinki (datetime): A naive datetime in Europe/Helsinki time.
+
+        Returns:
+            set[int]: One or two hour indexes.
+        """
+        return {
+            HourlyCoverageIndex.hour_index(naive_helsinki.replace(tzinfo=HELSINKI_TZ, fold=fold))
+            for fold in (0, 1)
+        }
+
+    def is_loaded(self, key: str) -> bool:
+        """
+        Check whether the bitmap of a dataset has been loaded from the database.
+
+        Args:
+            key (str): The dataset key.
+
+        Returns:
+            bool: True if the bitmap is loaded.
+        """
+        return key in self._loaded
+
+    def load(self, key: str, naive_helsinki_datetimes: Iterable[datetime]):
+        """
+        Replace the bitmap of a dataset with the given stored datetimes and mark it loaded.
+
+        Args:
+            key (str): The dataset key.
+            naive_helsinki_datetimes (Iterable[datetime]): Stored datetimes (naive, Europe/Helsinki time).
+        """
+        self._bitmaps[key] = array("Q")
+        self.mark_local(key, naive_helsinki_datetimes)
+        self._loaded.add(key)
+
+    def mark_local(self, key: str, naive_helsinki_datetimes: Iterable[datetime]):
+        """
+        Mark naive Helsinki datetimes as stored.
+
+        Args:
+            key (str): The dataset key.
+            naive_helsinki_datetimes (Iterable[datetime]): Stored datetimes (naive, Europe/Helsinki time).
+        """
+        bitmap = self._bitmaps.setdefault(key, array("Q"))
+        for dt in naive_helsinki_datetimes:
+            for index in self.local_hour_indexes(dt):
+                self._set_bit(bitmap, index)
+
+    def mark(self, key: str, datetimes: Iterable[datetime]):
+        """
+        Mark timezone-aware datetimes as stored.
+
+        Args:
+            key (str): The dataset key.
+            datetimes (Iterable[datetime]): Stored datetimes (timezone-aware).
+        """
+        bitmap = self._bitmaps.setdefault(key, array("Q"))
+        for dt in datetimes:
+            self._set_bit(bitmap, self.hour_index(dt))
+
+    def is_covered(self, key: str, dt: datetime) -> bool:
+        """
+        Check whether the hour starting at a timezone-aware datetime is stored.
+
+        Args:
+            key (str): The dataset key.
+            dt (datetime): A timezone-aware datetime.
+
+        Returns:
+            bool: True if the hour is stored.
+        """
+        bitmap = self._bitmaps.get(key)
+        index = self.hour_index(dt)
+        word = index // WORD_BITS
+        return bitmap is not None and 0 <= word < len(bitmap) and bool(bitmap[word] >> (index % WORD_BITS) & 1)
+
+    def missing_ranges(self, key: str, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """
+        Find contiguous ranges of missing hours between two timezone-aware datetimes.
+
+        Args:
+            key (str): The dataset key.
+            start (datetime): Start of the range (inclusive). Rounded up to a full hour.
+            end (datetime): End of the range (inclusive).
+
+        Returns:
+            list[tuple[datetime, datetime]]: Sorted half-open [start, end) ranges of missing hours (UTC).
+        """
+        first = math.ceil(start.timestamp() / HOUR_SECONDS)
+        last = math.floor(end.timestamp() / HOUR_SECONDS)
+        if first > last:
+            return []
+        bitmap = self._bitmaps.get(key, array("Q"))
+        ranges = []
+        run_start = None
+        for word_index in range(first // WORD_BITS, last // WORD_BITS + 1):
+            low = max(first, word_index * WORD_BITS) - word_index * WORD_BITS
+            high = min(last, word_index * WORD_BITS + WORD_BITS - 1) - word_index * WORD_BITS
+            range_mask = (FULL_WORD >> (WORD_BITS - 1 - high)) & ~((1 << low) - 1)
+            word = bitmap[word_index] if 0 <= word_index < len(bitmap) else 0
+            missing = ~word & range_mask
+            if missing == 0:
+                # Whole segment stored
+                if run_start is not None:
+                    ranges.append((run_start, word_index * WORD_BITS + low))
+                    run_start = None
+            elif missing == range_mask:
+                # Whole segment missing
+                if run_start is None:
+                    run_start = word_index * WORD_BITS + low
+            else:
+                for bit in range(low, high + 1):
+                    index = word_index * WORD_BITS + bit
+                    if missing >> bit & 1:
+                        if run_start is None:
+                            run_start = index
+                    elif run_start is not None:
+                        ranges.append((run_start, index))
+                        run_start = None
+        if run_start is not None:
+            ranges.append((run_start, last + 1))
+        return [(self._to_datetime(a), self._to_datetime(b)) for a, b in ranges]
+
+    def covers(self, key: str, start: datetime, end: datetime) -> Optional[bool]:
+        """
+        Check whether every hour between two timezone-aware datetimes is stored.
+
+        Args:
+            key (str): The dataset key.
+            start (datetime): Start of the range (inclusive). Rounded up to a full hour.
+            end (datetime): End of the range (inclusive).
+
+        Returns:
+            Optional[bool]: True if the range is fully stored, or None if the dataset is not loaded.
+        """
+        if key not in self._loaded:
+            return None
+        return not self.missing_ranges(key, start, end)
+
+    def stats(self) -> dict:
+        """
+        Return statistics of the index.
+
+        Returns:
+            dict: Per dataset key the load state, number of stored hours and bitmap size in bytes.
+        """
+        return {
+            key: {
+                "loaded": key in self._loaded,
+                "hours": sum(bin(word).count("1") for word in bitmap),
+                "bytes": bitmap.itemsize * len(bitmap),
+            }
+            for key, bitmap in self._bitmaps.items()
+        }
+
+    @staticmethod
+    def _set_bit(bitmap: array, index: int):
+        if index < 0:
+            # Hours before the epoch are never stored
+            return
+        word = index // WORD_BITS
+        if word >= len(bitmap):
+            bitmap.extend([0] * (word + 1 - len(bitmap)))
+        bitmap[word] |= 1 << (index % WORD_BITS)
+
+    @staticmethod
+    def _to_datetime(index: int) -> datetime:
+        return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index)
+
+
+# Shared index instance used by the repositories and services
+coverage_index = HourlyCoverageIndex()
@@ -0,0 +1,133 @@
+"""
+fast_json.py
+
+This module encodes hourly series straight to the JSON bytes of the range endpoints.
+
+The routes declare `List[PriceDataPoint]` / `List[FingridDataPoint]` as their response model for
+the OpenAPI schema, but returning models makes FastAPI validate and serialize every element. The
+service output is already trusted, so these encoders skip the models and write the same JSON
+(RFC 3339 UTC timestamps, compact separators) from precomputed strings: one date prefix per day
+and one suffix per hour of day.
+
+The same series can also be encoded in the opt-in columnar format (COLUMNAR_MEDIA_TYPE), which
+writes the start hour and step once and the values as a plain array. The grid snapshot uses the same
+layout for several datasets that share one time axis.
+
+Functions:
+    - encode_price_series: JSON array of {"startDate", "price"} objects.
+    - encode_fingrid_series: JSON array of {"startTime", "endTime", "value"} objects.
+    - encode_columnar_series: {"start", "stepSeconds", "values", "missing"} object.
+    - encode_snapshot: {"start", "stepSeconds", "length", "series", "errors"} object of several datasets.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Dict
+from utils.hourly_series import HourlySeries
+
+DAY_SECONDS = 86400
+HOUR_SUFFIXES = [f"T{hour:02d}:00:00Z" for hour in range(24)]
+COLUMNAR_MEDIA_TYPE = "application/vnd.eprice.columnar+json"
+
+
+class _TimestampFormatter:
+    """
+    Formats Unix timestamps at full hours as RFC 3339 UTC strings, caching the date part per day.
+    """
+
+    def __init__(self):
+        self._days: dict[int, str] = {}
+
+    def format(self, timestamp: int) -> str:
+        day, seconds = divmod(timestamp, DAY_SECONDS)
+        prefix = self._days.get(day)
+        if prefix is None:
+            prefix = self._days[day] = datetime.fromtimestamp(day * DAY_SECONDS, timezone.utc).strftime("%Y-%m-%d")
+        return prefix + HOUR_SUFFIXES[seconds // 3600]
+
+
+def encode_price_series(series: HourlySeries) -> bytes:
+    """
+    Encode a price series as the JSON of a list of PriceDataPoint.
+
+    Args:
+        series (HourlySeries): The price series.
+
+    Returns:
+        bytes: JSON array of {"startDate": ..., "price": ...} objects.
+    """
+    formatter = _TimestampFormatter()
+    parts = [
+        f'{{"startDate":"{formatter.format(timestamp)}","price":{value!r}}}'
+        for timestamp, value in series.items()
+    ]
+    return ("[" + ",".join(parts) + "]").encode()
+
+
+def encode_fingrid_series(series: HourlySeries) -> bytes:
+    """
+    Encode a Fingrid series as the JSON of a list of FingridDataPoint.
+
+    Args:
+        series (HourlySeries): The Fingrid series.
+
+    Returns:
+        bytes: JSON array of {"startTime": ..., "endTime": ..., "value": ...} objects.
+    """
+    formatter = _TimestampFormatter()
+    step = series.step
+    parts = [
+        f'{{"startTime":"{formatter.format(timestamp)}","endTime":"{formatter.format(timestamp + step)}","value":{value!r}}}'
+        for timestamp, value in series.items()
+    ]
+    return ("[" + ",".join(parts) + "]").encode()
+
+
+def encode_columnar_series(series: HourlySeries) -> bytes:
+    """
+    Encode a series as the JSON of a ColumnarSeries.
+
+    Args:
+        series (HourlySeries): The price or Fingrid series.
+
+    Returns:
+        bytes: JSON object with the start hour, the step in seconds, one value per hour (null if
+            missing) and the indexes of the missing hours.
+    """
+    start = _TimestampFormatter().format(series.start)
+    return f'{{"start":"{start}","stepSeconds":{series.step},{_columnar_arrays(series)}}}'.encode()
+
+
+def encode_snapshot(start: int, length: int, series: Dict[str, HourlySeries], errors: Dict[str, str]) -> bytes:
+    """
+    Encode series of several datasets on a shared time axis as the JSON of a GridSnapshot.
+
+    Args:
+        start (int): Unix timestamp (seconds) of the first hour of the axis.
+        length (int): Number of hours on the axis. Every series must start at `start` and have this length.
+        series (Dict[str, HourlySeries]): The series per dataset name.
+        errors (Dict[str, str]): Error messages of the datasets that could not be loaded.
+
+    Returns:
+        bytes: JSON object with the start hour, the step in seconds, the number of steps, per
+            dataset the values and missing indexes, and the errors.
+    """
+    entries = ",".join(f'{json.dumps(name)}:{{{_columnar_arrays(values)}}}' for name, values in series.items())
+    return (
+        f'{{"start":"{_TimestampFormatter().format(start)}","stepSeconds":{HourlySeries.step},"length":{length},'
+        f'"series":{{{entries}}},"errors":{json.dumps(errors, separators=(",", ":"))}}}'
+    ).encode()
+
+
+def _columnar_arrays(series: HourlySeries) -> str:
+    # "values":[...],"missing":[...] members of a columnar object
+    values = series.values
+    parts = []
+    missing = []
+    for index, present in enumerate(series.valid):
+        if present:
+            parts.append(repr(values[index]))
+        else:
+            parts.append("null")
+            missing.append(str(index))
+    return f'"values":[{",".join(parts)}],"missing":[{",".join(missing)}]'
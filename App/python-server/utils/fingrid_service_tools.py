@@ -1,6 +1,9 @@
+import asyncio
 from models.data_model import *
 from ext_apis.ext_apis import *
 from repositories.fingrid_repository import *
+from utils.coverage_index import coverage_index, fingrid_coverage_key
+from utils.hourly_series import HourlySeries
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -22,7 +25,7 @@ class FingridServiceTools:
         self.fingrid_repository = fingrid_repository
         self.ext_api_fetcher = ext_api_fetcher
 
-    async def fetch_and_process_data(self, time_range: TimeRange, dataset_id: int):
+    async def fetch_and_process_data(self, time_range: TimeRange, dataset_id: int) -> HourlySeries:
         """
         Fetch and process Fingrid data for a given time range and dataset.
 
@@ -31,7 +34,7 @@ class FingridServiceTools:
             dataset_id (int): The Fingrid dataset ID.
 
         Returns:
-            List[FingridDataPoint]: Sorted list of Fingrid data points for the range.
+            HourlySeries: Series of the dataset values for the range.
 
         Raises:
             Exception: If fetching or processing fails.
@@ -44,118 +47,81 @@ class FingridServiceTools:
                 start_date=start_naive_hki,
                 end_date=end_naive_hki,
                 dataset_id=dataset_id,
-                select_columns="datetime, value, dataset_id"
+                select_columns="datetime, value"
             )
 
-            result = self.convert_to_fingrid_data(raw_data)
-
-            missing_entries = self.find_missing_entries_utc(time_range, result, dataset_id)
-            if missing_entries:
-                print(f"Database has {len(missing_entries)} entries missing in the range {time_range.startTime} to {time_range.endTime} with dataset ID {dataset_id}.")
-                await self.fill_missing_entries(result, missing_entries, dataset_id)
-            return sorted(result, key=lambda x: x.startTime, reverse=False)
+            series = HourlySeries.for_range(time_range.startTime, time_range.endTime)
+            series.set_rows(raw_data, "value")
+
+            coverage_key = fingrid_coverage_key(dataset_id)
+            if coverage_index.is_loaded(coverage_key):
+                missing_ranges = coverage_index.missing_ranges(coverage_key, time_range.startTime, time_range.endTime)
+            elif series.count < len(series):
+                # Only ask the database for the gaps if some hours are missing
+                missing_ranges = await self.fingrid_repository.get_missing_ranges(time_range.startTime, time_range.endTime, dataset_id)
+            else:
+                missing_ranges = []
+            if missing_ranges:
+                missing_count = sum(int((end - start) / timedelta(hours=1)) for start, end in missing_ranges)
+                print(f"Database has {missing_count} entries missing in {len(missing_ranges)} ranges between {time_range.startTime} and {time_range.endTime} with dataset ID {dataset_id}.")
+                await self.fill_missing_ranges(series, missing_ranges, dataset_id)
+            return series
         except Exception as e:
             print(f"Error while fetching and processing data: {e}")
             raise
 
-    def convert_to_fingrid_data(self, data: list[dict]) -> list[FingridDataPoint]:
+    def series_from_points(self, data: list[FingridDataPoint], start: datetime, end: datetime) -> HourlySeries:
         """
-        Convert a list of database dictionaries to a sorted list of FingridDataPoint objects in UTC.
+        Build a series for a time range from Fingrid data points, e.g. an external API response.
 
         Args:
-            data (list[dict]): List of dicts with 'datetime' and 'value' keys.
+            data (list[FingridDataPoint]): List of Fingrid data points.
+            start (datetime): Start of the range (inclusive).
+            end (datetime): End of the range (inclusive).
 
         Returns:
-            list[FingridDataPoint]: Sorted list of FingridDataPoint objects (startTime in UTC).
-        """
-        if not data:
-            return []
-        return sorted([
-            FingridDataPoint(
-                startTime=item["datetime"].astimezone(ZoneInfo("UTC")),
-                endTime=(item["datetime"] + timedelta(hours=1)).astimezone(ZoneInfo("UTC")),
-                value=float(item["value"])
-            ) for item in data
-        ], key=lambda x: x.startTime, reverse=False)
-
-    def find_missing_entries_utc(self, time_range: TimeRange, data_utc: list[FingridDataPoint], dataset_id: int) -> list[StartDateModel]:
+            HourlySeries: The series. Points outside the range or not at a full hour are dropped.
         """
-        Find missing hourly entries in the given UTC time range.
-
-        Args:
-            time_range (TimeRange): The UTC time range to check.
-            data_utc (list[FingridDataPoint]): List of available data points in UTC.
-            dataset_id (int): The dataset ID (not used in logic, for compatibility).
+        series = HourlySeries.for_range(start, end)
+        for point in data:
+            series.set_datetime(point.startTime, point.value)
+        return series
 
-        Returns:
-            list[StartDateModel]: List of StartDateModel objects for missing hours (all in UTC).
-
-        Raises:
-            Exception: If an error occurs during processing.
+    async def fill_missing_ranges(self, series: HourlySeries, missing_ranges: list[tuple[datetime, datetime]], dataset_id: int):
         """
-        result = []
-        current_date_utc = time_range.startTime
-        try:
-            while current_date_utc <= time_range.endTime:
-                if not any(item.startTime == current_date_utc for item in data_utc):
-                    result.append(StartDateModel(startDate=current_date_utc))
-                current_date_utc += timedelta(hours=1)
-            result.sort(key=lambda x: x.startDate, reverse=False)
-        except Exception as e:
-            print(f"Error while finding missing entries: {e}")
-            raise
-        return result
-
-    async def fill_missing_entries(self, result: list[FingridDataPoint], missing_entries: list[StartDateModel], dataset_id: int):
-        """
-        Fetch and insert missing Fingrid data entries from the external API.
+        Fetch and insert missing Fingrid data from the external API, one request per missing range.
 
         Args:
-            result (list[FingridDataPoint]): List to append new data points to (modified in place).
-            missing_entries (list[StartDateModel]): List of missing data points to fetch.
+            series (HourlySeries): Series to add the fetched values to (modified in place).
+            missing_ranges (list[tuple[datetime, datetime]]): Half-open [start, end) UTC ranges of missing hours.
             dataset_id (int): The dataset ID.
 
         Side effects:
-            Updates the result list and inserts new entries into the database.
-
-        Raises:
-            Exception: If an error occurs during fetching or insertion.
+            Updates the series and inserts new entries into the database.
         """
-        self.result = result
-        if not missing_entries:
-            return
-        start_time_utc_aware = min(missing_entries, key=lambda x: x.startDate).startDate
-        end_time_utc_aware = max(missing_entries, key=lambda x: x.startDate).startDate
-        time_range = TimeRange(startTime=start_time_utc_aware, endTime=end_time_utc_aware + timedelta(hours=1))
-        
+        new_entries = []
         try:
-            # Fetch data for entire range of missing entries
-            fetched_range = await self.ext_api_fetcher.fetch_fingrid_data_range(dataset_id, time_range)
-            if not fetched_range:
-                print("No data fetched for the missing entries range.")
-                return
-            print(f"Fetched {len(fetched_range)} entries for the range {time_range.startTime} to {time_range.endTime} from external API for dataset ID {dataset_id}.")
-            counter = 0
-            for entry in fetched_range:
-                if any(item.startTime == entry.startTime for item in result):
+            for range_start, range_end in missing_ranges:
+                time_range = TimeRange(startTime=range_start, endTime=range_end)
+                fetched_range = await self.ext_api_fetcher.fetch_fingrid_data_range(dataset_id, time_range)
+                if not fetched_range:
+                    print(f"No data fetched for the missing range {range_start} to {range_end} for dataset ID {dataset_id}.")
                     continue
-                utc_dt = entry.startTime
-                iso_str = (utc_dt + timedelta(hours=0)).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-
-                result.append(FingridDataPoint(
-                    startTime=utc_dt,
-                    endTime=utc_dt + timedelta(hours=1),
-                    value=entry.value
-                ))
-                await self.fingrid_repository.insert_entry(
-                    value=entry.value,
-                    iso_date=iso_str,
-                    dataset_id=dataset_id
-                )
-                counter += 1
-            print(f"Inserted {counter} missing entries into the database for dataset ID {dataset_id}.")
+                print(f"Fetched {len(fetched_range)} entries for the range {range_start} to {range_end} from external API for dataset ID {dataset_id}.")
+                for entry in fetched_range:
+                    utc_dt = entry.startTime
+                    if not (range_start <= utc_dt < range_end) or not series.set_datetime(utc_dt, entry.value):
+                        continue
+                    iso_str = utc_dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+                    new_entries.append({"value": entry.value, "startTime": iso_str})
+        except asyncio.CancelledError:
+            # The request is gone, so it does not hold a pool connection for the write
+            raise
         except Exception as e:
             print(f"Error while filling missing entries: {e}")
+        # Insert everything fetched so far with one bulk upsert
+        counter = await self.fingrid_repository.upsert_entries(new_entries, dataset_id=dataset_id)
+        print(f"Inserted {counter} missing entries into the database for dataset ID {dataset_id}.")
 
 def convert_to_fingrid_entry(value, iso_date, predicted=False, convert_to_helsinki_time=True, dataset_id=-1):
     """
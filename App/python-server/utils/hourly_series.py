@@ -0,0 +1,251 @@
+"""
+hourly_series.py
+
+This module provides an array-backed hourly time series used inside the service layer.
+
+A series covers a fixed range of full UTC hours. Values are kept in an `array('d')` and a
+parallel validity mask (`bytearray`, 1 = value present), so the service tools can merge
+database rows and upstream data, find gaps and compute statistics without building a
+Pydantic model per hour. Models are only created at the response boundary with
+`to_price_points` and `to_fingrid_points`.
+
+Classes:
+    - HourlySeries: Fixed-step (one hour) series with a validity mask.
+"""
+
+import math
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List
+from zoneinfo import ZoneInfo
+from models.data_model import PriceDataPoint, FingridDataPoint
+
+HELSINKI_TZ = ZoneInfo("Europe/Helsinki")
+HOUR_SECONDS = 3600
+NAIVE_EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+
+
+class HourlySeries:
+    """
+    Hourly series starting at a full UTC hour.
+
+    Args:
+        start (int): Unix timestamp (seconds) of the first hour. Must be a multiple of 3600.
+        length (int): Number of hours in the series.
+    """
+
+    step = HOUR_SECONDS
+
+    def __init__(self, start: int, length: int):
+        """
+        Initialize a series with every value missing.
+
+        Args:
+            start (int): Unix timestamp (seconds) of the first hour. Must be a multiple of 3600.
+            length (int): Number of hours in the series.
+        """
+        self.start = start
+        self.values = array("d", bytes(8 * length))
+        self.valid = bytearray(length)
+        # Set by the services when missing hours could not be fetched because the upstream is unavailable
+        self.stale = False
+
+    @classmethod
+    def for_range(cls, start: datetime, end: datetime) -> "HourlySeries":
+        """
+        Create an empty series for the full hours between two timezone-aware datetimes.
+
+        Args:
+            start (datetime): Start of the range (inclusive). Rounded up to a full hour.
+            end (datetime): End of the range (inclusive).
+
+        Returns:
+            HourlySeries: The empty series.
+        """
+        first = math.ceil(start.timestamp() / HOUR_SECONDS)
+        last = math.floor(end.timestamp() / HOUR_SECONDS)
+        return cls(first * HOUR_SECONDS, max(last - first + 1, 0))
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    @property
+    def end(self) -> int:
+        """
+        int: Unix timestamp (seconds) right after the last hour of the series.
+        """
+        return self.start + len(self.valid) * HOUR_SECONDS
+
+    @property
+    def count(self) -> int:
+        """
+        int: Number of hours with a value.
+        """
+        return self.valid.count(1)
+
+    def set(self, timestamp: float, value: float) -> bool:
+        """
+        Set the value of the hour starting at a Unix timestamp.
+
+        Args:
+            timestamp (float): Unix timestamp (seconds) of the hour.
+            value (float): The value.
+
+        Returns:
+            bool: False if the timestamp is outside the series or not at a full hour.
+        """
+        offset = int(timestamp) - self.start
+        index = offset // HOUR_SECONDS
+        if offset % HOUR_SECONDS or not 0 <= index < len(self.valid):
+            return False
+        self.values[index] = value
+        self.valid[index] = 1
+        return True
+
+    def set_datetime(self, dt: datetime, value: float) -> bool:
+        """
+        Set the value of the hour starting at a timezone-aware datetime.
+
+        Args:
+            dt (datetime): A timezone-aware datetime.
+            value (float): The value.
+
+        Returns:
+            bool: False if the datetime is outside the series or not at a full hour.
+        """
+        return self.set(dt.timestamp(), value)
+
+    def set_rows(self, rows: Iterable[dict], value_key: str):
+        """
+        Set values from database rows with naive Europe/Helsinki 'datetime' values.
+
+        The repeated hour of the autumn DST change maps to its first occurrence, like `astimezone`
+        does for naive datetimes in the Helsinki container.
+
+        Args:
+            rows (Iterable[dict]): Rows with 'datetime' and the value column.
+            value_key (str): The name of the value column.
+        """
+        # The UTC offset is constant within a local day except on DST change days
+        day_offsets = {}
+        for row in rows:
+            naive = row["datetime"]
+            local_seconds = (naive - NAIVE_EPOCH) // ONE_SECOND
+            day = local_seconds // 86400
+            offset = day_offsets.get(day)
+            if offset is None:
+                offset = day_offsets[day] = self._day_offset(naive)
+            if offset is False:
+                timestamp = naive.replace(tzinfo=HELSINKI_TZ).timestamp()
+            else:
+                timestamp = local_seconds - offset
+            self.set(timestamp, float(row[value_key]))
+
+    def update(self, other: "HourlySeries"):
+        """
+        Copy the values present in another series into the overlapping hours of this one.
+
+        Args:
+            other (HourlySeries): The series to copy from.
+        """
+        first = max(self.start, other.start)
+        last = min(self.end, other.end)
+        if first >= last:
+            return
+        a = (first - self.start) // HOUR_SECONDS
+        b = (first - other.start) // HOUR_SECONDS
+        n = (last - first) // HOUR_SECONDS
+        if other.valid.count(1, b, b + n) == n:
+            self.values[a:a + n] = other.values[b:b + n]
+            self.valid[a:a + n] = other.valid[b:b + n]
+            return
+        for i in range(n):
+            if other.valid[b + i]:
+                self.values[a + i] = other.values[b + i]
+                self.valid[a + i] = 1
+
+    def slice(self, start: datetime, end: datetime) -> "HourlySeries":
+        """
+        Return a copy of the hours between two timezone-aware datetimes.
+
+        Args:
+            start (datetime): Start of the range (inclusive).
+            end (datetime): End of the range (inclusive).
+
+        Returns:
+            HourlySeries: The sliced series.
+        """
+        result = HourlySeries.for_range(start, end)
+        result.update(self)
+        return result
+
+    def items(self) -> Iterator[tuple[int, float]]:
+        """
+        Iterate over the hours with a value.
+
+        Yields:
+            tuple[int, float]: Unix timestamp (seconds) of the hour and its value.
+        """
+        start = self.start
+        values = self.values
+        for index, present in enumerate(self.valid):
+            if present:
+                yield start + index * HOUR_SECONDS, values[index]
+
+    def missing_ranges(self) -> List[tuple[datetime, datetime]]:
+        """
+        Find contiguous ranges of hours without a value.
+
+        Returns:
+            List[tuple[datetime, datetime]]: Sorted half-open [start, end) UTC ranges.
+        """
+        ranges = []
+        valid = self.valid
+        index = valid.find(0)
+        while index != -1:
+            run_end = valid.find(1, index)
+            if run_end == -1:
+                run_end = len(valid)
+            ranges.append((self._to_datetime(index), self._to_datetime(run_end)))
+            index = valid.find(0, run_end)
+        return ranges
+
+    def to_price_points(self) -> List[PriceDataPoint]:
+        """
+        Build the price data point models of the hours with a value.
+
+        Returns:
+            List[PriceDataPoint]: Sorted price data points (startDate in UTC).
+        """
+        return [
+            PriceDataPoint(startDate=datetime.fromtimestamp(timestamp, timezone.utc), price=value)
+            for timestamp, value in self.items()
+        ]
+
+    def to_fingrid_points(self) -> List[FingridDataPoint]:
+        """
+        Build the Fingrid data point models of the hours with a value.
+
+        Returns:
+            List[FingridDataPoint]: Sorted Fingrid data points (startTime and endTime in UTC).
+        """
+        return [
+            FingridDataPoint(
+                startTime=datetime.fromtimestamp(timestamp, timezone.utc),
+                endTime=datetime.fromtimestamp(timestamp + HOUR_SECONDS, timezone.utc),
+                value=value
+            )
+            for timestamp, value in self.items()
+        ]
+
+    @staticmethod
+    def _day_offset(naive: datetime):
+        # UTC offset in seconds of a local Helsinki day, or False if it changes during the day
+        midnight = naive.replace(hour=0, minute=0, second=0, microsecond=0)
+        first = midnight.replace(tzinfo=HELSINKI_TZ).utcoffset()
+        last = midnight.replace(hour=23, tzinfo=HELSINKI_TZ).utcoffset()
+        return first // ONE_SECOND if first == last else False
+
+    def _to_datetime(self, index: int) -> datetime:
+        return datetime.fromtimestamp(self.start, timezone.utc) + timedelta(hours=index)
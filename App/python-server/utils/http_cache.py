@@ -0,0 +1,129 @@
+"""
+http_cache.py
+
+This module provides HTTP conditional caching helpers for the data routes: entity tags,
+Last-Modified and Cache-Control headers, and evaluation of conditional GET requests.
+
+Range responses are validated by the data version of the covered range (row count and latest
+updatedAt), so a validator can be checked without building the response. Fully stored ranges that
+end before the current Helsinki day get a long Cache-Control lifetime, which lets shared caches
+store them only on public routes (private otherwise, so no cache serves authenticated data to
+clients without a token); everything else must be revalidated.
+
+Functions:
+    - make_etag: Strong entity tag of a list of version parts.
+    - body_etag: Strong entity tag of a response body.
+    - is_historic: Whether a range ends before the current Helsinki day.
+    - validator_headers: ETag, Last-Modified and Cache-Control response headers.
+    - is_not_modified: Whether a conditional GET request can be answered with 304 Not Modified.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+from fastapi import Request
+from config.secrets import HISTORIC_CACHE_CONTROL, PRIVATE_HISTORIC_CACHE_CONTROL, RECENT_CACHE_CONTROL
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong entity tag from version parts.
+
+    Args:
+        *parts: Values identifying the representation, e.g. dataset, range, data version and format.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def body_etag(body: bytes) -> str:
+    """
+    Build a strong entity tag from a response body.
+
+    Args:
+        body (bytes): The response body.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def is_historic(end: datetime) -> bool:
+    """
+    Check whether a range ends before the start of the current Helsinki day.
+
+    Args:
+        end (datetime): End of the range (inclusive, timezone-aware).
+
+    Returns:
+        bool: True if the range ends before today's midnight in Helsinki.
+    """
+    today_start = datetime.now(ZoneInfo("Europe/Helsinki")).replace(hour=0, minute=0, second=0, microsecond=0)
+    return end < today_start
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None, cacheable: bool = False,
+                      public: bool = False) -> dict:
+    """
+    Build the conditional caching response headers.
+
+    Args:
+        etag (str): The entity tag.
+        last_modified (Optional[datetime]): Last modification time (timezone-aware). Default is None (no header).
+        cacheable (bool): Whether the response may be cached for a long time (fully stored historic data).
+            Default is False (must be revalidated).
+        public (bool): Whether the route is public, so shared caches may store a cacheable response.
+            Default is False (only the client's private cache).
+
+    Returns:
+        dict: ETag, Cache-Control and optionally Last-Modified headers.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": RECENT_CACHE_CONTROL,
+    }
+    if cacheable:
+        headers["Cache-Control"] = HISTORIC_CACHE_CONTROL if public else PRIVATE_HISTORIC_CACHE_CONTROL
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate If-None-Match and If-Modified-Since of a GET or HEAD request.
+
+    If-None-Match takes precedence; If-Modified-Since is only used without it. Other methods are
+    never answered with 304.
+
+    Args:
+        request (Request): The incoming request.
+        etag (str): The current entity tag.
+        last_modified (Optional[datetime]): The current last modification time. Default is None.
+
+    Returns:
+        bool: True if the client's cached representation is still valid.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: a W/ prefix from an intermediary still matches
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
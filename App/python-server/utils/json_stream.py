@@ -0,0 +1,170 @@
+"""
+json_stream.py
+
+This module parses a JSON document of the form {"<key>": [{...}, {...}, ...], "<other>": ...}
+incrementally, so the elements of a large array can be processed while the response body is
+still being received.
+
+Text is fed in chunks as it arrives. Each complete element of the streamed array is returned from
+`feed` as soon as its closing brace has been received, and only the unparsed remainder is kept in
+memory. The other top-level values (e.g. pagination metadata) are parsed whole and collected in
+`fields`.
+
+Classes:
+    - StreamingArrayParser: Incremental parser of one top-level array of a JSON object.
+"""
+
+import json
+from typing import Any, List
+
+_WHITESPACE = " \t\n\r"
+
+
+class StreamingArrayParser:
+    """
+    Incremental parser of one top-level array of a JSON object.
+
+    Args:
+        array_key (str): Key of the array whose elements are streamed.
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, array_key: str):
+        """
+        Initialize the parser.
+        """
+        self.array_key = array_key
+        self.fields: dict[str, Any] = {}
+        self._buffer = ""
+        self._position = 0
+        self._state = "start"
+        self._key: str | None = None
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Feed the next chunk of the document.
+
+        Args:
+            text (str): The next chunk of text.
+
+        Returns:
+            List[Any]: Array elements completed by this chunk, in document order.
+
+        Raises:
+            ValueError: If the document is not valid JSON of the expected form.
+        """
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        items = []
+        while self._step(items, final=False):
+            pass
+        return items
+
+    def close(self) -> List[Any]:
+        """
+        Finish parsing after the last chunk.
+
+        Returns:
+            List[Any]: Array elements still pending, normally none.
+
+        Raises:
+            ValueError: If the document is incomplete.
+        """
+        items = []
+        while self._step(items, final=True):
+            pass
+        if self._state != "end":
+            raise ValueError("Incomplete JSON document")
+        return items
+
+    def _skip_whitespace(self) -> bool:
+        while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+            self._position += 1
+        return self._position < len(self._buffer)
+
+    def _expect(self, chars: str) -> str | None:
+        if not self._skip_whitespace():
+            return None
+        char = self._buffer[self._position]
+        if char not in chars:
+            raise ValueError(f"Unexpected {char!r} at JSON stream position {self._position}")
+        self._position += 1
+        return char
+
+    def _decode(self, final: bool):
+        # Returns (True, value) once a complete value is buffered, (False, None) otherwise
+        if not self._skip_whitespace():
+            return False, None
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Invalid JSON document")
+            return False, None
+        if end == len(self._buffer) and not final and not isinstance(value, (dict, list, str)):
+            # A number or literal at the end of the buffer may continue in the next chunk
+            return False, None
+        self._position = end
+        return True, value
+
+    def _step(self, items: List[Any], final: bool) -> bool:
+        # Advances the state machine by one token; returns False when more input is needed
+        state = self._state
+        if state == "start":
+            if self._expect("{") is None:
+                return False
+            self._state = "key_or_end"
+        elif state in ("key_or_end", "key"):
+            if not self._skip_whitespace():
+                return False
+            if state == "key_or_end" and self._buffer[self._position] == "}":
+                self._position += 1
+                self._state = "end"
+                return False
+            complete, key = self._decode(final)
+            if not complete:
+                return False
+            if not isinstance(key, str):
+                raise ValueError("Expected an object key in JSON stream")
+            self._key = key
+            self._state = "colon"
+        elif state == "colon":
+            if self._expect(":") is None:
+                return False
+            self._state = "array_start" if self._key == self.array_key else "value"
+        elif state == "value":
+            complete, value = self._decode(final)
+            if not complete:
+                return False
+            self.fields[self._key] = value
+            self._state = "comma_or_end"
+        elif state == "array_start":
+            if self._expect("[") is None:
+                return False
+            self._state = "item_or_array_end"
+        elif state in ("item_or_array_end", "item"):
+            if not self._skip_whitespace():
+                return False
+            if state == "item_or_array_end" and self._buffer[self._position] == "]":
+                self._position += 1
+                self._state = "comma_or_end"
+                return True
+            complete, item = self._decode(final)
+            if not complete:
+                return False
+            items.append(item)
+            self._state = "item_comma_or_array_end"
+        elif state == "item_comma_or_array_end":
+            char = self._expect(",]")
+            if char is None:
+                return False
+            self._state = "item" if char == "," else "comma_or_end"
+        elif state == "comma_or_end":
+            char = self._expect(",}")
+            if char is None:
+                return False
+            self._state = "key" if char == "," else "end"
+        else:
+            return False
+        return True
@@ -5,13 +5,23 @@ This module provides helper services for handling electricity price data time ra
 converting database results to application models, and filling missing data entries 
 from external APIs. It is used to unify and process price data from both the database 
 and external sources for the Eprice backend.
+
+Price data is carried through the tools as an HourlySeries; Pydantic models are only built
+by the service layer at the response boundary.
+
+The average price statistics are computed from partial sums: a dict mapping the group key
+(Helsinki hour of day or weekday) to a (sum, count) pair. Partials from the per-day rollup
+table and from individual price data points can be combined freely.
 """
 
+import asyncio
 from models.data_model import *
 from ext_apis.ext_apis import *
 from repositories.porssisahko_repository import *
 from utils.porssisahko_service_tools import *
-from datetime import datetime, timedelta
+from utils.coverage_index import coverage_index, PORSSISAHKO_COVERAGE_KEY
+from utils.hourly_series import HourlySeries
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
 
@@ -42,162 +52,281 @@ class PorssisahkoServiceTools:
         start_time = (end_time - timedelta(hours=48)).replace(tzinfo=None)
         return start_time, end_time
 
-    def convert_to_price_data(self, data: List[dict]) -> List[PriceDataPoint]:
-        """
-        Convert a list of database dicts to a sorted list of PriceDataPoint objects in UTC.
-
-        Args:
-            data (List[dict]): List of dicts with 'datetime' and 'price'.
-
-        Returns:
-            List[PriceDataPoint]: Sorted list of PriceDataPoint objects (startDate in UTC).
-        """
-        if not data:
-            return []
-        return sorted([
-            PriceDataPoint(
-                startDate=item["datetime"].astimezone(ZoneInfo("UTC")),
-                price=item["price"]
-            ) for item in data
-        ], key=lambda x: x.startDate, reverse=False)
-
-    async def fill_missing_entries(self, result: List[PriceDataPoint], missing_entries: List[PriceDataPoint]):
+    async def fill_missing_ranges(self, series: HourlySeries, missing_ranges: List[tuple[datetime, datetime]]):
         """
         Fetch and insert missing price data entries from the external API.
 
         Args:
-            result (List[PriceDataPoint]): List to append new data points to (modified in place).
-            missing_entries (List[PriceDataPoint]): List of missing data points to fetch.
+            series (HourlySeries): Series to add the fetched prices to (modified in place).
+            missing_ranges (List[tuple[datetime, datetime]]): Half-open [start, end) UTC ranges of missing hours.
 
         Side effects:
-            Updates the result list and inserts new entries into the database.
+            Updates the series and inserts new entries into the database with one bulk upsert.
+
+        Raises:
+            HTTPException: If a fetch fails while the upstream's circuit is closed. While it is open,
+                the series is left partially filled, so the service can serve it as stale.
         """
-        try:
-            for missing in missing_entries:
-                time_range = TimeRange(startTime=missing.startDate, endTime=missing.startDate)
-                fetched = await self.ext_api_fetcher.fetch_price_data_range(time_range)
-                if not fetched:
-                    continue
+        fetched: List[PriceDataPoint] = []
 
-                datapoint = fetched[0]
+        def add_fetched() -> List[dict]:
+            new_entries = []
+            for datapoint in fetched:
                 utc_dt = datapoint.startDate
-                iso_str = (utc_dt + timedelta(hours=0)).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-
-                result.append(PriceDataPoint(
-                    startDate=utc_dt,
-                    price=datapoint.price
-                ))
-                await self.database_fetcher.insert_entry(
-                    price=datapoint.price,
-                    iso_date=iso_str
-                )
+                iso_str = utc_dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+                series.set_datetime(utc_dt, datapoint.price)
+                new_entries.append({"price": datapoint.price, "startDate": iso_str})
+            return new_entries
+
+        try:
+            for range_start, range_end in missing_ranges:
+                # The fetch range is inclusive, so a single missing hour has start equal to end
+                time_range = TimeRange.model_construct(startTime=range_start, endTime=range_end - timedelta(hours=1))
+                await self.ext_api_fetcher.fetch_price_data_range(time_range, fetched)
+        except asyncio.CancelledError:
+            # The request is gone, so it does not hold a pool connection for the write
+            raise
         except Exception as e:
             print(f"Error filling missing entries: {e}")
-            raise
+            # Persist the hours fetched before the failure; a failing write must not hide the fetch error
+            new_entries = add_fetched()
+            try:
+                await self.database_fetcher.upsert_entries(new_entries)
+            except Exception as write_error:
+                print(f"Error inserting the {len(new_entries)} entries fetched before the failure: {write_error}")
+            if self.ext_api_fetcher.circuit_breaker.closed:
+                raise
+        else:
+            await self.database_fetcher.upsert_entries(add_fetched())
 
-    async def fetch_and_process_data(self, time_range:TimeRange) -> List[PriceDataPoint]:
+    async def fetch_and_process_data(self, time_range:TimeRange) -> HourlySeries:
         """
         Fetch and process price data from the database, fill missing entries from the external API if needed.
 
         Args:
-            start_date (datetime): Start of the time range.
-            end_date (datetime): End of the time range.
+            time_range (TimeRange): Start and end of the time range (end inclusive).
 
         Returns:
-            List[PriceDataPoint]: Sorted list of price data points for the range, including filled-in values if needed.
+            HourlySeries: Price series for the range, including filled-in values if needed.
         """
-
-
         start_naive_hki = time_range.startTime.astimezone(ZoneInfo("Europe/Helsinki")).replace(tzinfo=None)
         end_naive_hki = time_range.endTime.astimezone(ZoneInfo("Europe/Helsinki")).replace(tzinfo=None)
 
-
         raw_data = await self.database_fetcher.get_entries(
             start_date=start_naive_hki,
             end_date=end_naive_hki,
             select_columns="datetime, price"
         )
 
+        series = HourlySeries.for_range(time_range.startTime, time_range.endTime)
+        series.set_rows(raw_data, "price")
 
-        result = self.convert_to_price_data(raw_data)
+        if coverage_index.is_loaded(PORSSISAHKO_COVERAGE_KEY):
+            missing_ranges = coverage_index.missing_ranges(PORSSISAHKO_COVERAGE_KEY, time_range.startTime, time_range.endTime)
+        else:
+            missing_ranges = series.missing_ranges()
+        if missing_ranges:
+            await self.fill_missing_ranges(series, missing_ranges)
 
-        missing_entries = self.find_missing_entries_utc(
-            time_range.startTime.astimezone(ZoneInfo("UTC")),
-            time_range.endTime.astimezone(ZoneInfo("UTC")),
-            result
-        )
-        if missing_entries:
-            await self.fill_missing_entries(result, missing_entries)
+        return series
+
+    def series_from_points(self, data: List[PriceDataPoint], start: datetime, end: datetime) -> HourlySeries:
+        """
+        Build a price series for a time range from price data points, e.g. an external API response.
+
+        Args:
+            data (List[PriceDataPoint]): List of price data points.
+            start (datetime): Start of the range (inclusive).
+            end (datetime): End of the range (inclusive).
 
-        return sorted(result, key=lambda x: x.startDate, reverse=False)
+        Returns:
+            HourlySeries: The series. Points outside the range are dropped.
+        """
+        series = HourlySeries.for_range(start, end)
+        for point in data:
+            series.set_datetime(point.startDate, point.price)
+        return series
 
-    def find_missing_entries_utc(self, start_date_utc: datetime, end_date_utc: datetime, data_utc: List[PriceDataPoint]):
+    def day_bounds_utc(self, day: date) -> tuple[datetime, datetime]:
         """
-        Find missing hourly entries in the given UTC time range.
+        Return the first and last hour of a Helsinki date in UTC.
 
         Args:
-            start_date_utc (datetime): Start of the UTC time range.
-            end_date_utc (datetime): End of the UTC time range.
-            data_utc (List[PriceDataPoint]): List of available data points.
+            day (date): The Helsinki date.
 
         Returns:
-            List[StartDateModel]: List of StartDateModel objects for missing hours (all in UTC).
+            tuple[datetime, datetime]: Start of the first hour and start of the last hour (UTC).
         """
-        result = []
-        current_date_utc = start_date_utc
-        while current_date_utc <= end_date_utc:
-            if not any(item.startDate == current_date_utc for item in data_utc):
-                result.append(StartDateModel(startDate=current_date_utc))
-            current_date_utc += timedelta(hours=1)
-        result.sort(key=lambda x: x.startDate, reverse=False)
-        return result
+        tz = ZoneInfo("Europe/Helsinki")
+        start = datetime(day.year, day.month, day.day, tzinfo=tz).astimezone(ZoneInfo("UTC"))
+        next_day = day + timedelta(days=1)
+        end = datetime(next_day.year, next_day.month, next_day.day, tzinfo=tz).astimezone(ZoneInfo("UTC"))
+        return start, end - timedelta(hours=1)
 
-    def calculate_hourly_avg_price(self, data):
+    def split_full_days(self, time_range: TimeRange) -> tuple[List[date], List[tuple[datetime, datetime]]]:
         """
-        Calculate hourly average prices from a list of price data points.
+        Split a time range into whole Helsinki dates and the partial-day edges around them.
 
         Args:
-            data (List[PriceDataPoint]): List of price data points.
+            time_range (TimeRange): Start and end time (end inclusive).
 
         Returns:
-            List[PriceHourlyAvgPricePoint]: List of hourly average price points. Hours are in Helsinki time.
+            tuple[List[date], List[tuple[datetime, datetime]]]: The Helsinki dates fully inside the range,
+                and the remaining (start, end) UTC ranges with inclusive ends.
         """
-        hourly_avg = {}
-        for point in data:
-            hour = point.startDate.astimezone(ZoneInfo("Europe/Helsinki")).hour
-            hourly_avg.setdefault(hour, []).append(point.price)
+        tz = ZoneInfo("Europe/Helsinki")
+        start_utc = time_range.startTime.astimezone(ZoneInfo("UTC"))
+        end_utc = time_range.endTime.astimezone(ZoneInfo("UTC"))
+        start_fi = start_utc.astimezone(tz)
+        first_day = start_fi.date()
+        if self.day_bounds_utc(first_day)[0] < start_utc:
+            first_day += timedelta(days=1)
+        last_day = (end_utc + timedelta(hours=1)).astimezone(tz).date() - timedelta(days=1)
+        if first_day > last_day:
+            return [], [(start_utc, end_utc)]
+
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+        edges = []
+        first_start = self.day_bounds_utc(first_day)[0]
+        if start_utc < first_start:
+            edges.append((start_utc, first_start - timedelta(hours=1)))
+        last_end = self.day_bounds_utc(last_day)[1]
+        if last_end < end_utc:
+            edges.append((last_end + timedelta(hours=1), end_utc))
+        return days, edges
+
+    def merge_ranges(self, ranges: List[tuple[datetime, datetime]]) -> List[tuple[datetime, datetime]]:
+        """
+        Merge adjacent or overlapping hourly ranges.
+
+        Args:
+            ranges (List[tuple[datetime, datetime]]): (start, end) UTC ranges with inclusive ends.
+
+        Returns:
+            List[tuple[datetime, datetime]]: Sorted, merged ranges.
+        """
+        merged = []
+        for range_start, range_end in sorted(ranges):
+            if merged and range_start <= merged[-1][1] + timedelta(hours=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+        return merged
+
+    def is_complete_day(self, segment: HourlySeries) -> bool:
+        """
+        Check whether the series of one Helsinki date has a price for every hour.
+
+        The repeated hour of the autumn DST change is stored once in the database, so a
+        25-hour day is complete with 24 prices.
+
+        Args:
+            segment (HourlySeries): The series of the date.
+
+        Returns:
+            bool: True if the segment is complete.
+        """
+        return segment.count >= min(len(segment), 24)
+
+    def split_historic(self, time_range: TimeRange) -> tuple[tuple[datetime, datetime] | None, tuple[datetime, datetime] | None]:
+        """
+        Split a time range into the historic part before the current Helsinki day and the tail from it onwards.
+
+        Args:
+            time_range (TimeRange): Start and end time (end inclusive).
+
+        Returns:
+            tuple: The historic and tail (start, end) UTC ranges with inclusive ends, or None for an empty part.
+        """
+        start_utc = time_range.startTime.astimezone(ZoneInfo("UTC"))
+        end_utc = time_range.endTime.astimezone(ZoneInfo("UTC"))
+        today_start = self.day_bounds_utc(datetime.now(ZoneInfo("Europe/Helsinki")).date())[0]
+        historic = (start_utc, min(end_utc, today_start - timedelta(hours=1))) if start_utc < today_start else None
+        tail = (max(start_utc, today_start), end_utc) if end_utc >= today_start else None
+        return historic, tail
+
+    def accumulate_series(self, partials: dict, series: HourlySeries, group_by: str):
+        """
+        Add the prices of a series to partial sums.
+
+        Args:
+            partials (dict): Partial sums {key: (sum, count)}, modified in place.
+            series (HourlySeries): The price series.
+            group_by (str): "hour" for the Helsinki hour of day, "weekday" for the Helsinki weekday.
+        """
+        tz = ZoneInfo("Europe/Helsinki")
+        for timestamp, price in series.items():
+            dt = datetime.fromtimestamp(timestamp, tz)
+            key = dt.hour if group_by == "hour" else dt.weekday()
+            price_sum, price_count = partials.get(key, (0.0, 0))
+            partials[key] = (price_sum + price, price_count + 1)
 
+    def accumulate_aggregates(self, partials: dict, aggregates: List[dict]):
+        """
+        Add grouped price aggregates from the database to partial sums.
+
+        Args:
+            partials (dict): Partial sums {key: (sum, count)}, modified in place.
+            aggregates (List[dict]): Rows with 'key', 'price_sum' and 'price_count'.
+        """
+        for aggregate in aggregates:
+            price_sum, price_count = partials.get(aggregate["key"], (0.0, 0))
+            partials[aggregate["key"]] = (price_sum + float(aggregate["price_sum"]), price_count + aggregate["price_count"])
+
+    def accumulate_daily_rollups(self, partials: dict, rollups: List[dict], group_by: str):
+        """
+        Add per-day rollups to partial sums.
+
+        Args:
+            partials (dict): Partial sums {key: (sum, count)}, modified in place.
+            rollups (List[dict]): Rows of the porssisahko_daily_rollup table.
+            group_by (str): "hour" for the Helsinki hour of day, "weekday" for the Helsinki weekday.
+        """
+        for rollup in rollups:
+            if group_by == "hour":
+                groups = zip(range(24), rollup["hour_sums"], rollup["hour_counts"])
+            else:
+                groups = [(rollup["weekday"], rollup["price_sum"], rollup["price_count"])]
+            for key, group_sum, group_count in groups:
+                if group_count:
+                    price_sum, price_count = partials.get(key, (0.0, 0))
+                    partials[key] = (price_sum + float(group_sum), price_count + group_count)
+
+    def calculate_hourly_avg_price(self, partials: dict) -> List[HourlyAvgPricePoint]:
+        """
+        Calculate hourly average prices from partial sums.
+
+        Args:
+            partials (dict): Partial sums {hour: (sum, count)}.
+
+        Returns:
+            List[PriceHourlyAvgPricePoint]: List of hourly average price points. Hours are in Helsinki time.
+        """
         result = [
             HourlyAvgPricePoint(
                 hour=hour,
-                avgPrice=round(sum(prices) / len(prices), 3)
+                avgPrice=round(price_sum / price_count, 3)
             )
-            for hour, prices in hourly_avg.items()
+            for hour, (price_sum, price_count) in partials.items()
         ]
         return sorted(result, key=lambda x: x.hour)
     
-    def calculate_avg_by_weekday(self, data: List[PriceDataPoint]) -> List[PriceAvgByWeekdayPoint]:
+    def calculate_avg_by_weekday(self, partials: dict) -> List[PriceAvgByWeekdayPoint]:
         """
-        Calculate average price by weekday from a list of price data points.
+        Calculate average price by weekday from partial sums.
 
         Args:
-            data (List[PriceDataPoint]): List of price data points.
+            partials (dict): Partial sums {weekday: (sum, count)}.
 
         Returns:
             List[PriceAvgByWeekdayPoint]: List of average prices by weekday.
         """
-        tz = ZoneInfo("Europe/Helsinki")
-        weekday_prices = {}
-        for point in data:
-            dt = point.startDate.astimezone(tz) if tz else point.startDate
-            weekday = dt.weekday()
-            weekday_prices.setdefault(weekday, []).append(point.price)
-
         result = [
             PriceAvgByWeekdayPoint(
                 weekday=weekday,
-                avgPrice=round(sum(prices) / len(prices), 3)
+                avgPrice=round(price_sum / price_count, 3)
             )
-            for weekday, prices in weekday_prices.items()
+            for weekday, (price_sum, price_count) in partials.items()
         ]
         return sorted(result, key=lambda x: x.weekday)
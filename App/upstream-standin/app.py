@@ -0,0 +1,339 @@
+"""
+app.py
+
+Local stand-in of the Fingrid and Pörssisähkö APIs for offline development, tests and benchmarks.
+
+The stand-in serves the endpoints the backend uses under one prefix per upstream:
+    - /fingrid/api/datasets/{dataset_id}/data          (Fingrid open data API)
+    - /porssisahko/v1/price.json                        (Pörssisähkö price of one hour)
+    - /porssisahko/v1/latest-prices.json                (Pörssisähkö latest 48 hours)
+
+Point the backend to it with FINGRID_BASE_URL=http://<host>:8090/fingrid/api and
+PORSSISAHKO_BASE_URL=http://<host>:8090/porssisahko/v1.
+
+Modes (STANDIN_MODE):
+    - replay (default): serve recorded responses; requests without a recording get synthetic data,
+      or 404 if STANDIN_MISSING=404.
+    - record: proxy every request to the real API and save the response as a recording.
+    - synthetic: always serve deterministic synthetic data.
+
+Fault injection, per upstream, configured from the environment and changeable at runtime through
+/_control:
+    - latencyMs / jitterMs: added delay of every response.
+    - errorRate / errorStatus: share of requests answered with an error status.
+    - rateLimit / rateBurst: token-bucket limit (requests per second); requests over the limit get
+      429 with a Retry-After header.
+
+Random choices use a seeded generator (STANDIN_SEED), so runs are reproducible.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+HELSINKI_TZ = ZoneInfo("Europe/Helsinki")
+
+MODE = os.getenv("STANDIN_MODE", "replay")
+MISSING = os.getenv("STANDIN_MISSING", "synthetic")
+RECORDINGS_DIR = Path(os.getenv("STANDIN_RECORDINGS_DIR", Path(__file__).parent / "recordings"))
+UPSTREAM_URLS = {
+    "fingrid": os.getenv("STANDIN_FINGRID_URL", "https://data.fingrid.fi/api"),
+    "porssisahko": os.getenv("STANDIN_PORSSISAHKO_URL", "https://api.porssisahko.net/v1"),
+}
+FINGRID_API_KEY = os.getenv("FINGRID_API_KEY")
+# Resolution of the synthetic Fingrid data
+FINGRID_STEP_MINUTES = int(os.getenv("STANDIN_FINGRID_STEP_MINUTES", 15))
+
+
+@dataclass
+class FaultSettings:
+    """
+    Fault injection settings of one upstream.
+
+    Attributes:
+        latencyMs (float): Delay added to every response in milliseconds.
+        jitterMs (float): Random extra delay between 0 and this many milliseconds.
+        errorRate (float): Share (0-1) of requests answered with errorStatus.
+        errorStatus (int): Status code of the injected errors.
+        rateLimit (float): Allowed requests per second, 0 for no limit.
+        rateBurst (float): Requests allowed in a burst.
+    """
+    latencyMs: float = float(os.getenv("STANDIN_LATENCY_MS", 0))
+    jitterMs: float = float(os.getenv("STANDIN_JITTER_MS", 0))
+    errorRate: float = float(os.getenv("STANDIN_ERROR_RATE", 0))
+    errorStatus: int = int(os.getenv("STANDIN_ERROR_STATUS", 503))
+    rateLimit: float = float(os.getenv("STANDIN_RATE_LIMIT", 0))
+    rateBurst: float = float(os.getenv("STANDIN_RATE_BURST", 1))
+
+
+class Upstream:
+    """
+    State of one simulated upstream: fault settings, rate-limit bucket and request statistics.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.settings = FaultSettings()
+        self.reset()
+
+    def reset(self):
+        self._tokens = self.settings.rateBurst
+        self._updated = time.monotonic()
+        self.stats = {"requests": 0, "recorded": 0, "replayed": 0, "synthetic": 0, "errors": 0, "throttled": 0}
+
+    def take_token(self) -> Optional[float]:
+        """
+        Take one rate-limit token.
+
+        Returns:
+            Optional[float]: None if the request is allowed, otherwise seconds until a token is available.
+        """
+        if self.settings.rateLimit <= 0:
+            return None
+        now = time.monotonic()
+        self._tokens = min(self.settings.rateBurst, self._tokens + (now - self._updated) * self.settings.rateLimit)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        return (1 - self._tokens) / self.settings.rateLimit
+
+
+upstreams = {name: Upstream(name) for name in UPSTREAM_URLS}
+rng = random.Random(int(os.getenv("STANDIN_SEED", 42)))
+app = FastAPI(title="Eprice upstream stand-in")
+_proxy_client: Optional[httpx.AsyncClient] = None
+
+
+def recording_path(upstream: str, path: str, query: str) -> Path:
+    """
+    Return the file of the recording of a request, keyed by its path and sorted query parameters.
+    """
+    params = "&".join(sorted(part for part in query.split("&") if part))
+    key = hashlib.sha256(f"{path}?{params}".encode()).hexdigest()[:24]
+    return RECORDINGS_DIR / upstream / f"{key}.json"
+
+
+async def inject_faults(upstream: Upstream) -> Optional[Response]:
+    """
+    Apply the rate limit, latency and error injection of an upstream.
+
+    Returns:
+        Optional[Response]: A 429 or injected error response, or None to serve the request.
+    """
+    upstream.stats["requests"] += 1
+    settings = upstream.settings
+    retry_after = upstream.take_token()
+    if retry_after is not None:
+        upstream.stats["throttled"] += 1
+        return JSONResponse(
+            status_code=429, content={"message": "Too Many Requests"},
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))}
+        )
+    delay = settings.latencyMs + rng.uniform(0, settings.jitterMs)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    if settings.errorRate > 0 and rng.random() < settings.errorRate:
+        upstream.stats["errors"] += 1
+        return JSONResponse(status_code=settings.errorStatus, content={"message": "Injected error"})
+    return None
+
+
+async def serve(upstream_name: str, path: str, request: Request, synthesize) -> Response:
+    """
+    Serve a request of an upstream in the configured mode.
+
+    Args:
+        upstream_name (str): 'fingrid' or 'porssisahko'.
+        path (str): Path of the request below the upstream's base URL.
+        request (Request): The request.
+        synthesize (Callable[[], dict]): Builds the synthetic response body.
+
+    Returns:
+        Response: The recorded, proxied, synthetic or injected error response.
+    """
+    upstream = upstreams[upstream_name]
+    fault = await inject_faults(upstream)
+    if fault is not None:
+        return fault
+
+    query = request.url.query
+    recording = recording_path(upstream_name, path, query)
+    if MODE == "record":
+        return await record(upstream, path, query, recording)
+    if MODE == "replay" and recording.exists():
+        saved = json.loads(recording.read_text())
+        upstream.stats["replayed"] += 1
+        return Response(content=saved["body"], status_code=saved["status"], media_type=saved["mediaType"])
+    if MODE == "replay" and MISSING == "404":
+        raise HTTPException(status_code=404, detail=f"No recording of {path}?{query}")
+    upstream.stats["synthetic"] += 1
+    return JSONResponse(synthesize())
+
+
+async def record(upstream: Upstream, path: str, query: str, recording: Path) -> Response:
+    """
+    Proxy a request to the real API and save the response.
+    """
+    global _proxy_client
+    if _proxy_client is None:
+        _proxy_client = httpx.AsyncClient(timeout=30)
+    headers = {"x-api-key": FINGRID_API_KEY} if upstream.name == "fingrid" and FINGRID_API_KEY else {}
+    url = f"{UPSTREAM_URLS[upstream.name]}{path}" + (f"?{query}" if query else "")
+    response = await _proxy_client.get(url, headers=headers)
+    media_type = response.headers.get("content-type", "application/json")
+    if response.status_code == 200:
+        recording.parent.mkdir(parents=True, exist_ok=True)
+        recording.write_text(json.dumps({
+            "url": f"{path}?{query}", "status": response.status_code, "mediaType": media_type, "body": response.text
+        }))
+        upstream.stats["recorded"] += 1
+    return Response(content=response.content, status_code=response.status_code, media_type=media_type)
+
+
+def parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+def format_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def synthetic_value(seed: int, timestamp: float, base: float, amplitude: float) -> float:
+    """
+    Deterministic value with a daily cycle and per-timestamp noise.
+    """
+    noise = int(hashlib.sha256(f"{seed}:{int(timestamp)}".encode()).hexdigest()[:8], 16) / 0xFFFFFFFF - 0.5
+    daily = math.sin(2 * math.pi * (timestamp % 86400) / 86400)
+    return round(base + amplitude * daily + amplitude * 0.2 * noise, 3)
+
+
+def synthetic_price(start: datetime) -> float:
+    return synthetic_value(0, start.timestamp(), 6.0, 4.0)
+
+
+@app.get("/fingrid/api/datasets/{dataset_id}/data")
+async def fingrid_data(dataset_id: int, request: Request, startTime: Optional[str] = None, endTime: Optional[str] = None,
+                       page: int = 1, pageSize: int = 10, sortOrder: str = "desc"):
+    """
+    Stand-in of the Fingrid dataset data endpoint, paginated like the real API.
+    """
+    def synthesize() -> dict:
+        step = timedelta(minutes=FINGRID_STEP_MINUTES)
+        now = datetime.now(timezone.utc)
+        end = parse_time(endTime) if endTime else now
+        start = parse_time(startTime) if startTime else end - timedelta(days=1)
+        first = datetime.fromtimestamp(math.ceil(start.timestamp() / step.total_seconds()) * step.total_seconds(), timezone.utc)
+        total = max(int((end - first) / step) + 1, 0)
+        last_page = max(math.ceil(total / pageSize), 1)
+        indexes = range((page - 1) * pageSize, min(page * pageSize, total))
+        if sortOrder == "desc":
+            indexes = [total - 1 - index for index in indexes]
+        data = []
+        for index in indexes:
+            point_start = first + index * step
+            data.append({
+                "datasetId": dataset_id,
+                "startTime": format_time(point_start),
+                "endTime": format_time(point_start + step),
+                "value": synthetic_value(dataset_id, point_start.timestamp(), 8000.0, 2000.0),
+            })
+        return {
+            "data": data,
+            "pagination": {
+                "total": total, "lastPage": last_page, "prevPage": page - 1 if page > 1 else None,
+                "nextPage": page + 1 if page < last_page else None, "perPage": pageSize, "currentPage": page,
+                "from": (page - 1) * pageSize + 1, "to": (page - 1) * pageSize + len(data),
+            },
+        }
+
+    return await serve("fingrid", f"/datasets/{dataset_id}/data", request, synthesize)
+
+
+@app.get("/porssisahko/v1/price.json")
+async def porssisahko_price(date: str, hour: int, request: Request):
+    """
+    Stand-in of the Pörssisähkö price of one hour (date and hour in Helsinki time).
+    """
+    def synthesize() -> dict:
+        local = datetime.fromisoformat(date).replace(hour=hour, tzinfo=HELSINKI_TZ)
+        return {"price": synthetic_price(local)}
+
+    return await serve("porssisahko", "/price.json", request, synthesize)
+
+
+@app.get("/porssisahko/v1/latest-prices.json")
+async def porssisahko_latest(request: Request):
+    """
+    Stand-in of the Pörssisähkö latest prices: 48 hours, including tomorrow after 14:00 Helsinki time.
+    """
+    def synthesize() -> dict:
+        now = datetime.now(HELSINKI_TZ)
+        first_day = now.date() if now.hour >= 14 else now.date() - timedelta(days=1)
+        start = datetime(first_day.year, first_day.month, first_day.day, tzinfo=HELSINKI_TZ).astimezone(timezone.utc)
+        end = datetime(first_day.year, first_day.month, first_day.day, tzinfo=HELSINKI_TZ) + timedelta(days=2)
+        hours = int((end.astimezone(timezone.utc) - start).total_seconds() // 3600)
+        prices = [
+            {
+                "price": synthetic_price(start + timedelta(hours=index)),
+                "startDate": format_time(start + timedelta(hours=index)),
+                "endDate": format_time(start + timedelta(hours=index + 1)),
+            }
+            for index in reversed(range(hours))
+        ]
+        return {"prices": prices}
+
+    return await serve("porssisahko", "/latest-prices.json", request, synthesize)
+
+
+@app.get("/_control")
+async def get_control():
+    """
+    Return the mode, the fault settings and the request statistics of every upstream.
+    """
+    return {
+        "mode": MODE,
+        "upstreams": {name: {"settings": asdict(upstream.settings), "stats": upstream.stats} for name, upstream in upstreams.items()},
+    }
+
+
+@app.put("/_control/{upstream_name}")
+async def put_control(upstream_name: str, settings: dict):
+    """
+    Change fault settings of an upstream, e.g. {"latencyMs": 200, "errorRate": 0.1}.
+    """
+    upstream = upstreams.get(upstream_name)
+    if upstream is None:
+        raise HTTPException(status_code=404, detail=f"Unknown upstream {upstream_name}")
+    allowed = {field.name: field.type for field in fields(FaultSettings)}
+    unknown = [key for key in settings if key not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown setting(s) {', '.join(unknown)}")
+    for key, value in settings.items():
+        setattr(upstream.settings, key, int(value) if key == "errorStatus" else float(value))
+    upstream.reset()
+    return asdict(upstream.settings)
+
+
+@app.post("/_control/reset")
+async def reset_control():
+    """
+    Restore the fault settings from the environment and clear the statistics.
+    """
+    for upstream in upstreams.values():
+        upstream.settings = FaultSettings()
+        upstream.reset()
+    return await get_control()